@@ -0,0 +1,235 @@
+"""
+Draw-path benchmark for the Binary Pomodoro widget.
+Renders a full session onto a RecordingCanvas (no display needed) and reports
+per-frame latency, canvas items created/destroyed and memory allocations.
+
+Usage:
+    python benchmark.py --minutes 60
+    python benchmark.py --minutes 60 --json bench.json
+"""
+
+import json
+import statistics
+import sys
+import time
+import timeit
+import tracemalloc
+
+from pomodoro_widget import (
+    PLAY_BUTTON_ICONS, PLAY_BUTTON_SIZE, TREE_CANVAS_HEIGHT, TREE_CANVAS_WIDTH,
+    IconSet, PomodoroTimer, make_tree, play_button_icon, update_tree
+)
+from recording_canvas import RecordingCanvas
+from simulation import VirtualClock
+
+
+# Same icon colours as PomodoroWidget's default icon_theme
+ICON_THEME = {"ring": "#2d5a2d", "glyph": "#ffffff", "stroke": "#2d5a2d"}
+
+
+def percentile(sorted_values, fraction):
+    """Return the value at a fraction (0-1) of a sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def run_session(minutes, trace_memory=False):
+    """
+    Render one session, one frame per timer second, through
+    update_tree and the play button icons, as PomodoroWidget draws a
+    tick. Returns the canvases, frame times and per-frame canvas
+    operation counts.
+    """
+    clock = VirtualClock()
+    canvas = RecordingCanvas(width=TREE_CANVAS_WIDTH, height=TREE_CANVAS_HEIGHT)
+    play_btn = RecordingCanvas(width=PLAY_BUTTON_SIZE, height=PLAY_BUTTON_SIZE)
+    timer = PomodoroTimer(minutes, clock=clock)
+    timer.set_minutes(minutes)
+    tree = make_tree(canvas)
+    play_icons = IconSet(play_btn, PLAY_BUTTON_ICONS, ICON_THEME)
+
+    def draw_frame():
+        update_tree(tree, timer)
+        play_icons.show(play_button_icon(timer))
+
+    frame_times = []
+    frame_ops = []
+
+    # First frame, as drawn by _create_ui before the timer starts
+    started = time.perf_counter()
+    draw_frame()
+    first_frame = time.perf_counter() - started
+    created_first = canvas.counts["create"]
+    canvas.reset_log()
+    play_btn.reset_log()
+
+    if trace_memory:
+        tracemalloc.start()
+        blocks_before = sys.getallocatedblocks()
+
+    timer.start()
+    play_icons.show(play_button_icon(timer))
+    toggle_ops = len(play_btn.log)
+    play_btn.reset_log()
+    while not timer.is_complete():
+        clock.advance(timer.next_tick_delay() / 1000)
+        timer.tick()
+        if trace_memory:
+            # Keep the traced pass free of the benchmark's own bookkeeping
+            # (the recording log still grows with every canvas call)
+            draw_frame()
+            continue
+        ops_before = len(canvas.log) + len(play_btn.log)
+        started = time.perf_counter()
+        draw_frame()
+        frame_times.append(time.perf_counter() - started)
+        frame_ops.append(len(canvas.log) + len(play_btn.log) - ops_before)
+
+    memory = None
+    if trace_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory = {
+            "traced_current_kib": current / 1024,
+            "traced_peak_kib": peak / 1024,
+            "net_blocks": sys.getallocatedblocks() - blocks_before,
+        }
+
+    # Steady ticks are over; check a reskin touches items in place
+    ticks_created = play_btn.counts["create"]
+    play_btn.reset_log()
+    play_icons.reskin({"ring": "#5a2d2d", "glyph": "#ffd700"})
+
+    return {
+        "canvas": canvas,
+        "play_btn": {
+            "items_alive": play_btn.alive(),
+            "toggle_ops": toggle_ops,
+            "created_during_ticks": ticks_created,
+            "reskin_created": play_btn.counts["create"],
+            "reskin_itemconfigure": play_btn.counts["itemconfigure"],
+        },
+        "first_frame": first_frame,
+        "created_first": created_first,
+        "frame_times": frame_times,
+        "frame_ops": frame_ops,
+        "glyphs": tree.glyphs.stats(),
+        "memory": memory,
+    }
+
+
+def micro_benchmarks(number=2000):
+    """Time the individual draw-path methods in isolation."""
+    canvas = RecordingCanvas(width=TREE_CANVAS_WIDTH, height=TREE_CANVAS_HEIGHT)
+    tree = make_tree(canvas)
+    tree.draw_tree(25, 50)
+
+    def steady_frame():
+        tree.draw_tree(25, 50)
+
+    toggle = [25.0]
+
+    def growth_frame():
+        toggle[0] = 75.0 if toggle[0] == 25.0 else 25.0
+        tree.draw_tree(25, toggle[0])
+
+    leaf_pos = tree._get_layout().growth_order[0]
+    digit = ["0"]
+
+    def leaf_update():
+        digit[0] = "1" if digit[0] == "0" else "0"
+        tree._draw_leaf(0, leaf_pos, digit[0], 1.0)
+
+    results = {}
+    for name, func in [
+        ("_calculate_positions", tree._calculate_positions),
+        ("_get_layout (cached)", tree._get_layout),
+        ("_draw_leaf (digit change)", leaf_update),
+        ("draw_tree (no change)", steady_frame),
+        ("draw_tree (growth change)", growth_frame),
+    ]:
+        seconds = timeit.timeit(func, number=number)
+        results[name] = seconds / number * 1e6
+    return results
+
+
+def run_benchmark(minutes=60):
+    """Run the full benchmark and return a JSON-serialisable report."""
+    session = run_session(minutes)
+    traced = run_session(minutes, trace_memory=True)
+
+    times = sorted(t * 1e6 for t in session["frame_times"])
+    ops = session["frame_ops"]
+    counts = session["canvas"].counts
+
+    return {
+        "minutes": minutes,
+        "frames": len(times),
+        "first_frame_us": session["first_frame"] * 1e6,
+        "frame_us": {
+            "mean": statistics.fmean(times) if times else 0.0,
+            "p50": percentile(times, 0.50),
+            "p95": percentile(times, 0.95),
+            "p99": percentile(times, 0.99),
+            "max": times[-1] if times else 0.0,
+        },
+        "canvas": {
+            "items_alive": session["canvas"].alive(),
+            "created_first_frame": session["created_first"],
+            "created": counts["create"],
+            "deleted": counts["delete"],
+            "itemconfigure": counts["itemconfigure"],
+            "coords": counts["coords"],
+            "ops_per_frame_mean": statistics.fmean(ops) if ops else 0.0,
+            "ops_per_frame_max": max(ops) if ops else 0,
+        },
+        "play_button": session["play_btn"],
+        "glyphs": session["glyphs"],
+        "memory": traced["memory"],
+        "micro_us": micro_benchmarks(),
+    }
+
+
+def print_report(report):
+    frame = report["frame_us"]
+    canvas = report["canvas"]
+    memory = report["memory"]
+    print(f"Session:          {report['minutes']} min, {report['frames']} frames")
+    print(f"First frame:      {report['first_frame_us']:.1f} us")
+    print(f"Frame latency:    mean {frame['mean']:.1f} us, p50 {frame['p50']:.1f}, "
+          f"p95 {frame['p95']:.1f}, p99 {frame['p99']:.1f}, max {frame['max']:.1f}")
+    print(f"Items alive:      {canvas['items_alive']} "
+          f"({canvas['created_first_frame']} created on first frame)")
+    print(f"During session:   {canvas['created']} created, {canvas['deleted']} deleted, "
+          f"{canvas['itemconfigure']} itemconfigure, {canvas['coords']} coords")
+    print(f"Canvas ops/frame: mean {canvas['ops_per_frame_mean']:.2f}, max {canvas['ops_per_frame_max']}")
+    play = report["play_button"]
+    print(f"Play button:      {play['items_alive']} items, {play['created_during_ticks']} created "
+          f"during ticks, {play['toggle_ops']} item updates per play/pause toggle, reskin "
+          f"{play['reskin_itemconfigure']} itemconfigure / {play['reskin_created']} created")
+    glyphs = report["glyphs"]
+    print(f"Glyph cache:      {glyphs['glyphs']} glyphs, {glyphs['fonts']} fonts, "
+          f"{glyphs['hits']} hits, {glyphs['misses']} misses, {glyphs['evictions']} evictions")
+    print(f"Allocations:      peak {memory['traced_peak_kib']:.1f} KiB, "
+          f"retained {memory['traced_current_kib']:.1f} KiB, net blocks {memory['net_blocks']}")
+    for name, micro in report["micro_us"].items():
+        print(f"  {name:<28} {micro:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the Binary Pomodoro draw path")
+    parser.add_argument("--minutes", type=int, default=60, help="Session length to render")
+    parser.add_argument("--json", metavar="PATH", help="Also write the report as JSON")
+
+    args = parser.parse_args()
+
+    report = run_benchmark(args.minutes)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,321 @@
+"""
+Crash-safe checkpoint of the timer state for the Binary Pomodoro widget.
+The state (minutes, remaining time, running, and for a running timer its
+wall-clock deadline) is written to a temp file that is fsynced and then
+renamed over the checkpoint, so after a crash or power loss the file
+holds either the previous state or the new one, never a mix.
+
+Transitions (start, pause, complete, reset) are written at once; other
+changes are debounced, and a running timer is re-checked at most every
+`interval` seconds. Nothing is written per tick. A running timer keeps
+its wall-clock deadline, so time spent killed or rebooting counts as
+elapsed on restore.
+
+Usage:
+    python checkpoint.py               # show the saved state
+    python checkpoint.py --benchmark   # write rate, write latency, restore time and restored display
+"""
+
+import json
+import os
+import time
+
+
+VERSION = 1
+
+
+def default_checkpoint_path():
+    """Return the per-user checkpoint location."""
+    return os.path.join(os.path.expanduser("~"), ".binary_pomodoro", "state.json")
+
+
+def write_checkpoint(path, state, fsync=True):
+    """Atomically replace the checkpoint at path (temp file, fsync, rename)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, separators=(",", ":"))
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    if fsync and hasattr(os, "O_DIRECTORY"):
+        # Make the rename itself durable
+        fd = os.open(directory or ".", os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def read_checkpoint(path=None):
+    """Return the saved state dict, or None if missing, corrupt or from another version."""
+    try:
+        with open(path or default_checkpoint_path(), encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get("version") != VERSION:
+        return None
+    if not {"minutes", "remaining", "running", "deadline"} <= state.keys():
+        return None
+    return state
+
+
+def restore_timer(timer, state, clock=None):
+    """
+    Apply a saved state to a fresh timer, without emitting events.
+
+    A running timer continues towards its saved deadline; if that passed
+    while the widget was down, it completes on its first tick. A finished
+    session comes back rewound to its full length. Returns True if a
+    state was applied.
+    """
+    if not state:
+        return False
+    clock = clock or timer.clock
+    minutes = state["minutes"]
+    if state["running"] and state["deadline"] is not None:
+        # Never more than was left at the save, even if the wall clock went back
+        remaining = min(state["remaining"], max(0.0, state["deadline"] - clock.wall()))
+        timer.restore(minutes, remaining, True)
+    else:
+        remaining = state["remaining"]
+        timer.restore(minutes, remaining if remaining > 0 else minutes * 60, False)
+    return True
+
+
+def _same_state(a, b):
+    if (a["minutes"], a["running"]) != (b["minutes"], b["running"]):
+        return False
+    if a["running"]:
+        # Deadlines within half a second show the same countdown
+        return abs(a["deadline"] - b["deadline"]) < 0.5
+    return a["remaining"] == b["remaining"]
+
+
+class Checkpointer:
+    """
+    Keeps the checkpoint file in step with a timer.
+
+    Args:
+        timer: PomodoroTimer or RemoteTimer
+        path: Checkpoint file (default_checkpoint_path() if omitted)
+        interval: Seconds between re-checks of a running timer
+        debounce: Seconds to wait before writing a touch()ed change
+        clock: Clock for after()/monotonic()/wall() (default: the timer's)
+        fsync: fsync the file and directory on every write
+    """
+
+    def __init__(self, timer, path=None, interval=30.0, debounce=1.0, clock=None, fsync=True):
+        self.timer = timer
+        self.path = path or default_checkpoint_path()
+        self.interval = interval
+        self.debounce = debounce
+        self.clock = clock or timer.clock
+        self.fsync = fsync
+
+        self.writes = 0
+        self.skipped = 0
+        self.write_seconds = 0.0
+        self.write_seconds_max = 0.0
+
+        self._written = None
+        self._last_check = None
+        self._pending = None
+        timer.listeners.append(lambda event, t: self.save())
+
+    def state(self):
+        """Return the timer's current state as a checkpoint dict."""
+        timer = self.timer
+        state = {
+            "version": VERSION,
+            "minutes": timer.minutes,
+            "remaining": timer.remaining_seconds,
+            "running": False,
+            "deadline": None,
+            "saved_at": self.clock.wall(),
+        }
+        deadline = timer.get_deadline()
+        if timer.is_running and deadline is not None:
+            left = max(0.0, deadline - self.clock.monotonic())
+            state["remaining"] = left
+            state["running"] = True
+            state["deadline"] = state["saved_at"] + left
+        return state
+
+    def restore(self):
+        """Apply the saved state to the timer. Returns True if there was one."""
+        state = read_checkpoint(self.path)
+        if not restore_timer(self.timer, state, self.clock):
+            return False
+        self._written = state
+        return True
+
+    def save(self):
+        """Write the current state now, unless the file already holds it."""
+        self._cancel_pending()
+        self._last_check = self.clock.monotonic()
+        state = self.state()
+        if self._written is not None and _same_state(state, self._written):
+            self.skipped += 1
+            return False
+
+        started = time.perf_counter()
+        write_checkpoint(self.path, state, self.fsync)
+        elapsed = time.perf_counter() - started
+        self.write_seconds += elapsed
+        self.write_seconds_max = max(self.write_seconds_max, elapsed)
+        self.writes += 1
+        self._written = state
+        return True
+
+    def tick(self):
+        """Call on each update while running; saves at most every `interval` seconds."""
+        if self._last_check is None or self.clock.monotonic() - self._last_check >= self.interval:
+            self.save()
+
+    def touch(self):
+        """Note a change that is not a timer event (e.g. set_minutes); saved after `debounce`."""
+        if self._pending is None:
+            self._pending = self.clock.after(int(self.debounce * 1000), self._save_pending)
+
+    def _save_pending(self):
+        self._pending = None
+        self.save()
+
+    def _cancel_pending(self):
+        if self._pending is not None:
+            self.clock.after_cancel(self._pending)
+            self._pending = None
+
+    def close(self, save=True):
+        """Write a debounced change still waiting (or drop it with save=False)."""
+        if self._pending is not None:
+            if save:
+                self.save()
+            else:
+                self._cancel_pending()
+
+    def stats(self):
+        """Return write counters."""
+        return {
+            "writes": self.writes,
+            "skipped": self.skipped,
+            "write_ms_mean": self.write_seconds / self.writes * 1000 if self.writes else 0.0,
+            "write_ms_max": self.write_seconds_max * 1000,
+        }
+
+
+def check_restored_display(path):
+    """
+    Save a paused 12-minute session with 07:30 left, restore it and
+    return the time shown: (headless controller, widget label). The
+    widget is None where there is no display to create it on.
+    """
+    import tkinter
+
+    from pomodoro_widget import PomodoroWidget
+    from simulation import HeadlessPomodoro, VirtualClock
+
+    state = {"version": VERSION, "minutes": 12, "remaining": 450, "running": False,
+             "deadline": None, "saved_at": time.time()}
+    write_checkpoint(path, state, fsync=False)
+    headless = HeadlessPomodoro(VirtualClock(), checkpoint_path=path, fsync=False).display
+
+    try:
+        widget = PomodoroWidget(checkpoint=path)
+    except tkinter.TclError:
+        return headless, None
+    try:
+        return headless, widget.timer_label.cget("text")
+    finally:
+        widget.close()
+
+
+def run_benchmark(minutes=60, runs=200):
+    """Measure writes over a virtual session, real write latency and restore time."""
+    import tempfile
+
+    from pomodoro_widget import PomodoroTimer
+    from simulation import HeadlessPomodoro, VirtualClock
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.json")
+
+        # A session with a pause and some +/- clicks, on a virtual clock
+        clock = VirtualClock()
+        app = HeadlessPomodoro(clock, checkpoint_path=path)
+        for _ in range(5):
+            app.set_minutes(app.timer.minutes + 1)
+        app.set_minutes(minutes)
+        clock.advance(2)
+        app.toggle()
+        clock.advance(minutes * 30)
+        app.toggle()
+        clock.advance(300)
+        app.toggle()
+        clock.advance(minutes * 30 + 5)
+        session = app.checkpoint.stats()
+        ticks = app.wakeup_count
+
+        # Real write latency and restore time
+        timer = PomodoroTimer(25)
+        checkpointer = Checkpointer(timer, path)
+        timer.start()
+        latencies = []
+        for i in range(runs):
+            timer.set_minutes(1 + i % 60)
+            started = time.perf_counter()
+            checkpointer.save()
+            latencies.append(time.perf_counter() - started)
+        timer.pause()
+
+        restores = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            restore_timer(PomodoroTimer(5), read_checkpoint(path))
+            restores.append(time.perf_counter() - started)
+
+        headless_shown, widget_shown = check_restored_display(path)
+
+    latencies.sort()
+    restores.sort()
+    print(f"Session:          {minutes} min running + 5 min paused, {ticks} ticks")
+    print(f"Checkpoint:       {session['writes']} writes, {session['skipped']} re-checks "
+          f"found nothing new")
+    print(f"Write (fsync):    median {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"max {latencies[-1] * 1000:.2f} ms")
+    print(f"Restore:          median {restores[len(restores) // 2] * 1e6:.0f} us, "
+          f"max {restores[-1] * 1e6:.0f} us (read + apply)")
+    print(f"Restored 07:30:   controller shows {headless_shown}, widget label "
+          f"{widget_shown or 'not checked (no display)'}")
+    shown_ok = headless_shown == "07:30" and widget_shown in (None, "07:30")
+    return session["writes"] <= 10 and restores[len(restores) // 2] < 0.005 and shown_ok
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Inspect the saved timer state")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Measure write rate, write latency and restore time")
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sys.exit(0 if run_benchmark() else 1)
+
+    state = read_checkpoint()
+    if state is None:
+        print(f"No checkpoint at {default_checkpoint_path()}")
+        sys.exit(1)
+    if state["running"]:
+        left = max(0, state["deadline"] - time.time())
+        print(f"Running: {state['minutes']} min session, {int(left) // 60:02d}:{int(left) % 60:02d} left")
+    else:
+        remaining = int(state["remaining"])
+        print(f"Paused: {state['minutes']} min session, {remaining // 60:02d}:{remaining % 60:02d} left")
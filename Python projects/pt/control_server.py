@@ -0,0 +1,402 @@
+"""
+Control API for a running Binary Pomodoro widget.
+An asyncio server on a Unix domain socket speaks line-delimited JSON:
+
+    {"cmd": "status"}
+    {"cmd": "start"} / {"cmd": "pause"} / {"cmd": "reset"}
+    {"cmd": "set_minutes", "minutes": 25}
+
+Every response is one JSON line, e.g.
+    {"ok":true,"display":"04:59","remaining":299,"minutes":5,"running":true,"progress":0.33}
+An "id" field in a request is echoed back.
+
+The server runs its event loop in a background thread. Status queries are
+answered there from a snapshot the widget publishes, so they never wait
+for Tk. Commands are handed to the Tk thread through a socket pair watched
+with createfilehandler, so nothing polls.
+
+Usage:
+    python control_server.py status
+    python control_server.py set_minutes 25
+    python control_server.py --benchmark 20000
+"""
+
+import asyncio
+import json
+import math
+import os
+import socket
+import stat
+import threading
+import time
+
+
+COMMANDS = ("start", "pause", "reset", "set_minutes")
+
+# Seconds start() waits for the server thread to bind the socket
+START_TIMEOUT = 5.0
+
+
+def default_socket_path():
+    """Return the per-user control socket location."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "binary_pomodoro.sock")
+    return os.path.join(os.path.expanduser("~"), ".binary_pomodoro", "control.sock")
+
+
+def socket_in_use(path):
+    """
+    Return True if a server is accepting connections on the socket path.
+
+    Raises RuntimeError if the path cannot be probed (e.g. it is not a
+    socket, or is not ours to connect to), since it is then unsafe to
+    remove it.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+        except OSError as e:
+            raise RuntimeError(f"Cannot use {path} as the control socket: {e}") from e
+    return True
+
+
+def is_supported():
+    """Unix domain sockets and Tk file handlers are needed (not on Windows)."""
+    return hasattr(socket, "AF_UNIX") and os.name == "posix"
+
+
+class TimerControl:
+    """
+    Maps protocol commands onto a PomodoroTimer.
+
+    status() may be called from any thread: it reads an immutable snapshot
+    that publish() replaces, and derives the remaining time from the
+    snapshot's deadline. command() must run on the thread that owns the
+    timer. Subclasses add UI updates around the timer calls.
+    """
+
+    def __init__(self, timer):
+        self.timer = timer
+        self.clock = timer.clock
+        self._snapshot = None
+        self.publish()
+        timer.listeners.append(lambda event, t: self.publish())
+
+    def publish(self):
+        """Refresh the status snapshot (call on the timer's thread)."""
+        timer = self.timer
+        self._snapshot = (
+            timer.minutes, timer.total_seconds, timer.remaining_seconds,
+            timer.is_running, timer.get_deadline()
+        )
+
+    def status(self):
+        """Return the current status as a response dict."""
+        minutes, total, remaining, running, deadline = self._snapshot
+        if running and deadline is not None:
+            remaining = max(0, math.ceil(deadline - self.clock.monotonic()))
+            running = remaining > 0
+        return {
+            "ok": True,
+            "display": f"{remaining // 60:02d}:{remaining % 60:02d}",
+            "remaining": remaining,
+            "minutes": minutes,
+            "running": running,
+            "progress": round((total - remaining) / total * 100, 2) if total else 100,
+        }
+
+    def _minutes_error(self, request):
+        """Return an error response if a set_minutes request cannot apply now."""
+        if not isinstance(request.get("minutes"), int):
+            return {"ok": False, "error": "set_minutes needs an integer 'minutes'"}
+        if self.timer.is_running:
+            return {"ok": False, "error": "pause the timer before changing minutes"}
+        return None
+
+    def command(self, request):
+        """Run a start/pause/reset/set_minutes request and return the new status."""
+        cmd = request["cmd"]
+        if cmd == "set_minutes":
+            error = self._minutes_error(request)
+            if error is not None:
+                return error
+            self.timer.set_minutes(request["minutes"])
+        elif cmd == "start":
+            if self.timer.is_complete():
+                self.timer.reset()
+            self.timer.start()
+        else:
+            getattr(self.timer, cmd)()
+        self.publish()
+        return self.status()
+
+
+class WidgetControl(TimerControl):
+    """TimerControl that drives a PomodoroWidget the way its buttons do."""
+
+    def __init__(self, widget):
+        self.widget = widget
+        super().__init__(widget.timer)
+
+    def command(self, request):
+        widget = self.widget
+        cmd = request["cmd"]
+        if cmd in ("start", "pause"):
+            if (cmd == "start") != widget.timer.is_running:
+                widget._toggle_timer()
+        elif cmd == "reset":
+            widget.controller.reset()
+        elif cmd == "set_minutes":
+            error = self._minutes_error(request)
+            if error is not None:
+                return error
+            widget.controller.set_minutes(request["minutes"])
+        self.publish()
+        return self.status()
+
+
+class ControlServer:
+    """
+    Line-delimited JSON server on a Unix socket, running in its own thread.
+
+    Args:
+        control: TimerControl (or subclass) answering requests
+        path: Socket path (default_socket_path() if omitted)
+        dispatcher: Runs a callable on the thread owning the timer;
+            None runs commands directly on the server thread
+    """
+
+    def __init__(self, control, path=None, dispatcher=None):
+        self.control = control
+        self.path = path or default_socket_path()
+        self.dispatcher = dispatcher
+        self.requests = 0
+        self._loop = None
+        self._server = None
+        self._clients = set()
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = None
+
+    def start(self):
+        """Bind the socket and start serving in a daemon thread (RuntimeError on failure)."""
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if os.path.lexists(self.path):
+                # Another live instance keeps its socket; only a socket left
+                # behind by a crashed server is removed, never another file
+                if not stat.S_ISSOCK(os.lstat(self.path).st_mode):
+                    raise RuntimeError(f"{self.path} exists and is not a socket")
+                if socket_in_use(self.path):
+                    raise RuntimeError(f"Another control server is listening on {self.path}")
+                os.unlink(self.path)
+        except OSError as e:
+            raise RuntimeError(f"Cannot use {self.path} as the control socket: {e}") from e
+        self._thread = threading.Thread(target=self._run, name="control-server", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(START_TIMEOUT):
+            raise RuntimeError(f"Control server did not start within {START_TIMEOUT:g} s")
+        if self._error is not None:
+            raise RuntimeError(f"Cannot listen on {self.path}: {self._error}") from self._error
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_unix_server(self._handle, path=self.path)
+            )
+            os.chmod(self.path, 0o600)
+        except Exception as e:
+            # Reported by start(); only a socket this server bound is
+            # removed by stop()
+            self._error = e
+            if self._server is not None:
+                self._server.close()
+            self._loop.close()
+            return
+        finally:
+            self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(self._shutdown())
+            self._loop.close()
+
+    async def _shutdown(self):
+        self._server.close()
+        for task in self._clients:
+            task.cancel()
+        await asyncio.gather(*self._clients, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._clients.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._respond(line)
+                writer.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+                # Only wait for the socket when the client is not reading
+                if writer.transport.get_write_buffer_size() > 65536:
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._clients.discard(task)
+            writer.close()
+
+    async def _respond(self, line):
+        self.requests += 1
+        try:
+            request = json.loads(line)
+            cmd = request["cmd"]
+        except (ValueError, KeyError, TypeError):
+            return {"ok": False, "error": "expected a JSON object with a 'cmd' field"}
+
+        if cmd == "status":
+            response = self.control.status()
+        elif cmd in COMMANDS:
+            if self.dispatcher is None:
+                response = self.control.command(request)
+            else:
+                response = await self._on_owner_thread(request)
+        else:
+            response = {"ok": False, "error": f"unknown command {cmd!r}"}
+
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    def _on_owner_thread(self, request):
+        future = self._loop.create_future()
+
+        def run():
+            try:
+                result = self.control.command(request)
+            except Exception as e:
+                result = {"ok": False, "error": str(e)}
+            self._loop.call_soon_threadsafe(_set_result, future, result)
+
+        self.dispatcher(run)
+        return future
+
+    def stop(self):
+        """Stop serving and remove the socket file."""
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=2)
+        if self._server is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def _set_result(future, result):
+    if not future.done():
+        future.set_result(result)
+
+
+def send_command(cmd, path=None, timeout=2.0, **fields):
+    """Send one request to a running widget and return the response dict."""
+    request = dict(fields, cmd=cmd)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path or default_socket_path())
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data)
+
+
+def run_benchmark(requests):
+    """Serve a headless timer and time status queries from a local client."""
+    import tempfile
+
+    from pomodoro_widget import PomodoroTimer
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "control.sock")
+        timer = PomodoroTimer(25)
+        server = ControlServer(TimerControl(timer), path)
+        server.start()
+        try:
+            send_command("start", path)
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(path)
+                stream = sock.makefile("rb")
+                request = b'{"cmd":"status"}\n'
+
+                # Sequential round trips: latency
+                latencies = []
+                started = time.perf_counter()
+                for _ in range(requests):
+                    sent = time.perf_counter()
+                    sock.sendall(request)
+                    stream.readline()
+                    latencies.append(time.perf_counter() - sent)
+                sequential = time.perf_counter() - started
+
+                # Pipelined batches: throughput
+                batch = 100
+                started = time.perf_counter()
+                for _ in range(requests // batch):
+                    sock.sendall(request * batch)
+                    for _ in range(batch):
+                        stream.readline()
+                pipelined = time.perf_counter() - started
+            response = send_command("status", path)
+        finally:
+            server.stop()
+
+    latencies.sort()
+    us = [t * 1e6 for t in latencies]
+    p99 = us[min(len(us) - 1, int(0.99 * len(us)))]
+    print(f"Status queries:   {requests}")
+    print(f"Round trip:       p50 {us[len(us) // 2]:.0f} us, p99 {p99:.0f} us, max {us[-1]:.0f} us")
+    print(f"Sequential:       {requests / sequential:,.0f} queries/s")
+    print(f"Pipelined:        {(requests // batch) * batch / pipelined:,.0f} queries/s")
+    print(f"Last response:    {response}")
+    return p99 < 1000
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Control a running Binary Pomodoro widget")
+    parser.add_argument("cmd", nargs="?", choices=("status",) + COMMANDS, help="Command to send")
+    parser.add_argument("minutes", nargs="?", type=int, help="Minutes for set_minutes")
+    parser.add_argument("--socket", help="Control socket path")
+    parser.add_argument("--benchmark", type=int, metavar="QUERIES",
+                        help="Benchmark status queries against a headless server")
+
+    args = parser.parse_args()
+
+    if not is_supported():
+        print("Error: the control socket needs Unix domain sockets (not available on Windows)")
+        sys.exit(1)
+
+    if args.benchmark:
+        sys.exit(0 if run_benchmark(args.benchmark) else 1)
+
+    if args.cmd is None:
+        parser.error("a command is required")
+    fields = {"minutes": args.minutes} if args.cmd == "set_minutes" else {}
+    try:
+        response = send_command(args.cmd, args.socket, **fields)
+    except OSError as e:
+        print(f"Error: no widget is listening ({e})")
+        sys.exit(1)
+    print(json.dumps(response))
+    sys.exit(0 if response.get("ok") else 1)
@@ -0,0 +1,514 @@
+"""
+Publish/subscribe bus for timer lifecycle events.
+Handlers (logging, notifications, shell commands) run on a small pool of
+worker threads, never on the thread that publishes, so a slow handler
+cannot freeze the Tk main loop. Each subscription has a bounded queue
+that drops or coalesces events when full, an optional timeout, and
+latency/queue-depth metrics. Results are handed back through a
+dispatcher (e.g. pomodoro_widget.TkDispatcher) so they arrive on the Tk thread.
+
+Usage:
+    python pomodoro_widget.py --on complete "notify-send 'Pomodoro done'"
+    python event_bus.py --benchmark
+"""
+
+import heapq
+import itertools
+import os
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+
+from frame_profiler import HdrHistogram
+
+
+EVENTS = ("start", "pause", "complete", "reset")
+ANY = "*"
+POLICIES = ("drop", "coalesce")
+
+
+class TimerEvent:
+    """Immutable snapshot of a timer at a state transition."""
+
+    __slots__ = ("name", "minutes", "total_seconds", "remaining_seconds", "timestamp")
+
+    def __init__(self, name, minutes, total_seconds, remaining_seconds, timestamp):
+        self.name = name
+        self.minutes = minutes
+        self.total_seconds = total_seconds
+        self.remaining_seconds = remaining_seconds
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_timer(cls, name, timer):
+        return cls(name, timer.minutes, timer.total_seconds,
+                   timer.remaining_seconds, timer.clock.wall())
+
+    @property
+    def elapsed_seconds(self):
+        return self.total_seconds - self.remaining_seconds
+
+    def __repr__(self):
+        return (f"TimerEvent({self.name!r}, minutes={self.minutes}, "
+                f"remaining={self.remaining_seconds})")
+
+
+class HandlerResult:
+    """Outcome of one handler call, delivered to a subscription's on_result."""
+
+    __slots__ = ("subscription", "event", "value", "error", "latency")
+
+    def __init__(self, subscription, event, value, error, latency):
+        self.subscription = subscription
+        self.event = event
+        self.value = value
+        self.error = error
+        self.latency = latency
+
+    @property
+    def timed_out(self):
+        return isinstance(self.error, TimeoutError)
+
+
+class Subscription:
+    """
+    One handler and its queue. At most one call per subscription runs at
+    a time, so a handler sees its events in order and a hung handler
+    holds a single worker while its queue applies backpressure.
+    """
+
+    def __init__(self, name, event, handler, timeout, policy, queue_size, on_result):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, not {policy!r}")
+        self.name = name
+        self.event = event
+        self.handler = handler
+        self.timeout = timeout
+        self.policy = policy
+        self.queue_size = queue_size
+        self.on_result = on_result
+
+        self.lock = threading.Lock()
+        self.pending = deque()
+        self.busy = False
+        self.active = True
+
+        self.latency = HdrHistogram()  # Handler run time, us
+        self.wait = HdrHistogram()     # Publish to handler start, us
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.depth_max = 0
+
+    def offer(self, event, now):
+        """Queue an event. Returns True if the caller must schedule a worker."""
+        with self.lock:
+            if not self.active:
+                return False
+            if len(self.pending) >= self.queue_size:
+                if self.policy == "drop":
+                    self.dropped += 1
+                    return False
+                # Coalesce: the newest pending event of the same kind is
+                # replaced, otherwise the oldest gives way
+                self.coalesced += 1
+                for i in range(len(self.pending) - 1, -1, -1):
+                    if self.pending[i][0].name == event.name:
+                        del self.pending[i]
+                        break
+                else:
+                    self.pending.popleft()
+            self.pending.append((event, now))
+            self.depth_max = max(self.depth_max, len(self.pending))
+            if self.busy:
+                return False
+            self.busy = True
+            return True
+
+    def metrics(self):
+        with self.lock:
+            return {
+                "event": self.event,
+                "policy": self.policy,
+                "timeout": self.timeout,
+                "queue_depth": len(self.pending),
+                "queue_depth_max": self.depth_max,
+                "queue_size": self.queue_size,
+                "calls": self.calls,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+                "latency_us": self.latency.to_dict(),
+                "wait_us": self.wait.to_dict(),
+            }
+
+
+class _Call:
+    __slots__ = ("subscription", "event", "started", "finished", "expired")
+
+    def __init__(self, subscription, event, started):
+        self.subscription = subscription
+        self.event = event
+        self.started = started
+        self.finished = False
+        self.expired = False
+
+
+class EventBus:
+    """
+    Runs subscribed handlers off the publishing thread.
+
+    Args:
+        workers: Worker threads (daemon threads, started on first publish)
+        queue_size: Default per-subscription queue bound
+        timeout: Default per-handler timeout in seconds (None: no limit)
+        dispatcher: Callable that runs a function on the consumer's thread,
+            e.g. pomodoro_widget.TkDispatcher (Tk must not be called from
+            the worker threads); None calls on_result
+            directly on the worker thread
+
+    Python threads cannot be killed, so a timeout reports a TimeoutError
+    result as soon as it expires and discards the late return value; the
+    handler keeps its worker until it returns. ShellCommand enforces its
+    own timeout by killing the child process.
+    """
+
+    def __init__(self, workers=2, queue_size=16, timeout=10.0, dispatcher=None):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.dispatcher = dispatcher
+        self.published = 0
+
+        self._subscriptions = []
+        self._routes = {}
+        self._ready = queue.SimpleQueue()
+        self._threads = []
+        self._closed = False
+        self._lock = threading.Lock()
+
+        # Watchdog for handler timeouts: heap of (deadline, seq, call)
+        self._deadlines = []
+        self._deadline_seq = itertools.count()
+        self._watch = threading.Condition()
+        self._watchdog = None
+
+        # Handler results waiting for the dispatcher; one dispatch carries them all
+        self._results = deque()
+        self._flush_scheduled = False
+
+    # Subscribing
+
+    def subscribe(self, event, handler, timeout=None, policy="drop", queue_size=None,
+                  on_result=None, name=None):
+        """
+        Call handler(TimerEvent) for `event` (or ANY) on a worker thread.
+
+        on_result(HandlerResult) runs through the dispatcher after each
+        call, including failed and timed-out ones. Returns the
+        Subscription, for unsubscribe() and metrics.
+        """
+        if event != ANY and event not in EVENTS:
+            raise ValueError(f"unknown event {event!r}")
+        name = name or getattr(handler, "__name__", None) or repr(handler)
+        with self._lock:
+            taken = {sub.name for sub in self._subscriptions}
+            base, n = name, 1
+            while name in taken:
+                n += 1
+                name = f"{base}#{n}"
+            subscription = Subscription(
+                name, event, handler,
+                self.timeout if timeout is None else timeout,
+                policy, queue_size or self.queue_size, on_result
+            )
+            self._subscriptions.append(subscription)
+            self._rebuild_routes()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Stop delivering to a subscription and discard its queue."""
+        with subscription.lock:
+            subscription.active = False
+            subscription.pending.clear()
+        with self._lock:
+            self._subscriptions.remove(subscription)
+            self._rebuild_routes()
+
+    def _rebuild_routes(self):
+        # Published events look up one tuple; no locking on the hot path
+        self._routes = {
+            event: tuple(sub for sub in self._subscriptions if sub.event in (event, ANY))
+            for event in EVENTS
+        }
+
+    # Publishing
+
+    def attach(self, timer):
+        """Publish a timer's state transitions (PomodoroTimer or RemoteTimer)."""
+        timer.listeners.append(lambda name, t: self.publish(TimerEvent.from_timer(name, t)))
+
+    def publish(self, event):
+        """Queue an event for its subscribers; never blocks on a handler."""
+        if self._closed:
+            return
+        self.published += 1
+        now = time.perf_counter()
+        for subscription in self._routes.get(event.name, ()):
+            if subscription.offer(event, now):
+                if not self._threads:
+                    self._start_workers()
+                self._ready.put(subscription)
+
+    def _start_workers(self):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker, daemon=True,
+                                          name=f"event-bus-{len(self._threads)}")
+                thread.start()
+                self._threads.append(thread)
+            if self._watchdog is None:
+                self._watchdog = threading.Thread(target=self._watch_loop, daemon=True,
+                                                  name="event-bus-watchdog")
+                self._watchdog.start()
+
+    # Workers
+
+    def _worker(self):
+        while True:
+            subscription = self._ready.get()
+            if subscription is None:
+                return
+            self._run_next(subscription)
+
+    def _run_next(self, subscription):
+        """Run one queued event, then requeue the subscription if it has more."""
+        with subscription.lock:
+            if not subscription.pending or self._closed:
+                subscription.busy = False
+                return
+            event, queued = subscription.pending.popleft()
+
+        started = time.perf_counter()
+        call = _Call(subscription, event, started)
+        if subscription.timeout is not None:
+            with self._watch:
+                heapq.heappush(self._deadlines,
+                               (started + subscription.timeout, next(self._deadline_seq), call))
+                self._watch.notify()
+
+        value = error = None
+        try:
+            value = subscription.handler(event)
+        except Exception as e:
+            error = e
+        finished = time.perf_counter()
+
+        with self._watch:
+            call.finished = True
+            expired = call.expired
+
+        with subscription.lock:
+            subscription.calls += 1
+            subscription.latency.record(int((finished - started) * 1e6))
+            subscription.wait.record(int((started - queued) * 1e6))
+            if error is not None:
+                subscription.errors += 1
+            more = bool(subscription.pending) and not self._closed
+            subscription.busy = more
+        if more:
+            self._ready.put(subscription)
+
+        if not expired:
+            self._deliver(subscription, HandlerResult(
+                subscription.name, event, value, error, finished - started
+            ))
+
+    def _watch_loop(self):
+        while True:
+            call = self._next_expired()
+            if call is None:
+                return
+            subscription = call.subscription
+            with subscription.lock:
+                subscription.timeouts += 1
+            # Delivered outside the watch lock: the dispatcher may block
+            # until the consumer's thread picks it up
+            self._deliver(subscription, HandlerResult(
+                subscription.name, call.event, None,
+                TimeoutError(f"{subscription.name} exceeded {subscription.timeout:g} s"),
+                subscription.timeout
+            ))
+
+    def _next_expired(self):
+        """Wait for a running call to pass its deadline; None once closed."""
+        with self._watch:
+            while not self._closed:
+                if not self._deadlines:
+                    self._watch.wait()
+                    continue
+                deadline, _, call = self._deadlines[0]
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    self._watch.wait(delay)
+                    continue
+                heapq.heappop(self._deadlines)
+                if not call.finished:
+                    call.expired = True
+                    return call
+            return None
+
+    # Results
+
+    def _deliver(self, subscription, result):
+        if subscription.on_result is None:
+            return
+        if self.dispatcher is None:
+            subscription.on_result(result)
+            return
+        with self._lock:
+            self._results.append((subscription.on_result, result))
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        try:
+            self.dispatcher(self._flush_results)
+        except RuntimeError:
+            # Consumer's loop has gone (window closing); results are dropped
+            with self._lock:
+                self._results.clear()
+                self._flush_scheduled = False
+
+    def _flush_results(self):
+        with self._lock:
+            results = list(self._results)
+            self._results.clear()
+            self._flush_scheduled = False
+        for on_result, result in results:
+            on_result(result)
+
+    # Lifecycle and metrics
+
+    def wait_idle(self, timeout=None):
+        """Block until no handler is queued or running. Returns True if idle."""
+        end = None if timeout is None else time.perf_counter() + timeout
+        while any(sub.busy for sub in list(self._subscriptions)):
+            if end is not None and time.perf_counter() >= end:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def close(self):
+        """Discard queued events and stop the workers (running handlers finish on their own)."""
+        self._closed = True
+        for subscription in list(self._subscriptions):
+            with subscription.lock:
+                subscription.pending.clear()
+        for _ in self._threads:
+            self._ready.put(None)
+        with self._watch:
+            self._watch.notify()
+
+    def metrics(self):
+        """Return bus and per-subscription counters as a JSON-ready dict."""
+        subscriptions = {sub.name: sub.metrics() for sub in list(self._subscriptions)}
+        return {
+            "published": self.published,
+            "workers": self.workers,
+            "queue_depth": sum(s["queue_depth"] for s in subscriptions.values()),
+            "subscriptions": subscriptions,
+        }
+
+
+class ShellCommand:
+    """
+    Handler that runs a shell command with the event in its environment
+    (POMODORO_EVENT, POMODORO_MINUTES, POMODORO_REMAINING, POMODORO_ELAPSED).
+    The child is killed if it outlives `timeout`.
+    """
+
+    def __init__(self, command, timeout=None):
+        self.command = command
+        self.timeout = timeout
+        self.__name__ = command.split()[0] if command.strip() else "shell"
+
+    def __call__(self, event):
+        env = dict(
+            os.environ,
+            POMODORO_EVENT=event.name,
+            POMODORO_MINUTES=str(event.minutes),
+            POMODORO_REMAINING=str(event.remaining_seconds),
+            POMODORO_ELAPSED=str(event.elapsed_seconds),
+        )
+        try:
+            completed = subprocess.run(self.command, shell=True, env=env, timeout=self.timeout,
+                                       capture_output=True, text=True)
+        except subprocess.TimeoutExpired:
+            raise TimeoutError(f"{self.command!r} killed after {self.timeout:g} s") from None
+        if completed.returncode:
+            message = completed.stderr.strip()[:200]
+            raise RuntimeError(f"{self.command!r} exited with {completed.returncode}: {message}")
+        return completed.stdout.strip()
+
+
+def run_benchmark(events=2000):
+    """Publish against slow, hung and failing handlers and report the cost."""
+    results = []
+    bus = EventBus(workers=2, queue_size=8, timeout=0.05)
+
+    def slow(event):
+        time.sleep(0.01)
+
+    def hung(event):
+        time.sleep(0.2)
+
+    def failing(event):
+        raise RuntimeError("boom")
+
+    bus.subscribe(ANY, slow, policy="coalesce", on_result=results.append)
+    bus.subscribe(ANY, hung, policy="drop", on_result=results.append)
+    bus.subscribe("complete", failing, on_result=results.append)
+
+    publish_ns = []
+    names = itertools.cycle(EVENTS)
+    for i in range(events):
+        event = TimerEvent(next(names), 25, 1500, 1500 - i % 1500, time.time())
+        started = time.perf_counter_ns()
+        bus.publish(event)
+        publish_ns.append(time.perf_counter_ns() - started)
+    idle = bus.wait_idle(timeout=5)
+    metrics = bus.metrics()
+    bus.close()
+
+    publish_ns.sort()
+    print(f"Published:        {events} events to {len(metrics['subscriptions'])} handlers")
+    print(f"Publish cost:     p50 {publish_ns[len(publish_ns) // 2] / 1000:.1f} us, "
+          f"p99 {publish_ns[int(len(publish_ns) * 0.99)] / 1000:.1f} us, "
+          f"max {publish_ns[-1] / 1000:.1f} us")
+    for name, sub in metrics["subscriptions"].items():
+        print(f"  {name:<8} calls {sub['calls']:>4}  dropped {sub['dropped']:>4}  "
+              f"coalesced {sub['coalesced']:>4}  timeouts {sub['timeouts']:>2}  "
+              f"errors {sub['errors']:>3}  depth max {sub['queue_depth_max']}  "
+              f"latency p99 {sub['latency_us']['p99'] / 1000:.1f} ms")
+    print(f"Results:          {len(results)} delivered, drained {'ok' if idle else 'TIMED OUT'}")
+    return idle and publish_ns[int(len(publish_ns) * 0.99)] < 1_000_000
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Timer event bus utilities")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Measure publish cost with slow, hung and failing handlers")
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sys.exit(0 if run_benchmark() else 1)
+    parser.print_help()
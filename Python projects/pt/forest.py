@@ -0,0 +1,216 @@
+"""
+A forest of binary trees on one canvas, e.g. one tree per team member.
+Trees that share a shape share one table of leaf offsets, rows, columns
+and bit flags; each tree's layout is that table moved to its origin,
+seeded into the shared layout cache before the first frame. (A NumPy
+broadcast of the offsets was no faster: the drawing code needs one
+LeafPosition per leaf, and building those dominates.)
+
+Usage:
+    python forest.py --trees 50 --rows 16      # live forest of countdowns (seconds in binary)
+    python forest.py --benchmark               # headless layout and tick timings
+"""
+
+import math
+import random
+import time
+
+from pomodoro_widget import (
+    BinaryChristmasTree, GlyphCache, LeafPosition, TreeLayout,
+    _layout_cache, tree_leaf_offsets
+)
+
+
+def seed_layouts(trees):
+    """
+    Compute the layouts of many trees at once and store them in the
+    shared layout cache. Returns how many layouts were computed.
+    """
+    # Trees whose layout is missing, grouped by shape (everything in the
+    # layout key except the origin)
+    shapes = {}
+    for tree in trees:
+        key = tree._layout_params()
+        if key not in _layout_cache:
+            shapes.setdefault(key[2:], {})[key] = tree
+
+    computed = 0
+    for shape, keyed in shapes.items():
+        tree_height, rows, leaf_size, spread, bits = shape
+        offsets = tree_leaf_offsets(tree_height, rows, spread)
+
+        # Everything but the origin, once per shape
+        first_bit = len(offsets) - bits
+        leaves = [(dx, dy, row, col, i >= first_bit)
+                  for i, (dx, dy, row, col) in enumerate(offsets)]
+
+        for key in keyed:
+            x, y = key[:2]
+            positions = [
+                LeafPosition(x + dx, y + dy, row, col, leaf_size, is_bit)
+                for dx, dy, row, col, is_bit in leaves
+            ]
+            _layout_cache[key] = TreeLayout(key, positions, bits)
+            computed += 1
+    return computed
+
+
+class Forest:
+    """
+    N trees in a grid on one canvas, sharing one glyph cache.
+
+    Args:
+        canvas: Tk Canvas (or RecordingCanvas)
+        count: Number of trees
+        columns: Trees per grid row (default: about twice as wide as tall)
+        rows: Leaf rows per tree
+        bits: Leaves showing each tree's value (12 fits 60:00 in seconds)
+        cell: (width, height) of one tree's grid cell in pixels
+    """
+
+    def __init__(self, canvas, count, columns=None, rows=16, bits=12, cell=(110, 170),
+                 glyph_cache=None):
+        self.canvas = canvas
+        self.columns = columns or max(1, math.ceil(math.sqrt(count * 2)))
+        self.cell_width, self.cell_height = cell
+        self.glyphs = glyph_cache or GlyphCache(canvas)
+
+        self.trees = []
+        for index in range(count):
+            grid_row, grid_col = divmod(index, self.columns)
+            self.trees.append(BinaryChristmasTree(
+                canvas,
+                center_x=grid_col * self.cell_width + self.cell_width // 2,
+                base_y=(grid_row + 1) * self.cell_height - 30,
+                tree_height=self.cell_height - 50,
+                glyph_cache=self.glyphs,
+                rows=rows,
+                bits=bits,
+                spread=self.cell_width * 0.42
+            ))
+        seed_layouts(self.trees)
+
+        self.min_growth = max((tree.value_growth() for tree in self.trees), default=0)
+        self.frame_ops = 0
+
+    @property
+    def width(self):
+        return self.columns * self.cell_width
+
+    @property
+    def height(self):
+        return math.ceil(len(self.trees) / self.columns) * self.cell_height
+
+    def draw(self, values, growths):
+        """Draw every tree; only leaves that changed touch the canvas."""
+        ops = 0
+        for tree, value, growth in zip(self.trees, values, growths):
+            tree.draw_tree(value, max(self.min_growth, growth))
+            ops += tree.frame_ops
+        self.frame_ops = ops
+        return ops
+
+
+class Countdowns:
+    """Independent countdowns (one per tree) with random lengths and head starts."""
+
+    def __init__(self, count, seed=None, now=0.0):
+        rng = random.Random(seed)
+        self.totals = [rng.randint(5, 60) * 60 for _ in range(count)]
+        self.deadlines = [now + rng.uniform(0.2, 1.0) * total for total in self.totals]
+
+    def state(self, now):
+        """Return (remaining seconds, growth percent) lists at a time."""
+        remaining = [max(0, math.ceil(deadline - now)) for deadline in self.deadlines]
+        growths = [(total - left) / total * 100 for total, left in zip(self.totals, remaining)]
+        return remaining, growths
+
+
+def run_benchmark(trees=50, rows=16, bits=12, ticks=600):
+    """Lay out and tick a forest on a RecordingCanvas; return True if ticks fit a 60 Hz frame."""
+    from recording_canvas import RecordingCanvas
+
+    canvas = RecordingCanvas()
+    print(f"Forest:           {trees} trees x {rows} rows, {bits} bits each")
+
+    forest = Forest(canvas, trees, rows=rows, bits=bits)
+
+    # Layout from an empty cache, best of 5
+    best = math.inf
+    for _ in range(5):
+        _layout_cache.clear()
+        started = time.perf_counter()
+        seed_layouts(forest.trees)
+        best = min(best, time.perf_counter() - started)
+    print(f"Layout:           {best * 1000:.2f} ms")
+
+    leaves = sum(len(tree._get_layout().positions) for tree in forest.trees)
+    countdowns = Countdowns(trees, seed=1)
+    values, growths = countdowns.state(0.0)
+    started = time.perf_counter()
+    first_ops = forest.draw(values, growths)
+    first_frame = time.perf_counter() - started
+    print(f"Leaves:           {leaves} ({canvas.alive()} canvas items)")
+    print(f"First frame:      {first_frame * 1000:.1f} ms, {first_ops} canvas calls")
+
+    tick_times = []
+    tick_ops = []
+    for second in range(1, ticks + 1):
+        values, growths = countdowns.state(float(second))
+        started = time.perf_counter()
+        tick_ops.append(forest.draw(values, growths))
+        tick_times.append(time.perf_counter() - started)
+
+    tick_times.sort()
+    p50 = tick_times[len(tick_times) // 2] * 1000
+    p99 = tick_times[int(len(tick_times) * 0.99)] * 1000
+    print(f"Tick (all trees): p50 {p50:.2f} ms, p99 {p99:.2f} ms, max {tick_times[-1] * 1000:.2f} ms")
+    print(f"Canvas calls:     {sum(tick_ops) / len(tick_ops):.0f} per tick "
+          f"(of {leaves} leaves)")
+    return p99 < 16
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="A forest of binary trees on one canvas")
+    parser.add_argument("--trees", type=int, default=50, help="Number of trees")
+    parser.add_argument("--rows", type=int, default=16, help="Leaf rows per tree")
+    parser.add_argument("--bits", type=int, default=12, help="Leaves showing each value")
+    parser.add_argument("--columns", type=int, help="Trees per grid row")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Time layout and ticks headlessly (no display needed)")
+
+    args = parser.parse_args()
+    if not 2 <= args.rows <= 32:
+        parser.error("--rows must be between 2 and 32")
+    leaves = args.rows * (args.rows + 1) // 2
+    if not 1 <= args.bits <= leaves:
+        parser.error(f"--bits must be between 1 and {leaves} (a tree of {args.rows} rows has {leaves} leaves)")
+    if args.trees < 1:
+        parser.error("--trees must be at least 1")
+
+    if args.benchmark:
+        sys.exit(0 if run_benchmark(args.trees, args.rows, args.bits) else 1)
+
+    import tkinter as tk
+
+    root = tk.Tk()
+    root.title("Binary Forest")
+    root.configure(bg="#0a1a0a")
+    canvas = tk.Canvas(root, bg="#0a1a0a", highlightthickness=0)
+    canvas.pack()
+    forest = Forest(canvas, args.trees, columns=args.columns, rows=args.rows, bits=args.bits,
+                    glyph_cache=GlyphCache(root))
+    canvas.configure(width=forest.width, height=forest.height)
+    countdowns = Countdowns(args.trees, now=time.monotonic())
+
+    def tick():
+        now = time.monotonic()
+        forest.draw(*countdowns.state(now))
+        # Wake just after the next second boundary of the countdowns
+        root.after(1000 - int((now % 1) * 1000) + 5, tick)
+
+    tick()
+    root.mainloop()
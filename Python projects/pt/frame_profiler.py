@@ -0,0 +1,321 @@
+"""
+Opt-in frame profiling for the Binary Pomodoro widget.
+FrameProfiler wraps the widget's hot-path methods on the instance, records
+their durations in HDR-style histograms, tracks live canvas items and
+timer wake-up lateness, draws a toggleable overlay on the tree canvas and
+periodically writes everything to a JSON metrics file.
+
+Usage:
+    python pomodoro_widget.py --profile-frames    # middle-click or F3 toggles the overlay
+    python frame_profiler.py --benchmark          # histogram cost and accuracy
+"""
+
+import json
+import math
+import os
+import time
+from array import array
+
+
+def default_metrics_path():
+    """Return the per-user metrics file location."""
+    return os.path.join(os.path.expanduser("~"), ".binary_pomodoro", "metrics.json")
+
+
+class HdrHistogram:
+    """
+    Log-linear histogram of non-negative integers (microseconds here).
+
+    Values are grouped by power of two and each group is split into
+    2**sub_bits linear buckets, so any recorded value is known to within
+    1 part in 2**(sub_bits - 1) at every magnitude, in fixed memory.
+    Values above `highest` are clamped.
+    """
+
+    def __init__(self, highest=60_000_000, sub_bits=7):
+        self.highest = highest
+        self.sub_bits = sub_bits
+        self.sub_count = 1 << sub_bits
+        groups = max(1, highest.bit_length() - sub_bits + 1)
+        self.counts = array("Q", bytes(8 * groups * self.sub_count))
+        self.total = 0
+        self.sum = 0
+        self.min = None
+        self.max = 0
+
+    def _upper(self, index):
+        """Highest value that lands in a bucket."""
+        shift, sub = divmod(index, self.sub_count)
+        return ((sub + 1) << shift) - 1
+
+    def record(self, value):
+        """Add one integer value."""
+        if value > self.highest:
+            value = self.highest
+        elif value < 0:
+            value = 0
+        shift = value.bit_length() - self.sub_bits
+        if shift < 0:
+            shift = 0
+        self.counts[(shift << self.sub_bits) + (value >> shift)] += 1
+        self.total += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        """Return the value at percentile p (0-100), within bucket precision."""
+        if not self.total:
+            return 0
+        rank = max(1, math.ceil(self.total * p / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                seen += count
+                if seen >= rank:
+                    return min(self._upper(index), self.max)
+        return self.max
+
+    def mean(self):
+        return self.sum / self.total if self.total else 0.0
+
+    def to_dict(self, buckets=False):
+        """Return summary statistics, optionally with the non-empty buckets."""
+        summary = {
+            "count": self.total,
+            "min": self.min or 0,
+            "mean": round(self.mean(), 1),
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+            "max": self.max,
+        }
+        if buckets:
+            summary["buckets"] = [
+                [self._upper(index), count] for index, count in enumerate(self.counts) if count
+            ]
+        return summary
+
+
+class FrameProfiler:
+    """
+    Instrumentation around a PomodoroWidget's redraw path.
+
+    Hooks replace methods on the widget instance (not the class), so
+    other widgets are unaffected and the overhead is zero when the
+    profiler is not installed. A frame is one _render_tick; items,
+    lateness, overlay and export are handled after its timing stops.
+    """
+
+    HOOKS = ("_update_display", "_update_tree", "_draw_play_button")
+    OVERLAY_TAG = "perf_overlay"
+
+    def __init__(self, widget, metrics_path=None, export_interval=30.0):
+        self.widget = widget
+        self.metrics_path = metrics_path or default_metrics_path()
+        self.export_interval = export_interval
+
+        self.frames = HdrHistogram()
+        self.lateness = HdrHistogram()
+        self.hooks = {name: HdrHistogram() for name in ("_update",) + self.HOOKS + ("draw_tree",)}
+        self.canvas_items = 0
+        self.canvas_items_max = 0
+        self.exports = 0
+
+        self._jitter_seen = 0
+        self._last_export = time.monotonic()
+        self._overlay_visible = False
+        self._overlay_ids = None
+
+        # The update loop lives on the widget's TimerController; its
+        # histogram keeps the "_update" name. In a TreeGroup the group's
+        # tick calls show_tick() for each widget whose second changed
+        loop = "update" if widget.group is None else "show_tick"
+        self._instrument(widget.controller, loop, self.hooks["_update"])
+        for name in self.HOOKS:
+            self._instrument(widget, name, self.hooks[name])
+        self._instrument(widget.tree, "draw_tree", self.hooks["draw_tree"])
+        self._instrument_frame()
+
+        widget.canvas.bind("<Button-2>", self.toggle_overlay)
+        widget.root.bind("<F3>", self.toggle_overlay)
+
+    # Hooks
+
+    @staticmethod
+    def _instrument(owner, name, histogram):
+        original = getattr(owner, name)
+        clock = time.perf_counter_ns
+        record = histogram.record
+
+        def timed(*args, **kwargs):
+            started = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                record((clock() - started) // 1000)
+
+        setattr(owner, name, timed)
+
+    def _instrument_frame(self):
+        widget = self.widget
+        original = widget._render_tick
+        clock = time.perf_counter_ns
+
+        def frame():
+            started = clock()
+            original()
+            self.frames.record((clock() - started) // 1000)
+            self._after_frame()
+
+        widget._render_tick = frame
+
+    def _after_frame(self):
+        widget = self.widget
+
+        items = len(widget.canvas.find_all()) + len(widget.play_btn.find_all())
+        if self._overlay_ids is not None:
+            items -= len(self._overlay_ids)
+        self.canvas_items = items
+        self.canvas_items_max = max(self.canvas_items_max, items)
+
+        jitter = widget.timer.jitter_stats()
+        if jitter["count"] > self._jitter_seen:
+            self._jitter_seen = jitter["count"]
+            self.lateness.record(int(jitter["last_ms"] * 1000))
+
+        if self._overlay_visible:
+            self._refresh_overlay()
+        if time.monotonic() - self._last_export >= self.export_interval:
+            self.export()
+
+    # Overlay
+
+    def overlay_lines(self):
+        frames = self.frames
+        return [
+            f"frame p50 {frames.percentile(50) / 1000:.2f} p99 {frames.percentile(99) / 1000:.2f} "
+            f"max {frames.max / 1000:.2f} ms",
+            f"frames {frames.total}  items {self.canvas_items} (max {self.canvas_items_max})",
+            f"late p50 {self.lateness.percentile(50) / 1000:.1f} "
+            f"p99 {self.lateness.percentile(99) / 1000:.1f} ms",
+        ]
+
+    def toggle_overlay(self, event=None):
+        """Show or hide the metrics overlay on the tree canvas."""
+        canvas = self.widget.canvas
+        if self._overlay_ids is None:
+            background = canvas.create_rectangle(
+                2, 2, 2, 2, fill=self.widget.bg_color, outline=self.widget.accent_color,
+                tags=self.OVERLAY_TAG
+            )
+            text = canvas.create_text(
+                6, 5, anchor="nw", text="", fill=self.widget.highlight_color,
+                font=("Consolas", 8), tags=self.OVERLAY_TAG
+            )
+            self._overlay_ids = (background, text)
+
+        self._overlay_visible = not self._overlay_visible
+        if self._overlay_visible:
+            self._refresh_overlay()
+            canvas.tag_raise(self.OVERLAY_TAG)
+        canvas.itemconfigure(self.OVERLAY_TAG, state="normal" if self._overlay_visible else "hidden")
+
+    def _refresh_overlay(self):
+        canvas = self.widget.canvas
+        background, text = self._overlay_ids
+        canvas.itemconfigure(text, text="\n".join(self.overlay_lines()))
+        box = canvas.bbox(text)
+        if box:
+            canvas.coords(background, box[0] - 4, box[1] - 3, box[2] + 4, box[3] + 3)
+
+    # Export
+
+    def metrics(self):
+        """Return every collected number as a JSON-ready dict (times in us)."""
+        widget = self.widget
+        return {
+            "timestamp": time.time(),
+            "pid": os.getpid(),
+            "frames": self.frames.to_dict(buckets=True),
+            "hooks": {name: hist.to_dict() for name, hist in self.hooks.items()},
+            "lateness": self.lateness.to_dict(buckets=True),
+            "canvas_items": {"current": self.canvas_items, "max": self.canvas_items_max},
+            "timer_jitter_ms": widget.timer.jitter_stats(),
+            "startup_ms": widget.startup.as_dict(),
+            "event_bus": widget.events.metrics() if widget.events is not None else None,
+        }
+
+    def export(self):
+        """Write the metrics file atomically (temp file, then rename)."""
+        self._last_export = time.monotonic()
+        directory = os.path.dirname(self.metrics_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.metrics_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.metrics(), f, indent=1)
+        os.replace(temp_path, self.metrics_path)
+        self.exports += 1
+
+
+def run_benchmark(samples=200_000, seed=0):
+    """Measure recording cost and percentile error against exact sorting."""
+    import random
+
+    rng = random.Random(seed)
+    values = [int(rng.lognormvariate(6, 1.2)) for _ in range(samples)]
+
+    histogram = HdrHistogram()
+    started = time.perf_counter()
+    for value in values:
+        histogram.record(value)
+    record_ns = (time.perf_counter() - started) / samples * 1e9
+
+    values.sort()
+    worst = 0.0
+    print(f"Samples:          {samples}")
+    print(f"Record cost:      {record_ns:.0f} ns per value")
+    print(f"Memory:           {len(histogram.counts) * 8 / 1024:.0f} KiB of buckets")
+    for p in (50, 90, 99, 99.9):
+        exact = values[max(0, math.ceil(samples * p / 100) - 1)]
+        approx = histogram.percentile(p)
+        error = abs(approx - exact) / exact if exact else 0.0
+        worst = max(worst, error)
+        print(f"p{p:<5}           exact {exact:>7} us, histogram {approx:>7} us ({error * 100:.2f}% off)")
+    return worst <= 2 / histogram.sub_count
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Frame profiler utilities")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Measure histogram recording cost and accuracy")
+    parser.add_argument("--show", nargs="?", const=default_metrics_path(), metavar="PATH",
+                        help="Print a summary of an exported metrics file")
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sys.exit(0 if run_benchmark() else 1)
+
+    path = args.show or default_metrics_path()
+    try:
+        with open(path, encoding="utf-8") as f:
+            metrics = json.load(f)
+    except FileNotFoundError:
+        print(f"No metrics at {path}; run the widget with --profile-frames")
+        sys.exit(1)
+    frames = metrics["frames"]
+    print(f"Frames:   {frames['count']}  p50 {frames['p50']} us  p99 {frames['p99']} us  "
+          f"max {frames['max']} us")
+    for name, hook in metrics["hooks"].items():
+        print(f"  {name:<18} p50 {hook['p50']:>6} us  p99 {hook['p99']:>6} us  max {hook['max']:>6} us")
+    lateness = metrics["lateness"]
+    print(f"Lateness: p50 {lateness['p50']} us  p99 {lateness['p99']} us  max {lateness['max']} us")
+    print(f"Canvas items: {metrics['canvas_items']['current']} (max {metrics['canvas_items']['max']})")
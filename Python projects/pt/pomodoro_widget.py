@@ -4,8 +4,363 @@ A visual Pomodoro timer with a growing Christmas tree visualization.
 The tree displays timer value in binary format.
 """
 
+import time
+
+# Launch reference point for --profile-startup (taken before tkinter loads)
+_IMPORT_STARTED = time.perf_counter()
+
 import tkinter as tk
+import tkinter.font as tkfont
+import functools
 import math
+from collections import OrderedDict
+
+
+def ease_out_cubic(t):
+    """Easing curve that starts fast and settles gently."""
+    return 1 - (1 - t) ** 3
+
+
+def ease_linear(t):
+    """Easing curve with constant speed."""
+    return t
+
+
+def blend_color(color_a, color_b, t):
+    """Blend two '#rrggbb' colours; t=0 gives color_a, t=1 gives color_b."""
+    a = int(color_a[1:], 16)
+    b = int(color_b[1:], 16)
+    channels = []
+    for shift in (16, 8, 0):
+        ca = (a >> shift) & 0xFF
+        cb = (b >> shift) & 0xFF
+        channels.append(round(ca + (cb - ca) * t))
+    return "#{:02x}{:02x}{:02x}".format(*channels)
+
+
+class Tween:
+    """A value moving from start to end over duration seconds."""
+    
+    __slots__ = ("apply", "start", "end", "duration", "started", "easing")
+    
+    def __init__(self, apply, start, end, duration, started, easing):
+        self.apply = apply
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.started = started
+        self.easing = easing
+
+
+class Animator:
+    """
+    Frame scheduler for short tweens (leaf growth, completion flash).
+    
+    Frames run at up to max_fps, and only while a tween is active: with
+    nothing moving no frame is scheduled at all. Each frame's render time
+    is measured; while the smoothed cost exceeds budget_ms the frame rate
+    is lowered (down to min_fps), and raised again once frames fit.
+    """
+    
+    def __init__(self, clock, max_fps=60, min_fps=10, budget_ms=8.0):
+        self.clock = clock
+        self.max_fps = max_fps
+        self.min_fps = min_fps
+        self.budget = budget_ms / 1000
+        self.fps = max_fps
+        
+        self._tweens = {}
+        self._after_id = None
+        
+        self.frames = 0
+        self.slow_frames = 0
+        self.last_frame_ms = 0.0
+        self._frame_avg = 0.0
+    
+    def animate(self, key, apply, duration, start=0.0, end=1.0, easing=ease_out_cubic):
+        """
+        Start a tween, replacing any running tween with the same key.
+        
+        Args:
+            key: Identifies the tween, for replacing or cancelling it
+            apply: Called with the current value on every frame
+            duration: Length of the tween in seconds
+            start, end: Values at the beginning and end of the tween
+            easing: Maps 0-1 time to 0-1 progress
+        """
+        self._tweens[key] = Tween(apply, start, end, duration,
+                                  self.clock.monotonic(), easing)
+        self._arm()
+    
+    def cancel(self, key):
+        """Stop a tween without applying its end value."""
+        self._tweens.pop(key, None)
+        if not self._tweens and self._after_id is not None:
+            self.clock.after_cancel(self._after_id)
+            self._after_id = None
+    
+    def is_active(self):
+        """Return True while any tween is running."""
+        return bool(self._tweens)
+    
+    def _arm(self):
+        if self._after_id is None:
+            self._after_id = self.clock.after(max(1, int(1000 / self.fps)), self._frame)
+    
+    def _frame(self):
+        """Advance every tween by one frame."""
+        self._after_id = None
+        now = self.clock.monotonic()
+        started = time.perf_counter()
+        
+        for key, tween in list(self._tweens.items()):
+            if tween.duration > 0:
+                t = min(1.0, (now - tween.started) / tween.duration)
+            else:
+                t = 1.0
+            tween.apply(tween.start + (tween.end - tween.start) * tween.easing(t))
+            if t >= 1.0 and self._tweens.get(key) is tween:
+                del self._tweens[key]
+        
+        elapsed = time.perf_counter() - started
+        self.frames += 1
+        self.last_frame_ms = elapsed * 1000
+        self._adapt(elapsed)
+        
+        if self._tweens:
+            self._arm()
+    
+    def _adapt(self, elapsed):
+        """Lower the frame rate while frames go over budget, recover when they fit."""
+        # Smooth the cost so a single slow frame does not halve the rate
+        if self.frames == 1:
+            self._frame_avg = elapsed
+        else:
+            self._frame_avg = 0.8 * self._frame_avg + 0.2 * elapsed
+        
+        if self._frame_avg > self.budget:
+            self.slow_frames += 1
+            self.fps = max(self.min_fps, int(self.fps * 0.75))
+        elif self._frame_avg < self.budget / 2 and self.fps < self.max_fps:
+            self.fps = min(self.max_fps, self.fps + 5)
+    
+    def stats(self):
+        """Return frame counters and the current frame rate."""
+        return {
+            "fps": self.fps,
+            "frames": self.frames,
+            "slow_frames": self.slow_frames,
+            "last_frame_ms": self.last_frame_ms,
+            "avg_frame_ms": self._frame_avg * 1000,
+            "active_tweens": len(self._tweens),
+        }
+
+
+class LeafPosition:
+    """Precomputed position of a single leaf."""
+    
+    __slots__ = ("x", "y", "row", "col", "size", "is_binary_row")
+    
+    def __init__(self, x, y, row, col, size, is_binary_row):
+        self.x = x
+        self.y = y
+        self.row = row
+        self.col = col
+        self.size = size
+        self.is_binary_row = is_binary_row
+
+
+def _growth_factor(index, visible_count):
+    """Return 0-1 growth of a leaf: older (lower) leaves are smaller."""
+    return index / max(1, visible_count - 1) if visible_count > 1 else 1
+
+
+def _leaf_font_size(size, growth_factor):
+    """Return the digit font size for a leaf at a growth factor."""
+    # Animate size based on growth
+    animated_size = size * (0.7 + 0.3 * growth_factor)
+    
+    # Font size for clean, readable digits
+    return int(animated_size * 1.1)
+
+
+def tree_leaf_offsets(tree_height, rows, spread):
+    """
+    Return (dx, dy, row, col) for every leaf of a tree shape, relative to
+    (center_x, base_y), top to bottom and left to right. The offsets only
+    depend on the shape, so trees that differ in position share them.
+    """
+    key = (tree_height, rows, spread)
+    offsets = _offset_cache.get(key)
+    if offsets is None:
+        num_rows = len(rows)
+        row_spacing = tree_height / (num_rows + 1)
+        offsets = []
+        for row_idx, num_leaves in enumerate(rows):
+            dy = (row_idx + 1) * row_spacing - tree_height
+            
+            # Rows widen towards the bottom; leaves are spread evenly
+            row_spread = (spread * (row_idx + 1)) / num_rows
+            for i in range(num_leaves):
+                dx = 0 if num_leaves == 1 else -row_spread + i * (2 * row_spread / (num_leaves - 1))
+                offsets.append((dx, dy, row_idx, i))
+        offsets = tuple(offsets)
+        _offset_cache[key] = offsets
+    return offsets
+
+
+class TreeLayout:
+    """
+    Leaf positions for one tree geometry.
+    
+    positions runs top to bottom (row by row, left to right);
+    growth_order is the same leaves bottom to top, the order they appear in.
+    Leaf sets are represented as int bitmasks over growth_order indices.
+    
+    The value is shown on the first `bits` leaves in growth order: the
+    bottom row from the right (LSB) to the left, continuing on the row
+    above when there are more bits than bottom leaves. Bit i is leaf i,
+    so the digit mask of a value is the value itself.
+    """
+    
+    __slots__ = ("key", "positions", "growth_order", "bits", "max_value",
+                 "_font_sizes", "_size_masks")
+    
+    def __init__(self, key, positions, bits=None):
+        self.key = key
+        self.positions = tuple(positions)
+        self.growth_order = self.positions[::-1]
+        
+        if bits is None:
+            bits = sum(1 for pos in self.positions if pos.is_binary_row)
+        self.bits = min(bits, len(self.positions))
+        self.max_value = (1 << self.bits) - 1
+        
+        self._font_sizes = {}
+        self._size_masks = {}
+    
+    @property
+    def binary_bits(self):
+        """(leaf index, bit number) for each leaf that carries a bit."""
+        return tuple((i, i) for i in range(self.bits))
+    
+    def digit_mask(self, value):
+        """Return the mask of leaves that show '1' for a value (clamped to max_value)."""
+        return min(max(0, value), self.max_value)
+    
+    def value_growth(self):
+        """Return the smallest growth percent at which every bit leaf is shown."""
+        return math.ceil(self.bits * 100 / len(self.positions)) if self.positions else 0
+    
+    def font_sizes(self, visible_count):
+        """Return the font size of each visible leaf for a visible count."""
+        sizes = self._font_sizes.get(visible_count)
+        if sizes is None:
+            sizes = tuple(
+                _leaf_font_size(pos.size, _growth_factor(i, visible_count))
+                for i, pos in enumerate(self.growth_order[:visible_count])
+            )
+            self._font_sizes[visible_count] = sizes
+        return sizes
+    
+    def size_change_mask(self, old_count, new_count):
+        """Return the mask of leaves whose font size differs between two visible counts."""
+        key = (old_count, new_count)
+        mask = self._size_masks.get(key)
+        if mask is None:
+            old_sizes = self.font_sizes(old_count)
+            new_sizes = self.font_sizes(new_count)
+            mask = 0
+            for i in range(min(len(old_sizes), len(new_sizes))):
+                if old_sizes[i] != new_sizes[i]:
+                    mask |= 1 << i
+            self._size_masks[key] = mask
+        return mask
+
+
+# Layouts shared by every tree, keyed on
+# (center_x, base_y, tree_height, rows, leaf_size, spread, bits)
+_layout_cache = {}
+
+# Leaf offsets shared by every tree of a shape, keyed on
+# (tree_height, rows, spread)
+_offset_cache = {}
+
+
+class Glyph:
+    """A prepared leaf digit: its text, colour, size and resolved font."""
+    
+    __slots__ = ("text", "fill", "size", "font")
+    
+    def __init__(self, text, fill, size, font):
+        self.text = text
+        self.fill = fill
+        self.size = size
+        self.font = font
+
+
+class GlyphCache:
+    """
+    LRU cache of leaf glyphs keyed on (digit, font size, colour).
+    
+    On a real Tk canvas each size gets one tkinter.font.Font, so Tk
+    resolves the font once instead of on every leaf update. Canvases
+    without a Tk interpreter (e.g. RecordingCanvas) get plain font tuples.
+    """
+    
+    def __init__(self, master=None, family="Consolas", weight="bold", maxsize=32):
+        self.master = master
+        self.family = family
+        self.weight = weight
+        self.maxsize = maxsize
+        self._glyphs = OrderedDict()
+        self._fonts = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def _font(self, size):
+        """Return the font for a size, creating it on first use."""
+        font = self._fonts.get(size)
+        if font is None:
+            if isinstance(self.master, tk.Misc):
+                font = tkfont.Font(root=self.master, family=self.family,
+                                   size=size, weight=self.weight)
+            else:
+                font = (self.family, size, self.weight)
+            self._fonts[size] = font
+        return font
+    
+    def get(self, digit, size, color):
+        """Return the glyph for a digit at a size and colour."""
+        key = (digit, size, color)
+        glyph = self._glyphs.get(key)
+        if glyph is not None:
+            self.hits += 1
+            self._glyphs.move_to_end(key)
+            return glyph
+        
+        self.misses += 1
+        glyph = Glyph(digit, color, size, self._font(size))
+        self._glyphs[key] = glyph
+        if len(self._glyphs) > self.maxsize:
+            self._glyphs.popitem(last=False)
+            self.evictions += 1
+            # Drop fonts no cached glyph uses any more
+            in_use = {g.font for g in self._glyphs.values()}
+            for font_size in [k for k, f in self._fonts.items() if f not in in_use]:
+                del self._fonts[font_size]
+        return glyph
+    
+    def stats(self):
+        """Return cache size and hit/miss counters."""
+        return {
+            "glyphs": len(self._glyphs),
+            "fonts": len(self._fonts),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
 
 
 class BinaryChristmasTree:
@@ -13,13 +368,20 @@ class BinaryChristmasTree:
     Christmas tree visualization with binary digits as leaves.
     Bottom row displays the timer value in binary (MSB on left).
     Upper rows are filled with zeros for visual balance.
+    
+    rows sets how many rows the tree has (row n holds n leaves) and bits
+    how many leaves carry the value (default: the bottom row). Values
+    wider than the bottom row continue on the row above.
     """
     
-    def __init__(self, canvas, center_x, base_y, tree_height=180):
+    def __init__(self, canvas, center_x, base_y, tree_height=180, glyph_cache=None,
+                 animator=None, rows=8, bits=None, spread=95):
         self.canvas = canvas
         self.center_x = center_x
         self.base_y = base_y
         self.tree_height = tree_height
+        self.spread = spread
+        self.bits = bits
         
         # Colors - Retro green theme
         self.leaf_color = "#00ff41"      # Matrix green for digits
@@ -30,7 +392,30 @@ class BinaryChristmasTree:
         self.leaf_items = []
         self.trunk_items = []
         
-        # Christmas tree structure: rows from top to bottom
+        # Retained-mode state: one canvas item per leaf, created once and
+        # reconfigured only when its digit, colour, size or visibility changes
+        self._leaf_state = []
+        self._layout = None
+        self._layout_key = None
+        self._trunk_key = None
+        
+        # Last state passed to apply(): visible leaf count and '1' leaves
+        self._shown_count = None
+        self._digit_mask = 0
+        
+        # Canvas calls made during the last draw_tree() frame
+        self.frame_ops = 0
+        
+        # Prepared digit glyphs, one per quantised size and colour
+        self.glyphs = glyph_cache or GlyphCache(canvas)
+        
+        # Optional Animator: newly shown leaves grow in instead of popping in
+        self.animator = animator
+        self.grow_duration = 0.35
+        self._leaf_targets = []
+        self._growing = set()
+        
+        # Christmas tree structure: rows from top to bottom (default rows=8)
         # Taller tree with more rows for height > width
         # Row 0: 1 leaf (top/star)
         # Row 1: 2 leaves
@@ -40,55 +425,61 @@ class BinaryChristmasTree:
         # Row 5: 6 leaves
         # Row 6: 7 leaves
         # Row 7: 8 leaves (bottom - holds binary value)
-        self.rows = [1, 2, 3, 4, 5, 6, 7, 8]
-        
-        # Uniform leaf size for all leaves
-        self.leaf_size = 14
-        
+        self.rows = list(range(1, rows + 1))
+        
+        # Uniform leaf size for all leaves: 14, smaller when rows or
+        # columns would otherwise overlap
+        row_spacing = tree_height / (rows + 1)
+        col_spacing = 2 * spread / max(1, rows - 1)
+        self.leaf_size = max(4, min(14, int(min(row_spacing, col_spacing) * 0.9)))
+        
+    def _value_bits(self):
+        """Return how many leaves carry the value."""
+        bits = self.rows[-1] if self.bits is None else self.bits
+        return min(bits, sum(self.rows))
+    
+    def _layout_params(self):
+        """Return the geometry that determines the leaf layout."""
+        return (self.center_x, self.base_y, self.tree_height, tuple(self.rows), self.leaf_size,
+                self.spread, self._value_bits())
+    
+    def _get_layout(self, key=None):
+        """Return the cached layout for the current geometry, computing it once."""
+        if key is None:
+            key = self._layout_params()
+        layout = _layout_cache.get(key)
+        if layout is None:
+            layout = TreeLayout(key, self._calculate_positions(), self._value_bits())
+            _layout_cache[key] = layout
+        return layout
+    
     def _calculate_positions(self):
         """Calculate leaf positions in Christmas tree shape."""
-        positions = []
-        
-        # Calculate vertical spacing
-        num_rows = len(self.rows)
-        row_spacing = self.tree_height / (num_rows + 1)
-        
-        # Start from top of tree
-        start_y = self.base_y - self.tree_height
-        
-        for row_idx, num_leaves in enumerate(self.rows):
-            y = start_y + (row_idx + 1) * row_spacing
-            
-            # Calculate horizontal spread (narrower for taller appearance)
-            max_spread = 95  # Narrower max width for taller look
-            spread = (max_spread * (row_idx + 1)) / num_rows
-            
-            # Use uniform leaf size for all leaves
-            base_size = self.leaf_size
-            
-            for i in range(num_leaves):
-                if num_leaves == 1:
-                    x = self.center_x
-                else:
-                    # Evenly distribute leaves
-                    x = self.center_x - spread + (i * (2 * spread / (num_leaves - 1)))
-                
-                positions.append({
-                    "x": x,
-                    "y": y,
-                    "row": row_idx,
-                    "col": i,
-                    "size": base_size,
-                    "is_binary_row": (row_idx == len(self.rows) - 1)
-                })
-        
-        return positions
+        offsets = tree_leaf_offsets(self.tree_height, tuple(self.rows), self.spread)
+        
+        # Leaves carrying bits are the last ones top to bottom
+        first_bit = len(offsets) - self._value_bits()
+        return [
+            LeafPosition(self.center_x + dx, self.base_y + dy, row, col, self.leaf_size,
+                         i >= first_bit)
+            for i, (dx, dy, row, col) in enumerate(offsets)
+        ]
+    
+    def value_growth(self):
+        """Return the smallest growth percent at which the whole value is shown."""
+        return self._get_layout().value_growth()
     
     def draw_trunk(self):
-        """Draw the tree trunk."""
+        """Draw the tree trunk (created once, moved only if the tree moves)."""
+        trunk_key = (self.center_x, self.base_y)
+        if self.trunk_items and trunk_key == self._trunk_key:
+            return
+        
         for item in self.trunk_items:
             self.canvas.delete(item)
+            self.frame_ops += 1
         self.trunk_items = []
+        self._trunk_key = trunk_key
         
         trunk_top = self.base_y - 15
         trunk_bottom = self.base_y + 25
@@ -103,6 +494,7 @@ class BinaryChristmasTree:
             width=2
         )
         self.trunk_items.append(trunk)
+        self.frame_ops += 1
         
         # Trunk detail lines
         for i in range(3):
@@ -114,122 +506,612 @@ class BinaryChristmasTree:
                 width=1
             )
             self.trunk_items.append(line)
+            self.frame_ops += 1
+    
+    def _create_leaves(self, positions):
+        """Create one hidden text item per leaf, in growth order."""
+        self._delete_leaves()
+        for pos in positions:
+            item = self.canvas.create_text(
+                pos.x, pos.y,
+                text="",
+                fill=self.leaf_color,
+                state=tk.HIDDEN
+            )
+            self.leaf_items.append(item)
+            # (glyph, visible)
+            self._leaf_state.append((None, False))
+            self._leaf_targets.append(None)
+            self.frame_ops += 1
+    
+    def _delete_leaves(self):
+        """Delete all leaf items and forget their retained state."""
+        for item in self.leaf_items:
+            self.canvas.delete(item)
+            self.frame_ops += 1
+        self.leaf_items = []
+        self._leaf_state = []
+        self._leaf_targets = []
+        for index in self._growing:
+            self.animator.cancel(("leaf", id(self), index))
+        self._growing = set()
     
     def draw_tree(self, binary_value, growth_percent):
         """
         Draw the Christmas tree with binary leaves.
         
+        Leaf items are created on the first frame (or when the geometry
+        changes); later frames only reconfigure the leaves whose state
+        changed (see apply()). The number of canvas calls made is left
+        in frame_ops.
+        
         Args:
-            binary_value: Integer value to display in binary (timer minutes)
+            binary_value: Integer value to display in binary (timer minutes
+                or remaining seconds)
             growth_percent: 0-100, how much of the tree has grown
         """
-        # Clear existing leaves
-        for item in self.leaf_items:
-            self.canvas.delete(item)
-        self.leaf_items = []
+        self.frame_ops = 0
         
         # Draw trunk first
         self.draw_trunk()
         
-        # Get binary string (8 bits for bottom row)
-        binary_str = format(min(binary_value, 255), '08b')
+        self.apply(binary_value, growth_percent)
+    
+    def _ensure_layout(self):
+        """Fetch the cached layout and (re)create leaf items if the geometry changed."""
+        layout_key = self._layout_params()
+        if layout_key != self._layout_key:
+            self._layout = self._get_layout(layout_key)
+            self._create_leaves(self._layout.growth_order)
+            self._layout_key = layout_key
+            self.invalidate()
+        return self._layout
+    
+    def invalidate(self):
+        """Forget the applied state so the next apply() revisits every leaf."""
+        self._shown_count = None
+        self._digit_mask = 0
+    
+    def apply(self, value, growth):
+        """
+        Bring the leaves to a new value and growth, visiting only the
+        leaves whose digit, visibility or size differs from the last call.
+        
+        The previous and new digit and visibility masks are XORed, so a
+        tick that changes nothing costs O(1) and a growth step costs
+        O(changed leaves).
+        
+        Args:
+            value: Integer shown in binary on the bit leaves (clamped to
+                the largest value they can show)
+            growth: 0-100, how much of the tree has grown
         
-        # Get all positions
-        positions = self._calculate_positions()
-        total_leaves = len(positions)
+        Returns:
+            Set of canvas item ids that were reconfigured.
+        """
+        layout = self._ensure_layout()
+        growth_order = layout.growth_order
+        total_leaves = len(growth_order)
         
         # Calculate how many leaves to show based on growth
         # Grow from bottom to top
-        visible_count = int((growth_percent / 100) * total_leaves)
+        visible_count = int((growth / 100) * total_leaves)
         
-        # Reverse positions so we grow from bottom
-        positions_reversed = list(reversed(positions))
+        # Bit leaves show the value (MSB on the left)
+        digits = layout.digit_mask(value)
+        visible = (1 << visible_count) - 1
         
-        for i, pos in enumerate(positions_reversed):
-            if i >= visible_count:
-                continue
+        if self._shown_count is None:
+            changed = (1 << total_leaves) - 1
+        else:
+            shown = (1 << self._shown_count) - 1
+            redraw = (digits ^ self._digit_mask) | layout.size_change_mask(self._shown_count, visible_count)
+            changed = (shown ^ visible) | (redraw & visible)
+        
+        self._shown_count = visible_count
+        self._digit_mask = digits
+        
+        touched = set()
+        while changed:
+            low = changed & -changed
+            changed ^= low
+            i = low.bit_length() - 1
             
-            # Determine the digit to display
-            if pos["is_binary_row"]:
-                # Bottom row: show actual binary value (left to right = MSB to LSB)
-                bit_idx = pos["col"]
-                digit = binary_str[bit_idx] if bit_idx < len(binary_str) else "0"
+            ops = self.frame_ops
+            if i >= visible_count:
+                self._hide_leaf(i)
             else:
-                # Upper rows: always show 0
-                digit = "0"
-            
-            self._draw_leaf(pos, digit, i / max(1, visible_count - 1) if visible_count > 1 else 1)
+                # Bit leaves show the value; all other leaves always show 0
+                digit = "1" if digits & low else "0"
+                self._draw_leaf(i, growth_order[i], digit, _growth_factor(i, visible_count))
+            if self.frame_ops != ops:
+                touched.add(self.leaf_items[i])
+        return touched
     
-    def _draw_leaf(self, pos, digit, growth_factor):
-        """Draw a single leaf as a clean digit (no circles)."""
-        x, y = pos["x"], pos["y"]
-        size = pos["size"]
-        
-        # Animate size based on growth
-        animated_size = size * (0.7 + 0.3 * growth_factor)
-        
-        # Font size for clean, readable digits
-        font_size = int(animated_size * 1.1)
+    def _hide_leaf(self, index):
+        """Hide a leaf item if it is currently shown."""
+        if index in self._growing:
+            self.animator.cancel(("leaf", id(self), index))
+            self._growing.discard(index)
+        glyph, visible = self._leaf_state[index]
+        if visible:
+            self.canvas.itemconfigure(self.leaf_items[index], state=tk.HIDDEN)
+            self._leaf_state[index] = (glyph, False)
+            self.frame_ops += 1
+    
+    def _draw_leaf(self, index, pos, digit, growth_factor):
+        """Update a single leaf digit, touching the canvas only on change."""
+        font_size = _leaf_font_size(pos.size, growth_factor)
         
         # Highlight '1' digits with brighter color for emphasis
         text_color = self.leaf_glow if digit == "1" else self.leaf_color
         
-        # Draw just the digit - clean and readable
-        leaf_text = self.canvas.create_text(
-            x, y,
-            text=digit,
-            fill=text_color,
-            font=("Consolas", font_size, "bold")
+        glyph = self.glyphs.get(digit, font_size, text_color)
+        self._leaf_targets[index] = glyph
+        
+        if self.animator is not None and not self._leaf_state[index][1]:
+            self._grow_leaf(index)
+        elif index not in self._growing:
+            self._set_leaf_glyph(index, glyph)
+    
+    def _grow_leaf(self, index):
+        """Show a leaf small and tween it up to its target size."""
+        self._growing.add(index)
+        self._grow_step(index, 0.0)
+        self.animator.animate(
+            ("leaf", id(self), index),
+            lambda value: self._grow_step(index, value),
+            self.grow_duration
         )
-        self.leaf_items.append(leaf_text)
+    
+    def _grow_step(self, index, value):
+        """Animation frame for a growing leaf; value runs 0-1."""
+        target = self._leaf_targets[index]
+        if value >= 1.0:
+            self._growing.discard(index)
+            glyph = target
+        else:
+            size = max(1, round(target.size * (0.3 + 0.7 * value)))
+            glyph = self.glyphs.get(target.text, size, target.fill)
+        self._set_leaf_glyph(index, glyph)
+    
+    def _set_leaf_glyph(self, index, glyph):
+        """Show a glyph on a leaf item, configuring only what differs."""
+        old_glyph, old_visible = self._leaf_state[index]
+        if old_visible and glyph is old_glyph:
+            return
+        
+        changes = {}
+        if old_glyph is None or glyph.text != old_glyph.text:
+            changes["text"] = glyph.text
+        if old_glyph is None or glyph.fill != old_glyph.fill:
+            changes["fill"] = glyph.fill
+        if old_glyph is None or glyph.font is not old_glyph.font:
+            changes["font"] = glyph.font
+        if not old_visible:
+            changes["state"] = tk.NORMAL
+        if changes:
+            self.canvas.itemconfigure(self.leaf_items[index], **changes)
+            self.frame_ops += 1
+        
+        self._leaf_state[index] = (glyph, True)
     
     def clear(self):
         """Clear all tree elements."""
-        for item in self.leaf_items:
-            self.canvas.delete(item)
-        self.leaf_items = []
+        self._delete_leaves()
+        self._layout_key = None
         for item in self.trunk_items:
             self.canvas.delete(item)
         self.trunk_items = []
+        self._trunk_key = None
+
+
+# Control-button icons. Each variant is a list of (kind, coords, role,
+# options) shapes; "base" shapes are always shown. Roles name the theme
+# colour a shape takes and which item options carry it.
+PLAY_BUTTON_ICONS = {
+    "base": [("oval", (2, 2, 36, 36), "ring", {"width": 2})],
+    "play": [("polygon", (13, 10, 13, 28, 28, 19), "glyph", {})],
+    "pause": [
+        ("rectangle", (12, 10, 16, 28), "glyph", {}),
+        ("rectangle", (22, 10, 26, 28), "glyph", {}),
+    ],
+}
+MINUS_BUTTON_ICONS = {
+    "base": [("oval", (2, 2, 38, 38), "ring", {"width": 2})],
+    "minus": [("line", (10, 20, 30, 20), "stroke", {"width": 3})],
+}
+PLUS_BUTTON_ICONS = {
+    "base": [("oval", (2, 2, 38, 38), "ring", {"width": 2})],
+    "plus": [
+        ("line", (10, 20, 30, 20), "stroke", {"width": 3}),
+        ("line", (20, 10, 20, 30), "stroke", {"width": 3}),
+    ],
+}
+ICON_ROLE_OPTIONS = {
+    "ring": ("outline",),
+    "glyph": ("fill", "outline"),
+    "stroke": ("fill",),
+}
+
+
+class IconSet:
+    """
+    Icon variants drawn once on a canvas and switched by item state.
+
+    Every shape is created up front, tagged "icon:<variant>" and
+    "role:<role>". show() hides the current variant and reveals another
+    with two tag-wide itemconfigure calls (none if it is already shown);
+    reskin() recolours each role in place.
+    """
+    
+    def __init__(self, canvas, shapes, theme):
+        self.canvas = canvas
+        self.current = None
+        for variant, variant_shapes in shapes.items():
+            for kind, coords, role, options in variant_shapes:
+                colours = {option: theme[role] for option in ICON_ROLE_OPTIONS[role]}
+                getattr(canvas, "create_" + kind)(
+                    *coords,
+                    tags=(f"icon:{variant}", f"role:{role}"),
+                    state="normal" if variant == "base" else "hidden",
+                    **colours,
+                    **options
+                )
+                
+    def show(self, variant):
+        """Make `variant` the visible icon."""
+        if variant == self.current:
+            return
+        if self.current is not None:
+            self.canvas.itemconfigure(f"icon:{self.current}", state="hidden")
+        self.canvas.itemconfigure(f"icon:{variant}", state="normal")
+        self.current = variant
+        
+    def reskin(self, theme):
+        """Recolour shapes from a {role: colour} theme (partial themes allowed)."""
+        for role, colour in theme.items():
+            options = ICON_ROLE_OPTIONS.get(role, ())
+            if options:
+                self.canvas.itemconfigure(f"role:{role}", **{option: colour for option in options})
+
+
+class StartupProfile:
+    """
+    Wall-clock marks for the phases of a widget launch.
+
+    Each mark records the time since `started`; finish() prints the
+    phase table when verbose (the --profile-startup flag).
+    """
+    
+    def __init__(self, started=None, verbose=False):
+        self.started = started if started is not None else time.perf_counter()
+        self.verbose = verbose
+        self.marks = []
+        
+    def mark(self, phase):
+        """Record that a phase has just ended."""
+        self.marks.append((phase, time.perf_counter() - self.started))
+        
+    def as_dict(self):
+        """Return {phase: milliseconds since start}."""
+        return {phase: round(seconds * 1000, 2) for phase, seconds in self.marks}
+        
+    def format(self):
+        """Return report lines: time since start and duration of each phase."""
+        lines = ["Startup phase       since start    duration"]
+        previous = 0.0
+        for phase, seconds in self.marks:
+            lines.append(f"  {phase:<16} {seconds * 1000:9.1f} ms {(seconds - previous) * 1000:8.1f} ms")
+            previous = seconds
+        return lines
+        
+    def finish(self, phase):
+        """Record the last phase and print the report if requested."""
+        self.mark(phase)
+        if self.verbose:
+            print("\n".join(self.format()), flush=True)
+
+
+class SystemClock:
+    """
+    Real-time clock used by PomodoroTimer and PomodoroWidget.
+    
+    Time is read from time.monotonic()/time.time() and callbacks are
+    scheduled on a Tk root. Any object with the same methods (see
+    simulation.VirtualClock) can be injected instead.
+    """
+    
+    def __init__(self, root=None):
+        self.root = root
+    
+    def monotonic(self):
+        """Return seconds from a clock that never goes backwards."""
+        return time.monotonic()
+    
+    def wall(self):
+        """Return wall-clock seconds since the epoch."""
+        return time.time()
+    
+    def after(self, ms, callback):
+        """Run callback after ms milliseconds. Returns a cancel handle."""
+        return self.root.after(ms, callback)
+    
+    def after_cancel(self, handle):
+        """Cancel a callback scheduled with after()."""
+        self.root.after_cancel(handle)
+
+
+class TkDispatcher:
+    """
+    Runs callables on the Tk thread; call it from any thread (Tk itself
+    must only be used from the thread running mainloop). A byte written
+    to a socket pair wakes a Tk file handler, which drains the queue.
+    Where Tk has no file handlers (Windows) the first call of a batch
+    posts a virtual event at the tail of Tk's queue instead. Either way
+    nothing polls: Tk wakes only when there is work, and on_wake (if
+    given) is called once per wake-up so idle wake-ups can be counted.
+    """
+    
+    EVENT = "<<TkDispatch>>"
+    
+    def __init__(self, root, on_wake=None):
+        import queue
+        import socket
+        import threading
+        self.root = root
+        self.on_wake = on_wake
+        self.wakeups = 0
+        self._queue = queue.Queue()
+        self._empty = queue.Empty
+        self._reader = self._writer = None
+        self._bind_id = None
+        self._lock = threading.Lock()
+        self._signalled = False
+        if hasattr(root.tk, "createfilehandler"):
+            self._reader, self._writer = socket.socketpair()
+            self._reader.setblocking(False)
+            root.tk.createfilehandler(self._reader, tk.READABLE, self._drain)
+        else:
+            self._bind_id = root.bind(self.EVENT, self._drain, "+")
+    
+    def __call__(self, func):
+        self._queue.put(func)
+        if self._writer is not None:
+            try:
+                self._writer.send(b"\0")
+            except BlockingIOError:
+                pass  # Already plenty of wake-ups pending
+            except OSError:
+                pass  # Closed: the Tk thread is shutting down
+            return
+        if self._bind_id is None:
+            return  # Closed
+        with self._lock:
+            if self._signalled:
+                return  # The pending event will drain this one too
+            self._signalled = True
+        try:
+            # Thread-safe with a threaded Tcl: tkinter hands the call to
+            # the Tk thread
+            self.root.event_generate(self.EVENT, when="tail")
+        except (RuntimeError, tk.TclError):
+            pass  # Main loop not running: the Tk thread is shutting down
+    
+    def _drain(self, fileobj=None, mask=None):
+        self.wakeups += 1
+        if self.on_wake is not None:
+            self.on_wake()
+        if self._reader is not None:
+            try:
+                while self._reader.recv(4096):
+                    pass
+            except BlockingIOError:
+                pass
+        else:
+            # Calls queued from here on post a new event
+            with self._lock:
+                self._signalled = False
+        while True:
+            try:
+                func = self._queue.get_nowait()
+            except self._empty:
+                break
+            func()
+    
+    def close(self):
+        """Stop dispatching (safe to call more than once)."""
+        if self._reader is not None:
+            self.root.tk.deletefilehandler(self._reader)
+            self._reader.close()
+            self._writer.close()
+            self._reader = None
+        elif self._bind_id is not None:
+            try:
+                self.root.unbind(self.EVENT, self._bind_id)
+            except tk.TclError:
+                pass  # Window already destroyed
+            self._bind_id = None
 
 
 class PomodoroTimer:
-    """Handles timer logic and state."""
+    """
+    Handles timer logic and state.
+    
+    While running, the timer keeps a deadline on the monotonic clock and
+    derives the remaining time from it, so late or missed wake-ups never
+    make it drift. A jump of the wall clock that the monotonic clock did
+    not see (system suspend) is added to the elapsed time on resume.
+    """
+    
+    # Wake-ups land this many seconds after a second boundary so that the
+    # displayed value has already rolled over when the callback runs
+    WAKE_MARGIN = 0.005
+    
+    # Wall-clock time not seen by the monotonic clock above this is treated
+    # as a suspend and counted as elapsed time
+    SUSPEND_THRESHOLD = 2.0
     
-    def __init__(self, initial_minutes=5):
+    def __init__(self, initial_minutes=5, clock=None):
         self.total_seconds = initial_minutes * 60
         self.remaining_seconds = self.total_seconds
         self.is_running = False
         self.minutes = initial_minutes
         
+        self.clock = clock or SystemClock()
+        self._deadline = None
+        self._remaining_exact = float(self.total_seconds)
+        self._last_mono = None
+        self._last_wall = None
+        
+        # Scheduler jitter: how late each wake-up was versus its target
+        self._expected_wake = None
+        self._jitter_count = 0
+        self._jitter_total = 0.0
+        self._jitter_max = 0.0
+        self._jitter_last = 0.0
+        
+        # Called as listener(event, timer) on "start", "pause",
+        # "complete" and "reset" (reset only when a session is abandoned)
+        self.listeners = []
+        
+    def _emit(self, event):
+        """Notify listeners of a state transition."""
+        for listener in self.listeners:
+            listener(event, self)
+        
     def set_minutes(self, minutes):
         """Set timer duration in minutes."""
         self.minutes = max(1, min(60, minutes))  # Clamp between 1-60
         self.total_seconds = self.minutes * 60
-        self.remaining_seconds = self.total_seconds
+        self._set_remaining(self.total_seconds)
+        
+    def _set_remaining(self, seconds):
+        """Set the remaining time, re-arming the deadline if running."""
+        self._remaining_exact = float(max(0, seconds))
+        self.remaining_seconds = math.ceil(self._remaining_exact)
+        if self.is_running:
+            self._arm()
+        
+    def _arm(self):
+        """Place the deadline relative to the current monotonic time."""
+        now = self.clock.monotonic()
+        self._deadline = now + self._remaining_exact
+        self._last_mono = now
+        self._last_wall = self.clock.wall()
+        self._expected_wake = None
         
     def start(self):
         """Start or resume the timer."""
-        self.is_running = True
+        if not self.is_running:
+            self.is_running = True
+            self._arm()
+            self._emit("start")
         
     def pause(self):
-        """Pause the timer."""
+        """Pause the timer (completing it if the deadline has already passed)."""
+        was_running = self.is_running
+        if was_running:
+            self._sync()
         self.is_running = False
+        self._deadline = None
+        self._expected_wake = None
+        if was_running:
+            # A deadline passed before any wake-up saw it (e.g. during a
+            # suspend) ends the session rather than pausing it at 00:00
+            self._emit("complete" if self.remaining_seconds <= 0 else "pause")
         
     def reset(self):
         """Reset timer to initial value."""
-        self.remaining_seconds = self.total_seconds
+        if 0 < self.remaining_seconds < self.total_seconds:
+            if self.is_running:
+                self._sync()
+            self._emit("reset")
         self.is_running = False
+        self._deadline = None
+        self._expected_wake = None
+        self._set_remaining(self.total_seconds)
+        
+    def restore(self, minutes, remaining, running):
+        """Put back a saved state (see checkpoint.py) without notifying listeners."""
+        self.minutes = max(1, min(60, minutes))
+        self.total_seconds = self.minutes * 60
+        self.is_running = running
+        self._deadline = None
+        self._expected_wake = None
+        self._set_remaining(min(remaining, self.total_seconds))
+        
+    def _sync(self):
+        """Recompute the remaining time from the deadline."""
+        now = self.clock.monotonic()
+        wall = self.clock.wall()
+        
+        # Time that passed on the wall clock but not on the monotonic
+        # clock means the machine was suspended: count it as elapsed
+        if self._last_mono is not None:
+            missed = (wall - self._last_wall) - (now - self._last_mono)
+            if missed > self.SUSPEND_THRESHOLD:
+                self._deadline -= missed
+        self._last_mono = now
+        self._last_wall = wall
+        
+        self._remaining_exact = max(0.0, self._deadline - now)
+        self.remaining_seconds = math.ceil(self._remaining_exact)
+        return now
         
     def tick(self):
-        """Decrease timer by 1 second. Returns True if timer is still running."""
-        if self.is_running and self.remaining_seconds > 0:
-            self.remaining_seconds -= 1
+        """Update remaining time from the clock. Returns True if timer is still running."""
+        if self.is_running:
+            now = self._sync()
+            
+            if self._expected_wake is not None:
+                late = now - self._expected_wake
+                self._jitter_count += 1
+                self._jitter_total += late
+                self._jitter_max = max(self._jitter_max, late)
+                self._jitter_last = late
+                self._expected_wake = None
+            
             if self.remaining_seconds <= 0:
                 self.is_running = False
+                self._deadline = None
+                self._emit("complete")
                 return False
         return self.is_running
     
+    def next_tick_delay(self):
+        """
+        Return milliseconds until the displayed time next changes.
+        
+        The wake-up is aimed just past the next whole-second boundary of
+        the deadline, and remembered so tick() can measure its lateness.
+        """
+        if not self.is_running:
+            return 1000
+        now = self.clock.monotonic()
+        left = max(0.0, self._deadline - now)
+        fraction = left - (math.ceil(left) - 1) if left > 0 else 0.0
+        delay = fraction + self.WAKE_MARGIN
+        self._expected_wake = now + delay
+        return max(1, int(math.ceil(delay * 1000)))
+    
+    def get_deadline(self):
+        """Return the monotonic-clock deadline while running, else None."""
+        return self._deadline if self.is_running else None
+    
+    def close(self):
+        """Release resources held by the timer (none for an in-process timer)."""
+    
+    def jitter_stats(self):
+        """Return wake-up lateness statistics in milliseconds."""
+        count = self._jitter_count
+        return {
+            "count": count,
+            "mean_ms": (self._jitter_total / count) * 1000 if count else 0.0,
+            "max_ms": self._jitter_max * 1000,
+            "last_ms": self._jitter_last * 1000,
+        }
+    
     def get_display_time(self):
         """Return formatted time string MM:SS."""
         mins = self.remaining_seconds // 60
@@ -248,11 +1130,218 @@ class PomodoroTimer:
         return self.remaining_seconds <= 0
 
 
+# Tree canvas geometry in pixels, shared with the headless renderers
+# (benchmark, terminal front end, timelapse)
+TREE_CANVAS_WIDTH = 290
+TREE_CANVAS_HEIGHT = 260
+TREE_BASE_MARGIN = 30
+TREE_HEIGHT = 200
+PLAY_BUTTON_SIZE = 38
+
+# The tree is always grown at least this far (percent)
+MIN_GROWTH = 25
+
+
+def make_tree(canvas, scale=1, **options):
+    """
+    Build a BinaryChristmasTree laid out as the widget's, optionally
+    scaled up by an integer factor. Other keyword arguments go to
+    BinaryChristmasTree (rows, bits, glyph_cache, animator).
+    """
+    spread = options.pop("spread", 95)
+    tree = BinaryChristmasTree(
+        canvas,
+        center_x=TREE_CANVAS_WIDTH * scale // 2,
+        base_y=(TREE_CANVAS_HEIGHT - TREE_BASE_MARGIN) * scale,
+        tree_height=TREE_HEIGHT * scale,
+        spread=spread * scale,
+        **options
+    )
+    tree.leaf_size *= scale
+    return tree
+
+
+def tree_min_growth(tree):
+    """Return the growth a tree never drops below: MIN_GROWTH, or more if every bit leaf needs it."""
+    return max(MIN_GROWTH, tree.value_growth())
+
+
+def update_tree(tree, timer, min_growth=MIN_GROWTH, show_seconds=False):
+    """
+    Draw a timer on a tree: grown with the session's progress (never less
+    than min_growth), showing the session minutes, or with show_seconds
+    the remaining seconds, in binary.
+    """
+    display_progress = max(min_growth, timer.get_progress_percent())
+    value = timer.remaining_seconds if show_seconds else timer.minutes
+    tree.draw_tree(value, display_progress)
+
+
+def play_button_icon(timer):
+    """Return the PLAY_BUTTON_ICONS shape the play button shows for a timer."""
+    return "pause" if timer.is_running else "play"
+
+
+class TimerController:
+    """
+    What the widget's buttons and update loop do with the timer, apart
+    from drawing: start/pause, +/-, reset, the event-driven tick loop,
+    completion and the crash-safe checkpoint. PomodoroWidget is one view
+    of it; simulation.HeadlessPomodoro runs the same controller on a
+    virtual clock.
+    
+    Args:
+        timer: PomodoroTimer or RemoteTimer
+        clock: Clock the update loop is scheduled on
+        render: Called to redraw everything that follows the timer
+        complete: Called once when a session completes (after render)
+        scheduler: Shared tick loop with arm(controller)/disarm(controller)
+            (a TreeGroup) used instead of this controller's own after()
+    """
+    
+    def __init__(self, timer, clock, render=None, complete=None, scheduler=None):
+        self.timer = timer
+        self.clock = clock
+        self.render = render or (lambda: None)
+        self.complete = complete or (lambda: None)
+        self.scheduler = scheduler
+        self.checkpoint = None
+        self.restored = False
+        
+        self._after_id = None
+        self.wakeup_count = 0
+        self.completions = 0
+        
+    def restore_checkpoint(self, path=None, fsync=True):
+        """Keep a checkpoint at path (default location if None) and apply its saved state."""
+        from checkpoint import Checkpointer
+        self.checkpoint = Checkpointer(self.timer, path, clock=self.clock, fsync=fsync)
+        self.restored = self.checkpoint.restore()
+        return self.restored
+        
+    def resume(self):
+        """Start the update loop if the timer is already running (e.g. restored mid-session)."""
+        if self.timer.is_running:
+            self.arm()
+        
+    # Button actions
+        
+    def toggle(self):
+        """Start or pause, as the play button does."""
+        timer = self.timer
+        if timer.is_complete():
+            timer.reset()
+        
+        if timer.is_running:
+            timer.pause()
+            self.disarm()
+        else:
+            timer.start()
+            self.arm()
+        
+        self.render()
+        # Pausing after the deadline passed unseen completes the session
+        if not timer.is_running and timer.is_complete():
+            self._complete()
+        
+    def set_minutes(self, minutes):
+        """Change the duration, as +/- do; ignored while running. Returns True if applied."""
+        if self.timer.is_running:
+            return False
+        self.timer.set_minutes(minutes)
+        self.render()
+        self.touch()
+        return True
+        
+    def reset(self):
+        """Stop and rewind the timer."""
+        self.timer.reset()
+        self.disarm()
+        self.render()
+        
+    def touch(self):
+        """Save a change that is not a timer event once clicks settle."""
+        if self.checkpoint is not None:
+            self.checkpoint.touch()
+        
+    # Update loop
+        
+    def arm(self):
+        """Schedule the next update if one is not already pending."""
+        if self.scheduler is not None:
+            self.scheduler.arm(self)
+        elif self._after_id is None:
+            self._after_id = self.clock.after(self.timer.next_tick_delay(), self.update)
+    
+    def disarm(self):
+        """Cancel the pending update, if any."""
+        if self.scheduler is not None:
+            self.scheduler.disarm(self)
+        elif self._after_id is not None:
+            self.clock.after_cancel(self._after_id)
+            self._after_id = None
+        
+    def update(self):
+        """One wake-up of the loop, on a second boundary while the timer runs."""
+        self._after_id = None
+        self.wakeup_count += 1
+        
+        if self.timer.is_running:
+            self.timer.tick()
+            self.show_tick()
+        
+        # Schedule next update only while there is something to count down
+        if self.timer.is_running:
+            self.arm()
+        
+    def show_tick(self):
+        """After a tick: redraw, re-check the checkpoint and handle completion."""
+        self.render()
+        if self.checkpoint is not None:
+            self.checkpoint.tick()
+        if self.timer.is_complete():
+            self._complete()
+        
+    def _complete(self):
+        self.completions += 1
+        self.complete()
+        
+    def close(self, save=True):
+        """Write (or drop, with save=False) a checkpoint change still waiting."""
+        if self.checkpoint is not None:
+            self.checkpoint.close(save=save)
+
+
+# Drag moves are applied at most this often (one display frame at 60 Hz)
+DRAG_FRAME_INTERVAL = 1 / 60
+
+# Lifecycle hook commands are killed after this many seconds
+HOOK_TIMEOUT = 30.0
+
+
 class PomodoroWidget:
     """Main Pomodoro widget window."""
     
-    def __init__(self):
-        self.root = tk.Tk()
+    def __init__(self, clock=None, animate=False, session_log=None, group=None,
+                 timer_process=False, control_socket=None, startup=None,
+                 profile_frames=None, hooks=None, rows=8, bits=None, show_seconds=False,
+                 checkpoint=None):
+        # Launch phase timings; only the first paint is on the critical
+        # path, everything invisible runs from _run_deferred afterwards
+        self.startup = startup or StartupProfile()
+        self._deferred = []
+        
+        # In a TreeGroup the widget is a Toplevel sharing the group's root,
+        # clock, glyph cache and tick loop
+        self.group = group
+        self.root = tk.Toplevel(group.root) if group is not None else tk.Tk()
+        self.startup.mark("tk_init")
+        
+        # Time source and scheduler; defaults to real time on this root
+        self.clock = clock or (group.clock if group is not None else SystemClock(self.root))
+        
+        # Optional tweened animation (leaf growth, completion flash)
+        self.animator = Animator(self.clock) if animate else None
         self.root.title("Binary Pomodoro")
         
         # Window configuration
@@ -282,18 +1371,194 @@ class PomodoroWidget:
         
         self.root.configure(bg=self.bg_color)
         
-        # Initialize timer
-        self.timer = PomodoroTimer(5)
+        # Tree geometry; with show_seconds the tree shows the remaining
+        # seconds (12 bits cover 60:00) instead of the session minutes
+        self.show_seconds = show_seconds
+        if bits is None and show_seconds:
+            bits = 12
+        self.tree_rows = rows
+        self.tree_bits = bits
+        
+        # Icon colours by role (see ICON_ROLE_OPTIONS); apply_icon_theme
+        # recolours the drawn icons in place
+        self.icon_theme = {
+            "ring": self.accent_color,
+            "glyph": self.text_color,
+            "stroke": self.accent_color,
+        }
+        
+        # Initialize timer, optionally in a child process so UI stalls
+        # cannot delay it
+        self.timer = None
+        if timer_process:
+            from timer_process import RemoteTimer
+            try:
+                self.timer = RemoteTimer(5)
+            except RuntimeError as e:
+                print(f"Timer process unavailable ({e}); running the timer in-process")
+        if self.timer is None:
+            self.timer = PomodoroTimer(5, clock=self.clock)
+        
+        # Buttons, update loop and checkpoint act through the controller;
+        # the callbacks are looked up per call so FrameProfiler's hooks apply
+        self.controller = TimerController(
+            self.timer, self.clock,
+            render=lambda: self._render_tick(),
+            complete=lambda: self._on_timer_complete(),
+            scheduler=group
+        )
+        
+        # Crash-safe state file (checkpoint is True or a path); the saved
+        # session is put back before anything is drawn
+        if checkpoint is not None:
+            self.controller.restore_checkpoint(None if checkpoint is True else checkpoint)
+            self.startup.mark("restore")
+        
+        # Record start/pause/complete events to the session log
+        self.session_log = session_log
+        if self.session_log is not None:
+            self.timer.listeners.append(self.session_log.record_timer_event)
+        
+        # Runs callables from other threads (hooks, control server,
+        # single-instance hand-off) on the Tk thread; created on first use
+        self._dispatcher = None
+        
+        # Lifecycle hooks, as (event, shell command) pairs, run on the event
+        # bus's worker threads so they never stall the main loop; results
+        # come back on the Tk thread through the TkDispatcher
+        self.events = None
+        if hooks:
+            self._start_event_bus(hooks)
+        
+        # Statistics over the logged history, kept current from timer events.
+        # Reading the history is deferred; nothing shows it at startup. A
+        # group loads one shared view for all of its widgets
+        self.stats = None
+        self.stats_window = None
+        if group is not None:
+            self.stats = group.stats
+            self._deferred.append(group.load_stats)
+        elif self.session_log is not None:
+            self._deferred.append(self._load_stats)
         
         # Create UI
         self._create_ui()
+        self.startup.mark("ui_build")
+        
+        # Optional per-frame instrumentation; profile_frames is True or a
+        # metrics file path
+        self.profiler = None
+        if profile_frames is not None:
+            from frame_profiler import FrameProfiler
+            self.profiler = FrameProfiler(
+                self, None if profile_frames is True else profile_frames
+            )
+        
+        # Initial draw; the label and tree follow a restored timer, not
+        # the 5-minute default the label was created with
+        self._update_display()
+        self._update_tree()
+        self.startup.mark("first_frame")
         
         # Drag functionality
-        self._drag_data = {"x": 0, "y": 0}
+        self._drag_data = {"x": 0, "y": 0, "win_x": 0, "win_y": 0}
+        self._drag_target = None
+        self._drag_flush_id = None
+        self._drag_last_flush = 0.0
+        self.drag_events = 0
+        self.drag_geometry_calls = 0
         self._setup_drag()
         
-        # Start update loop
-        self._update()
+        # Update loop is event-driven: armed when the timer starts and
+        # disarmed on pause or completion, so an idle widget never wakes.
+        # wakeup_count also counts TkDispatcher wake-ups (hook results,
+        # control commands, hand-offs). Restored mid-session it runs at once
+        self.controller.resume()
+        
+        # Optional control socket for scripts and other tools
+        self.control = None
+        self.control_server = None
+        if control_socket is not None:
+            self._deferred.append(functools.partial(self._start_control_server, control_socket))
+        
+        # Idle callbacks run after Tk's own pending redraws, so this fires
+        # once the first frame is on screen
+        self.root.after_idle(self._on_first_idle)
+        
+    @property
+    def wakeup_count(self):
+        """Update-loop and dispatcher wake-ups so far."""
+        return self.controller.wakeup_count
+        
+    def _on_first_idle(self):
+        self.startup.mark("first_idle")
+        self.root.after(1, self._run_deferred)
+        
+    def _run_deferred(self):
+        """Run postponed startup work (safe to call more than once)."""
+        if self._deferred is None:
+            return
+        deferred, self._deferred = self._deferred, None
+        for func in deferred:
+            # One failing step (e.g. a corrupt session log) must not stop
+            # the others from running
+            try:
+                func()
+            except Exception as e:
+                name = getattr(func, "func", func).__name__
+                print(f"Deferred startup step {name} failed: {e!r}")
+        self.startup.finish("deferred")
+        
+    def _load_stats(self):
+        from session_stats import SessionStats
+        self.stats = SessionStats.from_log(self.session_log.path)
+        self.timer.listeners.append(self.stats.record_timer_event)
+        
+    def _start_control_server(self, path):
+        """Serve the JSON control API; path True means the default socket."""
+        import control_server
+        if not control_server.is_supported():
+            print("Control socket unavailable: needs Unix domain sockets")
+            return
+        self.control = control_server.WidgetControl(self)
+        server = control_server.ControlServer(
+            self.control,
+            path=None if path is True else path,
+            dispatcher=self.dispatcher()
+        )
+        try:
+            server.start()
+        except RuntimeError as e:
+            print(f"Control socket unavailable: {e}")
+            return
+        self.control_server = server
+        
+    def dispatcher(self):
+        """Return the TkDispatcher that runs callables from other threads on Tk's."""
+        if self._dispatcher is None:
+            self._dispatcher = TkDispatcher(self.root, on_wake=self._count_wakeup)
+        return self._dispatcher
+        
+    def _count_wakeup(self):
+        self.controller.wakeup_count += 1
+        
+    def _start_event_bus(self, hooks):
+        from event_bus import EventBus, ShellCommand
+        self.events = EventBus(timeout=HOOK_TIMEOUT, dispatcher=self.dispatcher())
+        self.events.attach(self.timer)
+        for event, command in hooks:
+            self.events.subscribe(event, ShellCommand(command, timeout=HOOK_TIMEOUT),
+                                  policy="coalesce", on_result=self._on_hook_result)
+        
+    def _on_hook_result(self, result):
+        """Report a failed or timed-out hook (runs on the Tk thread)."""
+        if result.error is not None:
+            print(f"Hook {result.subscription} failed on {result.event.name}: {result.error}")
+        
+    def _stop_control_server(self):
+        if self.control_server is not None:
+            self.control_server.stop()
+            self.control_server = None
         
     def _create_ui(self):
         """Create the widget UI elements."""
@@ -324,42 +1589,46 @@ class PomodoroWidget:
             cursor="hand2"
         )
         self.close_btn.pack(side=tk.LEFT, padx=(5, 0))
-        self.close_btn.bind("<Button-1>", lambda e: self.root.destroy())
+        self.close_btn.bind("<Button-1>", lambda e: self.close())
         self.close_btn.bind("<Enter>", lambda e: self.close_btn.configure(fg="#ff4444"))
         self.close_btn.bind("<Leave>", lambda e: self.close_btn.configure(fg="#555555"))
         
         # Play/Pause button (top right)
         self.play_btn = tk.Canvas(
             self.top_bar,
-            width=38,
-            height=38,
+            width=PLAY_BUTTON_SIZE,
+            height=PLAY_BUTTON_SIZE,
             bg=self.bg_color,
             highlightthickness=0,
             cursor="hand2"
         )
         self.play_btn.pack(side=tk.RIGHT, padx=(0, 5))
+        self.play_icons = IconSet(self.play_btn, PLAY_BUTTON_ICONS, self.icon_theme)
         self._draw_play_button()
         self.play_btn.bind("<Button-1>", self._toggle_timer)
         
         # Canvas for tree (centered area)
-        canvas_height = 260
         self.canvas = tk.Canvas(
             self.main_frame,
-            width=self.width - 30,
-            height=canvas_height,
+            width=TREE_CANVAS_WIDTH,
+            height=TREE_CANVAS_HEIGHT,
             bg=self.bg_color,
             highlightthickness=0
         )
         self.canvas.pack(pady=(5, 10))
         
         # Initialize Christmas tree
-        self.tree = BinaryChristmasTree(
+        self.tree = make_tree(
             self.canvas,
-            center_x=(self.width - 30) // 2,
-            base_y=canvas_height - 30,
-            tree_height=200
+            glyph_cache=self.group.glyphs if self.group is not None else None,
+            animator=self.animator,
+            rows=self.tree_rows,
+            bits=self.tree_bits
         )
         
+        # Grow at least far enough that every bit leaf is visible
+        self.min_growth = tree_min_growth(self.tree)
+        
         # Bottom control bar
         self.bottom_bar = tk.Frame(self.main_frame, bg=self.bg_color, height=55)
         self.bottom_bar.pack(fill=tk.X, padx=15, pady=(0, 15))
@@ -379,6 +1648,7 @@ class PomodoroWidget:
             cursor="hand2"
         )
         self.minus_btn.pack(side=tk.LEFT, padx=8)
+        self.minus_icons = IconSet(self.minus_btn, MINUS_BUTTON_ICONS, self.icon_theme)
         self._draw_minus_button()
         self.minus_btn.bind("<Button-1>", self._decrease_time)
         
@@ -391,6 +1661,7 @@ class PomodoroWidget:
             font=("Consolas", 26, "bold")
         )
         self.timer_label.pack(side=tk.LEFT, padx=12)
+        self.timer_label.bind("<Button-3>", self._toggle_stats)
         
         # Plus button
         self.plus_btn = tk.Canvas(
@@ -402,94 +1673,84 @@ class PomodoroWidget:
             cursor="hand2"
         )
         self.plus_btn.pack(side=tk.LEFT, padx=8)
+        self.plus_icons = IconSet(self.plus_btn, PLUS_BUTTON_ICONS, self.icon_theme)
         self._draw_plus_button()
         self.plus_btn.bind("<Button-1>", self._increase_time)
         
-        # Initial tree draw
-        self._update_tree()
-        
     def _draw_play_button(self):
-        """Draw play or pause icon on the play button."""
-        self.play_btn.delete("all")
-        
-        # Draw circle border with glow effect
-        self.play_btn.create_oval(
-            2, 2, 36, 36,
-            outline=self.accent_color,
-            width=2
-        )
-        
-        if self.timer.is_running:
-            # Draw pause icon (two rectangles)
-            self.play_btn.create_rectangle(
-                12, 10, 16, 28,
-                fill=self.text_color,
-                outline=self.text_color
-            )
-            self.play_btn.create_rectangle(
-                22, 10, 26, 28,
-                fill=self.text_color,
-                outline=self.text_color
-            )
-        else:
-            # Draw play icon (triangle)
-            self.play_btn.create_polygon(
-                13, 10,
-                13, 28,
-                28, 19,
-                fill=self.text_color,
-                outline=self.text_color
-            )
+        """Show the play or pause icon on the play button."""
+        self.play_icons.show(play_button_icon(self.timer))
     
     def _draw_minus_button(self):
-        """Draw minus button with clean design."""
-        self.minus_btn.delete("all")
-        self.minus_btn.create_oval(2, 2, 38, 38, outline=self.accent_color, width=2)
-        self.minus_btn.create_line(10, 20, 30, 20, fill=self.accent_color, width=3)
+        """Show the minus icon."""
+        self.minus_icons.show("minus")
         
     def _draw_plus_button(self):
-        """Draw plus button with clean design."""
-        self.plus_btn.delete("all")
-        self.plus_btn.create_oval(2, 2, 38, 38, outline=self.accent_color, width=2)
-        self.plus_btn.create_line(10, 20, 30, 20, fill=self.accent_color, width=3)
-        self.plus_btn.create_line(20, 10, 20, 30, fill=self.accent_color, width=3)
+        """Show the plus icon."""
+        self.plus_icons.show("plus")
+        
+    def apply_icon_theme(self, theme):
+        """Recolour the control icons from a {role: colour} theme."""
+        self.icon_theme.update(theme)
+        for icons in (self.play_icons, self.minus_icons, self.plus_icons):
+            icons.reskin(theme)
         
     def _toggle_timer(self, event=None):
         """Toggle timer start/pause."""
-        if self.timer.is_complete():
-            self.timer.reset()
-        
-        if self.timer.is_running:
-            self.timer.pause()
-        else:
-            self.timer.start()
-        
-        self._draw_play_button()
+        # Timer events need the statistics listener in place
+        self._run_deferred()
+        self.controller.toggle()
         
     def _increase_time(self, event=None):
         """Increase timer by 1 minute."""
-        if not self.timer.is_running:
-            self.timer.set_minutes(self.timer.minutes + 1)
-            self._update_display()
-            self._update_tree()
+        self.controller.set_minutes(self.timer.minutes + 1)
             
     def _decrease_time(self, event=None):
         """Decrease timer by 1 minute."""
-        if not self.timer.is_running:
-            self.timer.set_minutes(self.timer.minutes - 1)
-            self._update_display()
-            self._update_tree()
+        self.controller.set_minutes(self.timer.minutes - 1)
             
+    def _toggle_stats(self, event=None):
+        """Show or hide the session statistics panel."""
+        if self.stats_window is not None:
+            self.stats_window.destroy()
+            self.stats_window = None
+            return
+        if self.stats is None:
+            return
+        
+        from session_stats import format_summary
+        
+        self.stats_window = tk.Toplevel(self.root)
+        self.stats_window.overrideredirect(True)
+        self.stats_window.attributes("-topmost", True)
+        self.stats_window.configure(bg=self.bg_color, highlightbackground=self.accent_color,
+                                    highlightthickness=2)
+        label = tk.Label(
+            self.stats_window,
+            text="\n".join(format_summary(self.stats.summary())),
+            fg=self.highlight_color,
+            bg=self.bg_color,
+            font=("Consolas", 10),
+            justify=tk.LEFT
+        )
+        label.pack(padx=10, pady=8)
+        label.bind("<Button-1>", self._toggle_stats)
+        
+        # Open just above the widget
+        self.stats_window.update_idletasks()
+        x = self.root.winfo_x()
+        y = self.root.winfo_y() - self.stats_window.winfo_reqheight() - 6
+        self.stats_window.geometry(f"+{x}+{max(0, y)}")
+        
     def _update_display(self):
         """Update the timer display."""
         self.timer_label.config(text=self.timer.get_display_time())
+        if self.control is not None:
+            self.control.publish()
         
     def _update_tree(self):
         """Update the tree visualization."""
-        progress = self.timer.get_progress_percent()
-        # Show tree based on progress (minimum 25% visibility)
-        display_progress = max(25, progress)
-        self.tree.draw_tree(self.timer.minutes, display_progress)
+        update_tree(self.tree, self.timer, self.min_growth, self.show_seconds)
         
     def _setup_drag(self):
         """Setup window dragging."""
@@ -498,46 +1759,248 @@ class PomodoroWidget:
             widget.bind("<B1-Motion>", self._do_drag)
         
     def _start_drag(self, event):
-        """Record the starting position for drag."""
-        self._drag_data["x"] = event.x
-        self._drag_data["y"] = event.y
+        """Record the pointer and window origin at the start of a drag."""
+        self._drag_data["x"] = event.x_root
+        self._drag_data["y"] = event.y_root
+        self._drag_data["win_x"] = self.root.winfo_x()
+        self._drag_data["win_y"] = self.root.winfo_y()
         
     def _do_drag(self, event):
-        """Handle window dragging."""
-        x = self.root.winfo_x() + (event.x - self._drag_data["x"])
-        y = self.root.winfo_y() + (event.y - self._drag_data["y"])
+        """Handle window dragging (coalesced to one move per display frame)."""
+        self.drag_events += 1
+        self._drag_target = (
+            self._drag_data["win_x"] + (event.x_root - self._drag_data["x"]),
+            self._drag_data["win_y"] + (event.y_root - self._drag_data["y"])
+        )
+        if self._drag_flush_id is None:
+            self._drag_flush_id = self.root.after_idle(self._flush_drag)
+    
+    def _flush_drag(self):
+        """Move the window to the latest drag position, at most once per frame."""
+        wait = DRAG_FRAME_INTERVAL - (self.clock.monotonic() - self._drag_last_flush)
+        if wait > 0:
+            self._drag_flush_id = self.root.after(max(1, int(wait * 1000)), self._flush_drag)
+            return
+        
+        self._drag_flush_id = None
+        if self._drag_target is None:
+            return
+        x, y = self._drag_target
+        self._drag_target = None
+        self._drag_last_flush = self.clock.monotonic()
         self.root.geometry(f"+{x}+{y}")
-        
-    def _update(self):
-        """Main update loop - runs every second."""
-        if self.timer.is_running:
-            self.timer.tick()
-            self._update_display()
-            self._update_tree()
-            self._draw_play_button()
-            
-            # Check if timer completed
-            if self.timer.is_complete():
-                self._on_timer_complete()
-        
-        # Schedule next update
-        self.root.after(1000, self._update)
+        self.drag_geometry_calls += 1
+    
+    def drag_stats(self):
+        """Return motion events received versus geometry calls made."""
+        calls = self.drag_geometry_calls
+        return {
+            "events": self.drag_events,
+            "geometry_calls": calls,
+            "events_per_call": self.drag_events / calls if calls else 0.0,
+        }
+        
+    def _render_tick(self):
+        """Redraw everything that follows the timer."""
+        self._update_display()
+        self._update_tree()
+        self._draw_play_button()
         
     def _on_timer_complete(self):
         """Handle timer completion."""
+        if self.animator is not None:
+            # Pulse the border smoothly three times, ending on the accent colour
+            def pulse(t):
+                level = (1 - math.cos(t * 6 * math.pi)) / 2
+                color = blend_color(self.accent_color, self.highlight_color, level)
+                if color != self.main_frame.cget("highlightbackground"):
+                    self.main_frame.configure(highlightbackground=color)
+            self.animator.animate("flash", pulse, 2.4, easing=ease_linear)
+            return
+        
         # Flash the border green multiple times
         def flash(count):
             if count > 0:
                 color = self.highlight_color if count % 2 == 1 else self.accent_color
                 self.main_frame.configure(highlightbackground=color)
-                self.root.after(400, lambda: flash(count - 1))
+                self.clock.after(400, lambda: flash(count - 1))
         flash(6)
         
+    def activate(self, minutes=None):
+        """Bring the window to the front; set the duration if given and idle."""
+        self.root.deiconify()
+        self.root.lift()
+        if minutes is not None:
+            self.controller.set_minutes(minutes)
+        
+    def close(self):
+        """Close the widget window."""
+        self._stop_control_server()
+        self.controller.close()
+        if self.events is not None:
+            self.events.close()
+        if self._dispatcher is not None:
+            self._dispatcher.close()
+        if self.profiler is not None:
+            self.profiler.export()
+        if self.group is not None:
+            self.group.remove(self)
+        self.root.destroy()
+        
     def run(self):
         """Start the widget."""
-        self.root.mainloop()
+        if self.group is not None:
+            self.group.run()
+            return
+        try:
+            self.root.mainloop()
+        finally:
+            self._stop_control_server()
+            self.controller.close()
+            if self.events is not None:
+                self.events.close()
+            if self._dispatcher is not None:
+                self._dispatcher.close()
+            if self.profiler is not None:
+                self.profiler.export()
+            self.timer.close()
+            if self.session_log is not None:
+                self.session_log.close()
 
 
 if __name__ == "__main__":
-    widget = PomodoroWidget()
-    widget.run()
+    import argparse
+    import sys
+    
+    parser = argparse.ArgumentParser(description="Binary Tree Pomodoro Widget")
+    parser.add_argument(
+        "--minutes",
+        type=int,
+        help="Session length in minutes (1-60)"
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print how long each launch phase took"
+    )
+    parser.add_argument(
+        "--profile-frames",
+        nargs="?",
+        const=True,
+        metavar="METRICS_JSON",
+        help="Time each frame, show an overlay (middle-click or F3) and export metrics"
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=8,
+        help="Rows of leaves in the tree (default 8)"
+    )
+    parser.add_argument(
+        "--bits",
+        type=int,
+        help="Leaves that show the value in binary (default: the bottom row)"
+    )
+    parser.add_argument(
+        "--seconds",
+        action="store_true",
+        help="Show the remaining seconds in binary instead of the minutes"
+    )
+    parser.add_argument(
+        "--new-instance",
+        action="store_true",
+        help="Open another widget even if one is already running"
+    )
+    parser.add_argument(
+        "--animate",
+        action="store_true",
+        help="Tween leaf growth and the completion flash (up to 60 FPS)"
+    )
+    
+    parser.add_argument(
+        "--timer-process",
+        action="store_true",
+        help="Run the timer in a child process, unaffected by UI load"
+    )
+    parser.add_argument(
+        "--no-log",
+        action="store_true",
+        help="Do not record sessions to the session log"
+    )
+    parser.add_argument(
+        "--no-checkpoint",
+        action="store_true",
+        help="Do not save the timer state or restore it on launch (implied by --new-instance)"
+    )
+    parser.add_argument(
+        "--control",
+        nargs="?",
+        const=True,
+        metavar="SOCKET",
+        help="Accept commands on a local socket (see control_server.py)"
+    )
+    parser.add_argument(
+        "--on",
+        nargs=2,
+        action="append",
+        metavar=("EVENT", "COMMAND"),
+        help="Run a shell command on start, pause, complete, reset or any (repeatable)"
+    )
+    
+    args = parser.parse_args()
+    if not 2 <= args.rows <= 32:
+        parser.error("--rows must be between 2 and 32")
+    leaves = args.rows * (args.rows + 1) // 2
+    if args.bits is not None and not 1 <= args.bits <= leaves:
+        parser.error(f"--bits must be between 1 and {leaves} (a tree of {args.rows} rows has {leaves} leaves)")
+    hooks = []
+    for event, command in args.on or ():
+        if event not in ("start", "pause", "complete", "reset", "any"):
+            parser.error(f"--on: unknown event {event!r}")
+        hooks.append(("*" if event == "any" else event, command))
+    startup = StartupProfile(_IMPORT_STARTED, verbose=args.profile_startup)
+    startup.mark("import")
+    
+    # A widget is already running: pass it our arguments and exit before
+    # creating any window
+    instance = None
+    if not args.new_instance:
+        from single_instance import SingleInstance
+        instance = SingleInstance()
+        if not instance.acquire(sys.argv[1:]):
+            sys.exit(0)
+    
+    session_log = None
+    if not args.no_log:
+        from session_log import SessionLog
+        session_log = SessionLog()
+    startup.mark("launch")
+    
+    widget = PomodoroWidget(animate=args.animate, session_log=session_log,
+                            timer_process=args.timer_process, control_socket=args.control,
+                            startup=startup, profile_frames=args.profile_frames,
+                            hooks=hooks, rows=args.rows, bits=args.bits,
+                            show_seconds=args.seconds,
+                            checkpoint=None if args.no_checkpoint or args.new_instance else True)
+    if args.minutes is not None:
+        widget.activate(args.minutes)
+    
+    if instance is None:
+        widget.run()
+    else:
+        dispatch = widget.dispatcher()
+        
+        def on_handoff(argv):
+            # Called on the hand-off thread, which must not touch Tk; the
+            # dispatcher runs activate on the Tk thread instead
+            try:
+                minutes = parser.parse_known_args(argv)[0].minutes
+            except SystemExit:
+                minutes = None
+            dispatch(lambda: widget.activate(minutes))
+        
+        instance.serve(on_handoff)
+        try:
+            widget.run()
+        finally:
+            instance.release()
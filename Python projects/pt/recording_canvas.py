@@ -0,0 +1,156 @@
+"""
+Headless recording canvas for the Binary Pomodoro widget.
+Implements the part of the tkinter.Canvas API the widget uses, without
+needing an X display, and logs every call so draw paths can be measured.
+"""
+
+import itertools
+
+
+class RecordingCanvas:
+    """
+    Canvas-compatible backend that keeps items in memory.
+
+    Every create/delete/itemconfigure/coords call is appended to `log` as
+    an (operation, item_id, details) tuple and counted in `counts`.
+    """
+
+    def __init__(self, master=None, width=0, height=0, **options):
+        self.master = master
+        self.options = dict(options, width=width, height=height)
+        self.items = {}
+        self.log = []
+        self.counts = {"create": 0, "delete": 0, "itemconfigure": 0, "coords": 0}
+        self._ids = itertools.count(1)
+
+    # Recording
+
+    def _record(self, operation, item, details=None):
+        self.log.append((operation, item, details))
+        self.counts[operation] += 1
+
+    def reset_log(self):
+        """Forget recorded calls and counts (items are kept)."""
+        self.log = []
+        for key in self.counts:
+            self.counts[key] = 0
+
+    def alive(self):
+        """Return the number of items currently on the canvas."""
+        return len(self.items)
+
+    # Item creation
+
+    def _create(self, item_type, args, options):
+        coords = list(args[0]) if len(args) == 1 and isinstance(args[0], (list, tuple)) else list(args)
+        item = next(self._ids)
+        tags = options.pop("tags", ())
+        if isinstance(tags, str):
+            tags = (tags,)
+        self.items[item] = {
+            "type": item_type,
+            "coords": coords,
+            "options": options,
+            "tags": set(tags),
+        }
+        self._record("create", item, item_type)
+        return item
+
+    def create_text(self, *args, **options):
+        return self._create("text", args, options)
+
+    def create_rectangle(self, *args, **options):
+        return self._create("rectangle", args, options)
+
+    def create_line(self, *args, **options):
+        return self._create("line", args, options)
+
+    def create_oval(self, *args, **options):
+        return self._create("oval", args, options)
+
+    def create_polygon(self, *args, **options):
+        return self._create("polygon", args, options)
+
+    def create_image(self, *args, **options):
+        return self._create("image", args, options)
+
+    # Item access
+
+    def find_withtag(self, tag_or_id):
+        """Return item ids matching an id, a tag or "all"."""
+        if tag_or_id == "all":
+            return tuple(self.items)
+        if isinstance(tag_or_id, int):
+            return (tag_or_id,) if tag_or_id in self.items else ()
+        return tuple(item for item, data in self.items.items() if tag_or_id in data["tags"])
+
+    def find_all(self):
+        return tuple(self.items)
+
+    def type(self, item):
+        found = self.find_withtag(item)
+        return self.items[found[0]]["type"] if found else None
+
+    def gettags(self, item):
+        found = self.find_withtag(item)
+        return tuple(self.items[found[0]]["tags"]) if found else ()
+
+    def delete(self, *tags_or_ids):
+        for tag_or_id in tags_or_ids:
+            for item in self.find_withtag(tag_or_id):
+                del self.items[item]
+                self._record("delete", item)
+
+    def itemconfigure(self, tag_or_id, **options):
+        for item in self.find_withtag(tag_or_id):
+            if "tags" in options:
+                tags = options.pop("tags")
+                self.items[item]["tags"] = {tags} if isinstance(tags, str) else set(tags)
+            self.items[item]["options"].update(options)
+            self._record("itemconfigure", item, options)
+
+    itemconfig = itemconfigure
+
+    def itemcget(self, tag_or_id, option):
+        found = self.find_withtag(tag_or_id)
+        return self.items[found[0]]["options"].get(option, "") if found else ""
+
+    def coords(self, tag_or_id, *args):
+        found = self.find_withtag(tag_or_id)
+        if not args:
+            return list(self.items[found[0]]["coords"]) if found else []
+        coords = list(args[0]) if len(args) == 1 and isinstance(args[0], (list, tuple)) else list(args)
+        for item in found:
+            self.items[item]["coords"] = coords
+            self._record("coords", item, coords)
+
+    # Widget methods that have no effect without a display
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    config = configure
+
+    def cget(self, option):
+        return self.options.get(option, "")
+
+    def winfo_width(self):
+        return self.options.get("width", 0)
+
+    def winfo_height(self):
+        return self.options.get("height", 0)
+
+    def bind(self, sequence=None, func=None, add=None):
+        return None
+
+    def tag_bind(self, tag_or_id, sequence=None, func=None, add=None):
+        return None
+
+    def pack(self, **options):
+        return None
+
+    def place(self, **options):
+        return None
+
+    def grid(self, **options):
+        return None
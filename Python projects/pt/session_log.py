@@ -0,0 +1,244 @@
+"""
+Append-only session log for the Binary Pomodoro widget.
+Stores every timer start/pause/complete/reset as a fixed-size binary record.
+Appends only touch an in-memory buffer; a background thread writes and
+fsyncs in batches. Reads go through mmap, so opening years of history is
+constant time.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+
+
+# File header: magic, format version, record size
+HEADER = struct.Struct("<8sHH4x")
+MAGIC = b"PMDRLOG\0"
+VERSION = 1
+
+# Record: wall-clock timestamp, elapsed seconds, planned minutes, event
+RECORD = struct.Struct("<dfHBx")
+
+EVENT_START = 1
+EVENT_PAUSE = 2
+EVENT_COMPLETE = 3
+EVENT_RESET = 4
+
+EVENT_CODES = {
+    "start": EVENT_START,
+    "pause": EVENT_PAUSE,
+    "complete": EVENT_COMPLETE,
+    "reset": EVENT_RESET,
+}
+EVENT_NAMES = {code: name for name, code in EVENT_CODES.items()}
+
+
+def default_log_path():
+    """Return the per-user session log location."""
+    return os.path.join(os.path.expanduser("~"), ".binary_pomodoro", "sessions.log")
+
+
+class SessionRecord:
+    """One decoded log record."""
+
+    __slots__ = ("timestamp", "elapsed", "minutes", "event")
+
+    def __init__(self, timestamp, elapsed, minutes, event):
+        self.timestamp = timestamp
+        self.elapsed = elapsed
+        self.minutes = minutes
+        self.event = event
+
+    @property
+    def event_name(self):
+        return EVENT_NAMES.get(self.event, "unknown")
+
+    def __repr__(self):
+        return (f"SessionRecord(timestamp={self.timestamp:.3f}, elapsed={self.elapsed:.1f}, "
+                f"minutes={self.minutes}, event={self.event_name!r})")
+
+
+class SessionLog:
+    """
+    Writer for the session log.
+
+    append() packs the record into a buffer and returns immediately. A
+    daemon thread writes the buffer when batch_size records are waiting
+    or flush_interval seconds have passed, and fsyncs at most every
+    fsync_interval seconds. close() writes and fsyncs everything left.
+    """
+
+    def __init__(self, path=None, batch_size=64, flush_interval=2.0, fsync_interval=10.0):
+        self.path = path or default_log_path()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+            self._file.flush()
+        else:
+            self._truncate_partial_record()
+
+        self._buffer = bytearray()
+        self._pending = 0
+        self._lock = threading.Condition()
+        self._closed = False
+        self._dirty = False
+
+        self.records_written = 0
+        self.writes = 0
+        self.fsyncs = 0
+
+        self._thread = threading.Thread(target=self._writer, name="session-log", daemon=True)
+        self._thread.start()
+
+    def _truncate_partial_record(self):
+        """Drop a torn trailing record left by a crash mid-write."""
+        size = self._file.tell()
+        extra = (size - HEADER.size) % RECORD.size
+        if extra:
+            self._file.truncate(size - extra)
+            self._file.seek(0, os.SEEK_END)
+
+    def append(self, event, minutes, elapsed, timestamp):
+        """
+        Buffer one record. Never blocks on disk I/O.
+
+        Args:
+            event: Event name ("start", "pause", "complete", "reset") or code
+            minutes: Planned session length in minutes
+            elapsed: Seconds of the session elapsed at the event
+            timestamp: Wall-clock time of the event (seconds since the epoch)
+        """
+        code = EVENT_CODES[event] if isinstance(event, str) else event
+        record = RECORD.pack(timestamp, elapsed, minutes, code)
+        with self._lock:
+            if self._closed:
+                raise ValueError("append to a closed SessionLog")
+            self._buffer += record
+            self._pending += 1
+            if self._pending >= self.batch_size:
+                self._lock.notify()
+
+    def record_timer_event(self, event, timer):
+        """Timer listener: log a PomodoroTimer state transition."""
+        elapsed = timer.total_seconds - timer.remaining_seconds
+        self.append(event, timer.minutes, elapsed, timer.clock.wall())
+
+    def flush(self):
+        """Ask the writer thread to write everything buffered now."""
+        with self._lock:
+            self._lock.notify()
+
+    def _writer(self):
+        last_fsync = 0.0
+        while True:
+            with self._lock:
+                if not self._closed and self._pending < self.batch_size:
+                    self._lock.wait(self.flush_interval)
+                data = bytes(self._buffer)
+                self._buffer.clear()
+                count = self._pending
+                self._pending = 0
+                closed = self._closed
+
+            if data:
+                self._file.write(data)
+                self._file.flush()
+                self.records_written += count
+                self.writes += 1
+                self._dirty = True
+
+            now = time.monotonic()
+            if self._dirty and (closed or now - last_fsync >= self.fsync_interval):
+                os.fsync(self._file.fileno())
+                self.fsyncs += 1
+                self._dirty = False
+                last_fsync = now
+
+            if closed:
+                return
+
+    def close(self):
+        """Write and fsync everything buffered, then close the file."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._lock.notify()
+        self._thread.join()
+        self._file.close()
+
+
+class SessionLogReader:
+    """
+    Memory-mapped, read-only view of a session log.
+
+    Opening does not read the records; indexing decodes one record from
+    the mapping. Records appended after opening are not visible until
+    the reader is reopened.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_log_path()
+        self._file = open(self.path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = None
+        self._count = 0
+        if size >= HEADER.size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, record_size = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or record_size != RECORD.size:
+                self.close()
+                raise ValueError(f"{self.path} is not a session log (version {version})")
+            self._count = (size - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("session log index out of range")
+        return SessionRecord(*RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size))
+
+    def __iter__(self):
+        if self._map is None:
+            return
+        end = HEADER.size + self._count * RECORD.size
+        for fields in RECORD.iter_unpack(self._map[HEADER.size:end]):
+            yield SessionRecord(*fields)
+
+    def raw(self):
+        """
+        Return the record bytes (header excluded) as a memoryview.
+        Release it before close(), since it points into the mapping.
+        """
+        if self._map is None:
+            return memoryview(b"")
+        return memoryview(self._map)[HEADER.size:HEADER.size + self._count * RECORD.size]
+
+    def tail(self, count):
+        """Return the last count records, newest last."""
+        start = max(0, self._count - count)
+        return [self[i] for i in range(start, self._count)]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,444 @@
+"""
+Session statistics for the Binary Pomodoro widget.
+Computes focus time per day and per hour, completion rate, streaks and an
+interruption histogram from the session log.
+
+The history is loaded once with NumPy over the memory-mapped log columns
+(falling back to a pure-Python pass if NumPy is missing), then kept up to
+date incrementally from timer events, so building a summary costs the same
+for 100 or 1,000,000 sessions.
+
+Usage:
+    python session_stats.py                 # summary of the default log
+    python session_stats.py --benchmark 1000000
+"""
+
+import datetime
+import os
+import time
+
+from session_log import (
+    EVENT_COMPLETE, EVENT_PAUSE, EVENT_RESET, EVENT_START, EVENT_CODES,
+    SessionLog, SessionLogReader, default_log_path
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+SECONDS_PER_DAY = 86400
+
+
+def local_utc_offset():
+    """Return the current local UTC offset in seconds."""
+    return time.localtime().tm_gmtoff
+
+
+def _record_dtype():
+    """NumPy view of session_log.RECORD (timestamp, elapsed, minutes, event)."""
+    return np.dtype({
+        "names": ["timestamp", "elapsed", "minutes", "event"],
+        "formats": ["<f8", "<f4", "<u2", "u1"],
+        "offsets": [0, 8, 12, 14],
+        "itemsize": 16,
+    })
+
+
+def _empty_state():
+    return {
+        "focus_by_day": {},
+        "focus_by_hour": [0.0] * 24,
+        "completed": 0,
+        "abandoned": 0,
+        "longest_streak": 0,
+        "current_streak": 0,
+        "last_completion_day": None,
+        "interruptions": [],
+        "open_run": None,
+        "open_pauses": 0,
+    }
+
+
+def compute_python(records, utc_offset):
+    """
+    Pure-Python baseline: one loop over (timestamp, elapsed, event) tuples.
+
+    A running stretch is a start followed by pause/complete/reset; its
+    focus time is credited to the local day and hour it started in. A
+    session ends at complete or reset, and its pauses are its interruptions.
+    """
+    state = _empty_state()
+    focus_by_day = state["focus_by_day"]
+    focus_by_hour = state["focus_by_hour"]
+    interruptions = state["interruptions"]
+    completion_days = []
+    run = None
+    pauses = 0
+
+    for timestamp, elapsed, event in records:
+        if run is not None and event in (EVENT_PAUSE, EVENT_COMPLETE, EVENT_RESET):
+            start_ts, start_elapsed = run
+            local = start_ts + utc_offset
+            day = int(local // SECONDS_PER_DAY)
+            hour = int((local % SECONDS_PER_DAY) // 3600)
+            focus = max(0.0, elapsed - start_elapsed)
+            focus_by_day[day] = focus_by_day.get(day, 0.0) + focus
+            focus_by_hour[hour] += focus
+        run = (timestamp, elapsed) if event == EVENT_START else None
+
+        if event == EVENT_PAUSE:
+            pauses += 1
+        elif event in (EVENT_COMPLETE, EVENT_RESET):
+            while len(interruptions) <= pauses:
+                interruptions.append(0)
+            interruptions[pauses] += 1
+            pauses = 0
+            if event == EVENT_COMPLETE:
+                state["completed"] += 1
+                completion_days.append(int((timestamp + utc_offset) // SECONDS_PER_DAY))
+            else:
+                state["abandoned"] += 1
+
+    streak = 0
+    previous = None
+    for day in sorted(set(completion_days)):
+        streak = streak + 1 if previous is not None and day == previous + 1 else 1
+        state["longest_streak"] = max(state["longest_streak"], streak)
+        previous = day
+    state["current_streak"] = streak
+    state["last_completion_day"] = previous
+    state["open_run"] = run
+    state["open_pauses"] = pauses
+    return state
+
+
+def compute_numpy(timestamp, elapsed, event, utc_offset):
+    """Vectorized equivalent of compute_python over column arrays."""
+    state = _empty_state()
+    count = len(event)
+    if count == 0:
+        return state
+
+    local = timestamp + utc_offset
+    day = np.floor_divide(local, SECONDS_PER_DAY).astype(np.int64)
+    hour = (np.mod(local, SECONDS_PER_DAY) // 3600).astype(np.int64)
+
+    is_start = event == EVENT_START
+    is_pause = event == EVENT_PAUSE
+    is_complete = event == EVENT_COMPLETE
+    is_end = is_complete | (event == EVENT_RESET)
+
+    # Running stretches: a start immediately followed by pause/complete/reset
+    stops = np.zeros(count, dtype=bool)
+    stops[1:] = (is_pause | is_end)[1:] & is_start[:-1]
+    stop_idx = np.nonzero(stops)[0]
+    focus = np.maximum(0.0, elapsed[stop_idx].astype(np.float64) - elapsed[stop_idx - 1])
+    state["focus_by_hour"] = np.bincount(hour[stop_idx - 1], weights=focus, minlength=24).tolist()
+    days, inverse = np.unique(day[stop_idx - 1], return_inverse=True)
+    state["focus_by_day"] = dict(zip(days.tolist(), np.bincount(inverse, weights=focus).tolist()))
+
+    state["completed"] = int(is_complete.sum())
+    state["abandoned"] = int(is_end.sum()) - state["completed"]
+
+    # Streaks of consecutive local days with at least one completion
+    completion_days = np.unique(day[is_complete])
+    if len(completion_days):
+        breaks = np.nonzero(np.diff(completion_days) != 1)[0]
+        run_starts = np.concatenate(([0], breaks + 1))
+        run_ends = np.concatenate((breaks, [len(completion_days) - 1]))
+        lengths = run_ends - run_starts + 1
+        state["longest_streak"] = int(lengths.max())
+        state["current_streak"] = int(lengths[-1])
+        state["last_completion_day"] = int(completion_days[-1])
+
+    # Interruptions: pauses between consecutive session ends
+    pauses_so_far = np.cumsum(is_pause)
+    end_idx = np.nonzero(is_end)[0]
+    at_end = pauses_so_far[end_idx]
+    if len(end_idx):
+        per_session = np.diff(np.concatenate(([0], at_end)))
+        state["interruptions"] = np.bincount(per_session).tolist()
+    state["open_pauses"] = int(pauses_so_far[-1] - (at_end[-1] if len(end_idx) else 0))
+
+    if is_start[-1]:
+        state["open_run"] = (float(timestamp[-1]), float(elapsed[-1]))
+    return state
+
+
+def load_state(path=None, utc_offset=None, use_numpy=True):
+    """Compute the aggregate state of a whole session log."""
+    if utc_offset is None:
+        utc_offset = local_utc_offset()
+    path = path or default_log_path()
+    if not os.path.exists(path):
+        return _empty_state()
+
+    with SessionLogReader(path) as reader:
+        if use_numpy and np is not None:
+            raw = reader.raw()
+            try:
+                return _compute_from_buffer(raw, utc_offset)
+            finally:
+                raw.release()
+        records = ((r.timestamp, r.elapsed, r.event) for r in reader)
+        return compute_python(records, utc_offset)
+
+
+def _compute_from_buffer(buffer, utc_offset):
+    # Kept separate so the array views into the mapping are gone on return
+    columns = np.frombuffer(buffer, dtype=_record_dtype())
+    return compute_numpy(columns["timestamp"], columns["elapsed"], columns["event"], utc_offset)
+
+
+class SessionStats:
+    """
+    Aggregates over the session history, updated one event at a time.
+
+    Load the history with from_log(), then register record_timer_event
+    as a PomodoroTimer listener; summary() never looks at past records.
+    """
+
+    def __init__(self, state=None, utc_offset=None):
+        self.utc_offset = local_utc_offset() if utc_offset is None else utc_offset
+        state = state or _empty_state()
+        self.focus_by_day = dict(state["focus_by_day"])
+        self.focus_by_hour = list(state["focus_by_hour"])
+        self.completed = state["completed"]
+        self.abandoned = state["abandoned"]
+        self.longest_streak = state["longest_streak"]
+        self.current_streak = state["current_streak"]
+        self.last_completion_day = state["last_completion_day"]
+        self.interruptions = list(state["interruptions"])
+        self._run = state["open_run"]
+        self._pauses = state["open_pauses"]
+
+    @classmethod
+    def from_log(cls, path=None, utc_offset=None):
+        """Load aggregates from a session log file."""
+        if utc_offset is None:
+            utc_offset = local_utc_offset()
+        return cls(load_state(path, utc_offset), utc_offset)
+
+    def _day(self, timestamp):
+        return int((timestamp + self.utc_offset) // SECONDS_PER_DAY)
+
+    def add(self, event, elapsed, timestamp):
+        """Fold one event into the aggregates in O(1)."""
+        if isinstance(event, str):
+            event = EVENT_CODES[event]
+
+        if self._run is not None and event in (EVENT_PAUSE, EVENT_COMPLETE, EVENT_RESET):
+            start_ts, start_elapsed = self._run
+            local = start_ts + self.utc_offset
+            day = int(local // SECONDS_PER_DAY)
+            focus = max(0.0, elapsed - start_elapsed)
+            self.focus_by_day[day] = self.focus_by_day.get(day, 0.0) + focus
+            self.focus_by_hour[int((local % SECONDS_PER_DAY) // 3600)] += focus
+        self._run = (timestamp, elapsed) if event == EVENT_START else None
+
+        if event == EVENT_PAUSE:
+            self._pauses += 1
+        elif event in (EVENT_COMPLETE, EVENT_RESET):
+            while len(self.interruptions) <= self._pauses:
+                self.interruptions.append(0)
+            self.interruptions[self._pauses] += 1
+            self._pauses = 0
+            if event == EVENT_COMPLETE:
+                self.completed += 1
+                self._add_completion_day(self._day(timestamp))
+            else:
+                self.abandoned += 1
+
+    def _add_completion_day(self, day):
+        last = self.last_completion_day
+        if last is not None and day <= last:
+            return
+        if last is not None and day == last + 1:
+            self.current_streak += 1
+        else:
+            self.current_streak = 1
+        self.longest_streak = max(self.longest_streak, self.current_streak)
+        self.last_completion_day = day
+
+    def record_timer_event(self, event, timer):
+        """Timer listener: fold a PomodoroTimer state transition in."""
+        self.add(event, timer.total_seconds - timer.remaining_seconds, timer.clock.wall())
+
+    def completion_rate(self):
+        """Return completed / (completed + abandoned), 0 with no sessions."""
+        total = self.completed + self.abandoned
+        return self.completed / total if total else 0.0
+
+    def summary(self, today=None):
+        """Return a dict for a stats view. Cost does not depend on history size."""
+        if today is None:
+            today = self._day(time.time())
+        week = sum(self.focus_by_day.get(day, 0.0) for day in range(today - 6, today + 1))
+        streak = self.current_streak
+        if self.last_completion_day is None or self.last_completion_day < today - 1:
+            streak = 0
+        sessions = sum(self.interruptions)
+        pauses = sum(count * n for n, count in enumerate(self.interruptions))
+        return {
+            "today_seconds": self.focus_by_day.get(today, 0.0),
+            "week_seconds": week,
+            "focus_by_hour": list(self.focus_by_hour),
+            "completed": self.completed,
+            "abandoned": self.abandoned,
+            "completion_rate": self.completion_rate(),
+            "current_streak": streak,
+            "longest_streak": self.longest_streak,
+            "interruptions": list(self.interruptions),
+            "mean_interruptions": pauses / sessions if sessions else 0.0,
+        }
+
+    def state(self):
+        """Return the aggregates in the same form as compute_python()."""
+        return {
+            "focus_by_day": dict(self.focus_by_day),
+            "focus_by_hour": list(self.focus_by_hour),
+            "completed": self.completed,
+            "abandoned": self.abandoned,
+            "longest_streak": self.longest_streak,
+            "current_streak": self.current_streak,
+            "last_completion_day": self.last_completion_day,
+            "interruptions": list(self.interruptions),
+            "open_run": self._run,
+            "open_pauses": self._pauses,
+        }
+
+
+def format_summary(summary):
+    """Return a summary as display lines."""
+    def hours(seconds):
+        return f"{int(seconds // 3600)}h {int(seconds % 3600 // 60):02d}m"
+
+    busiest = max(range(24), key=lambda h: summary["focus_by_hour"][h])
+    return [
+        f"Today:          {hours(summary['today_seconds'])}",
+        f"Last 7 days:    {hours(summary['week_seconds'])}",
+        f"Completed:      {summary['completed']} "
+        f"({summary['completion_rate'] * 100:.0f}% of sessions)",
+        f"Streak:         {summary['current_streak']} days "
+        f"(best {summary['longest_streak']})",
+        f"Interruptions:  {summary['mean_interruptions']:.1f} per session",
+        f"Busiest hour:   {busiest:02d}:00",
+    ]
+
+
+def write_synthetic_log(path, events, seed=0):
+    """Write a plausible history of about `events` records for benchmarking."""
+    import random
+
+    rng = random.Random(seed)
+    log = SessionLog(path, batch_size=4096)
+    timestamp = datetime.datetime(2024, 1, 1, 8).timestamp()
+    written = 0
+    while written < events:
+        minutes = rng.choice((5, 15, 25, 25, 25, 45, 50))
+        total = minutes * 60
+        elapsed = 0.0
+        log.append("start", minutes, elapsed, timestamp)
+        written += 1
+        while True:
+            run = rng.uniform(60, total)
+            if elapsed + run >= total:
+                timestamp += total - elapsed
+                log.append("complete", minutes, total, timestamp)
+                written += 1
+                break
+            elapsed += run
+            timestamp += run
+            outcome = "reset" if rng.random() < 0.1 else "pause"
+            log.append(outcome, minutes, elapsed, timestamp)
+            written += 1
+            if outcome == "reset":
+                break
+            timestamp += rng.uniform(30, 900)
+            log.append("start", minutes, elapsed, timestamp)
+            written += 1
+        timestamp += rng.uniform(300, 4 * 3600)
+    log.close()
+
+
+def run_benchmark(events):
+    """Compare the NumPy and pure-Python history loads on a synthetic log."""
+    import tempfile
+
+    if np is None:
+        print("Error: numpy is required for the benchmark. Install with: pip install numpy")
+        return False
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessions.log")
+        write_synthetic_log(path, events)
+        offset = 0
+
+        started = time.perf_counter()
+        baseline = load_state(path, offset, use_numpy=False)
+        python_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        vectorized = load_state(path, offset, use_numpy=True)
+        numpy_seconds = time.perf_counter() - started
+
+        stats = SessionStats(vectorized, offset)
+        started = time.perf_counter()
+        for _ in range(1000):
+            stats.summary(today=stats.last_completion_day)
+        summary_us = (time.perf_counter() - started) / 1000 * 1e6
+
+        started = time.perf_counter()
+        stamp = 2e9
+        for i in range(10000):
+            stats.add("start" if i % 2 == 0 else "pause", float(i), stamp + i)
+        add_us = (time.perf_counter() - started) / 10000 * 1e6
+
+        with SessionLogReader(path) as reader:
+            count = len(reader)
+
+    same = _states_match(baseline, vectorized)
+    print(f"Records:        {count}")
+    print(f"Pure Python:    {python_seconds * 1000:.1f} ms")
+    print(f"NumPy:          {numpy_seconds * 1000:.1f} ms "
+          f"({python_seconds / numpy_seconds:.1f}x faster)")
+    print(f"summary():      {summary_us:.1f} us")
+    print(f"add():          {add_us:.2f} us")
+    print(f"Results match:  {same}")
+    return same
+
+
+def _states_match(a, b):
+    """Compare two states, allowing float rounding in the focus sums."""
+    def close(x, y):
+        return abs(x - y) <= 1e-6 * max(1.0, abs(x), abs(y))
+
+    if a["focus_by_day"].keys() != b["focus_by_day"].keys():
+        return False
+    if not all(close(a["focus_by_day"][d], b["focus_by_day"][d]) for d in a["focus_by_day"]):
+        return False
+    if not all(close(x, y) for x, y in zip(a["focus_by_hour"], b["focus_by_hour"])):
+        return False
+    keys = ("completed", "abandoned", "longest_streak", "current_streak",
+            "last_completion_day", "interruptions", "open_run", "open_pauses")
+    return all(a[key] == b[key] for key in keys)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Binary Pomodoro session statistics")
+    parser.add_argument("--log", help="Session log path (default: ~/.binary_pomodoro/sessions.log)")
+    parser.add_argument("--benchmark", type=int, metavar="EVENTS",
+                        help="Benchmark NumPy against pure Python on a synthetic log")
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sys.exit(0 if run_benchmark(args.benchmark) else 1)
+
+    for line in format_summary(SessionStats.from_log(args.log).summary()):
+        print(line)
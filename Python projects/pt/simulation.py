@@ -0,0 +1,399 @@
+"""
+Virtual-time simulation for the Binary Pomodoro timer.
+Drives PomodoroWidget's TimerController (the same arm/update cycle the widget
+runs) on a virtual clock, so hours of timer behaviour run in moments without a display.
+
+Usage:
+    python simulation.py --sessions 2000 --seed 1 --jitter-ms 40
+    python simulation.py --crash      # also kill and relaunch from the checkpoint
+"""
+
+import heapq
+import itertools
+import math
+import os
+import random
+import time
+
+from pomodoro_widget import PomodoroTimer, TimerController
+
+
+class VirtualClock:
+    """
+    Clock with the same interface as pomodoro_widget.SystemClock whose time
+    only moves when advance() is called. Callbacks scheduled with after()
+    run in due order as time passes over them.
+    """
+
+    def __init__(self, start=1000.0, wall_start=1700000000.0, latency=None):
+        self.now = start
+        self._wall_offset = wall_start - start
+        self._queue = []
+        self._seq = itertools.count(1)
+        self._cancelled = set()
+
+        # Optional callable returning extra seconds each callback runs late,
+        # to mimic a busy event loop
+        self.latency = latency
+
+    def monotonic(self):
+        """Return the virtual monotonic time."""
+        return self.now
+
+    def wall(self):
+        """Return the virtual wall-clock time."""
+        return self.now + self._wall_offset
+
+    def after(self, ms, callback):
+        """Schedule callback ms milliseconds from now. Returns a cancel handle."""
+        due = self.now + ms / 1000
+        if self.latency is not None:
+            due += self.latency()
+        handle = next(self._seq)
+        heapq.heappush(self._queue, (due, handle, callback))
+        return handle
+
+    def after_cancel(self, handle):
+        """Cancel a scheduled callback."""
+        self._cancelled.add(handle)
+
+    def pending(self):
+        """Return the number of callbacks still waiting to run."""
+        return sum(1 for _, handle, _ in self._queue if handle not in self._cancelled)
+
+    def next_due(self):
+        """Return the monotonic time the next callback runs, or None."""
+        return min((due for due, handle, _ in self._queue if handle not in self._cancelled),
+                   default=None)
+
+    def advance(self, seconds):
+        """Move time forward, running every callback that falls due."""
+        target = self.now + seconds
+        while self._queue and self._queue[0][0] <= target:
+            due, handle, callback = heapq.heappop(self._queue)
+            if handle in self._cancelled:
+                self._cancelled.discard(handle)
+                continue
+            self.now = max(self.now, due)
+            callback()
+        self.now = target
+
+    def suspend(self, seconds):
+        """Simulate a system suspend: wall time moves, monotonic time does not."""
+        self._wall_offset += seconds
+
+
+class HeadlessPomodoro(TimerController):
+    """
+    PomodoroWidget's TimerController without any Tk widgets: the same
+    toggle, set_minutes, reset, update loop and checkpoint code, scheduled
+    on an injected clock, with the display string standing in for the
+    window. With a checkpoint path the saved state is restored on
+    construction and kept up to date, as PomodoroWidget does.
+    """
+
+    def __init__(self, clock, initial_minutes=5, on_update=None, checkpoint_path=None,
+                 fsync=True):
+        super().__init__(PomodoroTimer(initial_minutes, clock=clock), clock, render=self._render)
+        self.on_update = on_update
+        if checkpoint_path is not None:
+            self.restore_checkpoint(checkpoint_path, fsync=fsync)
+        self._render()
+        self.resume()
+
+    def _render(self):
+        self.display = self.timer.get_display_time()
+
+    def show_tick(self):
+        super().show_tick()
+        if self.on_update is not None:
+            self.on_update(self)
+
+    def crash(self):
+        """Stop dead, as a killed process would: nothing more is saved."""
+        self.disarm()
+        self.close(save=False)
+
+
+class SessionSimulator:
+    """
+    Runs randomised start/pause/reset/set_minutes sessions to completion
+    and checks the display string and progress at every wake-up against
+    an independent model of elapsed running time.
+
+    With a checkpoint directory the app is also killed at random points
+    and relaunched from its checkpoint after some downtime; the restored
+    minutes, remaining time and running state are checked against the model.
+    """
+
+    def __init__(self, seed=0, jitter_ms=0.0, checkpoint_dir=None):
+        self.rng = random.Random(seed)
+        self.jitter = jitter_ms / 1000
+        self.failures = []
+        self.sessions = 0
+        self.wakeups = 0
+        self.virtual_seconds = 0.0
+
+        # Model of the current run: seconds counted before the last start,
+        # and when the current running stretch began
+        self._elapsed = 0.0
+        self._run_started = None
+        self._last_progress = 0.0
+
+        # Set when a simulated suspend runs past the deadline, or so close
+        # to it that the deadline falls before the wake-up already pending,
+        # so the completion can only be seen on the first wake-up after resume
+        self._overslept = False
+
+        # Crash and restore (checkpoint_dir only)
+        self.checkpoint_path = None
+        if checkpoint_dir is not None:
+            self.checkpoint_path = os.path.join(checkpoint_dir, "state.json")
+        self.crashes = 0
+        self.checkpoint_writes = 0
+        self.restore_times = []
+
+    def _fail(self, message):
+        self.failures.append(f"session {self.sessions}: {message}")
+
+    def _model_elapsed(self, clock):
+        elapsed = self._elapsed
+        if self._run_started is not None:
+            elapsed += clock.monotonic() - self._run_started
+        return elapsed
+
+    def _check_update(self, app):
+        """Called at each wake-up while running."""
+        timer = app.timer
+        total = timer.total_seconds
+        elapsed = self._model_elapsed(app.clock)
+        expected = max(0, math.ceil(total - elapsed - 1e-9))
+
+        if timer.remaining_seconds != expected:
+            self._fail(f"remaining {timer.remaining_seconds}s, expected {expected}s")
+
+        expected_display = f"{expected // 60:02d}:{expected % 60:02d}"
+        if app.display != expected_display:
+            self._fail(f"display {app.display!r}, expected {expected_display!r}")
+
+        progress = timer.get_progress_percent()
+        if not 0 <= progress <= 100 or progress < self._last_progress:
+            self._fail(f"progress went from {self._last_progress:.2f} to {progress:.2f}")
+        self._last_progress = progress
+
+        if timer.is_complete() and not self._overslept:
+            late = elapsed - total
+            limit = PomodoroTimer.WAKE_MARGIN + self.jitter + 0.002
+            if not 0 <= late <= limit:
+                self._fail(f"completed {late * 1000:.1f} ms after the deadline")
+        if timer.is_complete():
+            self._run_started = None
+
+    def _start(self, app):
+        app.toggle()
+        self._run_started = app.clock.monotonic()
+
+    def _pause(self, app):
+        """Pause; returns True if the session completed instead (deadline already past)."""
+        self._elapsed = self._model_elapsed(app.clock)
+        self._run_started = None
+        app.toggle()
+        expired = self._elapsed >= app.timer.total_seconds
+        if app.timer.is_complete() != expired:
+            self._fail(f"pause with {app.timer.total_seconds - self._elapsed:.3f}s left "
+                       f"{'completed' if app.timer.is_complete() else 'did not complete'}")
+        return app.timer.is_complete()
+
+    def _restart(self, app, minutes):
+        app.reset()
+        app.set_minutes(minutes)
+        self._elapsed = 0.0
+        self._run_started = None
+        self._last_progress = 0.0
+        self._overslept = False
+        if app.display != f"{app.timer.minutes:02d}:00":
+            self._fail(f"display after reset is {app.display!r}")
+
+    def _launch(self, clock):
+        """Create the app, restoring from the checkpoint if there is one."""
+        started = time.perf_counter()
+        app = HeadlessPomodoro(clock, on_update=self._check_update,
+                               checkpoint_path=self.checkpoint_path, fsync=False)
+        if self.checkpoint_path is not None:
+            self.restore_times.append(time.perf_counter() - started)
+        return app
+
+    def _crash(self, app):
+        """Kill the app, let time pass, relaunch it and check what came back."""
+        rng = self.rng
+        clock = app.clock
+        paused = not self._overslept and rng.random() < 0.3
+        if paused:
+            self._pause(app)
+
+        self.crashes += 1
+        self.wakeups += app.wakeup_count
+        self.checkpoint_writes += app.checkpoint.writes
+        minutes = app.timer.minutes
+        app.crash()
+
+        # Downtime counts as elapsed only for a running timer
+        clock.advance(rng.uniform(1, 1200))
+        total = minutes * 60
+        left = max(0.0, total - self._model_elapsed(clock))
+        if self._run_started is not None and left == 0:
+            self._overslept = True
+
+        app = self._launch(clock)
+        timer = app.timer
+        if timer.minutes != minutes:
+            self._fail(f"restored {timer.minutes} min, expected {minutes} min")
+        if timer.is_running != (not paused):
+            self._fail(f"restored running={timer.is_running}, expected {not paused}")
+        if paused:
+            # A paused timer is saved as displayed, in whole seconds
+            expected = math.ceil(left - 1e-9)
+            if timer.remaining_seconds != expected:
+                self._fail(f"restored {timer.remaining_seconds}s paused, expected {expected}s")
+        elif abs(timer._remaining_exact - left) > 1e-3:
+            self._fail(f"restored {timer._remaining_exact:.3f}s running, expected {left:.3f}s")
+        expected_display = f"{timer.remaining_seconds // 60:02d}:{timer.remaining_seconds % 60:02d}"
+        if app.display != expected_display:
+            self._fail(f"display after restore is {app.display!r}")
+
+        # Continue the model from what was restored
+        self._elapsed = timer.total_seconds - timer._remaining_exact
+        self._run_started = clock.monotonic() if timer.is_running else None
+        if paused:
+            self._start(app)
+        elif timer.is_complete():
+            # The deadline passed while the app was down: the first
+            # wake-up after the relaunch completes the session
+            clock.advance(1)
+        return app
+
+    def run_session(self):
+        """Run one session from a fresh timer until it completes."""
+        self.sessions += 1
+        rng = self.rng
+        latency = (lambda: rng.uniform(0, self.jitter)) if self.jitter else None
+        clock = VirtualClock(start=rng.uniform(0, 1e6), latency=latency)
+        if self.checkpoint_path is not None and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        app = self._launch(clock)
+        start_time = clock.monotonic()
+
+        self._restart(app, rng.randint(1, 60))
+        self._start(app)
+        resets_left = 2
+
+        while not app.timer.is_complete():
+            action = rng.random()
+            if action < 0.78:
+                clock.advance(rng.uniform(0.05, 90))
+            elif action < 0.81:
+                # Suspend while running: the model counts it, the timer must too
+                slept = rng.uniform(5, 900)
+                clock.suspend(slept)
+                self._elapsed += slept
+                left = app.timer.total_seconds - self._model_elapsed(clock)
+                if left <= 0 or clock.monotonic() + left < clock.next_due():
+                    self._overslept = True
+                clock.advance(rng.uniform(0.05, 5))
+            elif action < 0.95:
+                if self._pause(app):
+                    break
+                wakeups = app.wakeup_count
+                clock.advance(rng.uniform(0.5, 600))
+                if app.wakeup_count != wakeups or clock.pending():
+                    self._fail("paused timer woke up")
+                self._start(app)
+            elif self.checkpoint_path is not None and action < 0.98:
+                app = self._crash(app)
+            elif resets_left:
+                resets_left -= 1
+                self._restart(app, rng.randint(1, 60))
+                self._start(app)
+
+        if self._run_started is not None:
+            self._fail("completion was not observed at a wake-up")
+
+        # A finished widget must go quiet until the user acts again
+        wakeups = app.wakeup_count
+        clock.advance(3600)
+        if app.wakeup_count != wakeups:
+            self._fail("finished timer kept waking up")
+
+        # Pressing play again rewinds to the full duration
+        app.toggle()
+        if app.timer.remaining_seconds != app.timer.total_seconds:
+            self._fail("restart after completion did not reset the timer")
+        app.toggle()
+
+        self.wakeups += app.wakeup_count
+        if app.checkpoint is not None:
+            self.checkpoint_writes += app.checkpoint.writes
+        self.virtual_seconds += clock.monotonic() - start_time
+
+    def run(self, sessions):
+        """Run a number of sessions and return a summary dict."""
+        started = time.perf_counter()
+        for _ in range(sessions):
+            self.run_session()
+        summary = {
+            "sessions": self.sessions,
+            "virtual_hours": self.virtual_seconds / 3600,
+            "wakeups": self.wakeups,
+            "real_seconds": time.perf_counter() - started,
+            "failures": len(self.failures),
+        }
+        if self.checkpoint_path is not None:
+            restores = sorted(self.restore_times)
+            summary.update({
+                "crashes": self.crashes,
+                "checkpoint_writes": self.checkpoint_writes,
+                "restore_ms_p50": restores[len(restores) // 2] * 1000,
+                "restore_ms_max": restores[-1] * 1000,
+            })
+        return summary
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Simulate Pomodoro sessions in virtual time")
+    parser.add_argument("--sessions", type=int, default=1000, help="Number of sessions to run")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--jitter-ms", type=float, default=0.0,
+                        help="Maximum random lateness added to each wake-up")
+    parser.add_argument("--crash", action="store_true",
+                        help="Kill and relaunch the app at random, restoring from its checkpoint")
+
+    args = parser.parse_args()
+
+    if args.crash:
+        import tempfile
+        with tempfile.TemporaryDirectory() as directory:
+            simulator = SessionSimulator(seed=args.seed, jitter_ms=args.jitter_ms,
+                                         checkpoint_dir=directory)
+            summary = simulator.run(args.sessions)
+    else:
+        simulator = SessionSimulator(seed=args.seed, jitter_ms=args.jitter_ms)
+        summary = simulator.run(args.sessions)
+
+    print(f"Sessions:      {summary['sessions']}")
+    print(f"Virtual time:  {summary['virtual_hours']:.1f} h")
+    print(f"Wake-ups:      {summary['wakeups']}")
+    print(f"Real time:     {summary['real_seconds']:.2f} s")
+    if args.crash:
+        print(f"Crashes:       {summary['crashes']}")
+        print(f"Checkpoints:   {summary['checkpoint_writes']} writes "
+              f"({summary['checkpoint_writes'] / summary['virtual_hours']:.1f} per virtual hour)")
+        print(f"Restore:       p50 {summary['restore_ms_p50']:.3f} ms, "
+              f"max {summary['restore_ms_max']:.3f} ms")
+    print(f"Failures:      {summary['failures']}")
+    for failure in simulator.failures[:20]:
+        print(f"  {failure}")
+
+    sys.exit(1 if simulator.failures else 0)
@@ -0,0 +1,256 @@
+"""
+Single-instance launch for the Binary Pomodoro widget.
+The first instance listens on a loopback socket and publishes its pid,
+port and a random token in a lock file. Later launches read the lock,
+send their command-line arguments to that socket and exit before
+creating any Tk window. A lock left behind by a crashed instance is
+detected (dead pid or refused connection) and taken over.
+
+Usage:
+    python single_instance.py              # show who holds the lock
+    python single_instance.py --benchmark  # time hand-offs and stale recovery
+"""
+
+import json
+import os
+import secrets
+import socket
+import threading
+import time
+
+
+def default_lock_path():
+    """Return the per-user lock file location."""
+    return os.path.join(os.path.expanduser("~"), ".binary_pomodoro", "instance.lock")
+
+
+def _pid_alive(pid):
+    """Best-effort check that a process id is still running."""
+    if pid <= 0:
+        return False
+    if os.name == "nt":
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SingleInstance:
+    """
+    Lock file plus loopback socket owned by the running widget.
+
+    acquire() either takes ownership (returns True) or hands the given
+    arguments to the current owner (returns False). The lock file is
+    created with its final contents in one step (write a temp file, then
+    hard-link it into place), so readers never see a half-written lock.
+    """
+
+    CONNECT_TIMEOUT = 0.5
+
+    def __init__(self, path=None):
+        self.path = path or default_lock_path()
+        self.token = secrets.token_hex(16)
+        self.owner = False
+        self.stale_recoveries = 0
+        self._listener = None
+        self._thread = None
+
+    # Launch side
+
+    def acquire(self, argv):
+        """Own the lock, or deliver argv to the running instance."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        for _ in range(3):
+            if self._try_create():
+                self.owner = True
+                return True
+            lock = self._read_lock()
+            if lock is None:
+                continue  # Owner just exited; try again
+            delivered = self._hand_off(lock, argv)
+            if delivered or delivered is None:
+                # Delivered, or the owner is alive but slow: never start a rival
+                return False
+            self._remove_stale(lock)
+        raise RuntimeError(f"Could not acquire or hand off {self.path}")
+
+    def _try_create(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(8)
+        contents = json.dumps({
+            "pid": os.getpid(),
+            "port": listener.getsockname()[1],
+            "token": self.token,
+        })
+
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.write(fd, contents.encode())
+        finally:
+            os.close(fd)
+        try:
+            os.link(temp_path, self.path)
+        except FileExistsError:
+            listener.close()
+            return False
+        finally:
+            os.unlink(temp_path)
+
+        self._listener = listener
+        return True
+
+    def _read_lock(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lock = json.load(f)
+            return lock if {"pid", "port", "token"} <= lock.keys() else {}
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, AttributeError):
+            return {}  # Unreadable or corrupt: treat as stale
+
+    def _hand_off(self, lock, argv):
+        """
+        Send argv to the lock's owner. Returns True when delivered, None
+        when the owner timed out, and False when the lock is stale (dead
+        pid, or nothing listening because the pid was reused).
+        """
+        if not lock or not _pid_alive(lock["pid"]):
+            return False
+        message = json.dumps({"token": lock["token"], "argv": list(argv)}).encode() + b"\n"
+        try:
+            with socket.create_connection(("127.0.0.1", lock["port"]),
+                                          timeout=self.CONNECT_TIMEOUT) as sock:
+                sock.sendall(message)
+                return sock.recv(16).startswith(b"ok")
+        except socket.timeout:
+            return None
+        except OSError:
+            return False
+
+    def _remove_stale(self, lock):
+        """Delete the lock if it is still the one judged stale."""
+        if self._read_lock() != lock:
+            return  # Someone else replaced it meanwhile; re-check
+        try:
+            os.unlink(self.path)
+            self.stale_recoveries += 1
+        except FileNotFoundError:
+            pass
+
+    # Owner side
+
+    def serve(self, on_handoff):
+        """
+        Accept hand-offs in a daemon thread.
+
+        on_handoff(argv) runs on that thread; marshal to Tk with after().
+        """
+        self._thread = threading.Thread(
+            target=self._accept_loop, args=(on_handoff,), name="single-instance", daemon=True
+        )
+        self._thread.start()
+
+    def _accept_loop(self, on_handoff):
+        while True:
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                return  # Listener closed by release()
+            with conn:
+                conn.settimeout(self.CONNECT_TIMEOUT)
+                try:
+                    request = json.loads(conn.makefile("rb").readline())
+                    if request.get("token") != self.token:
+                        continue
+                    conn.sendall(b"ok\n")
+                except (OSError, ValueError, AttributeError):
+                    continue
+            on_handoff(request.get("argv", []))
+
+    def release(self):
+        """Close the socket and delete the lock if it is still ours."""
+        if self._listener is not None:
+            try:
+                self._listener.shutdown(socket.SHUT_RDWR)  # Wakes accept()
+            except OSError:
+                pass
+            self._listener.close()
+            self._listener = None
+        if self.owner:
+            lock = self._read_lock()
+            if lock and lock.get("token") == self.token:
+                os.unlink(self.path)
+            self.owner = False
+
+
+def measure_handoff(runs=20):
+    """Time hand-offs to a live owner and stale-lock takeovers."""
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "instance.lock")
+        owner = SingleInstance(path)
+        owner.acquire([])
+        received = []
+        owner.serve(received.append)
+
+        handoffs = []
+        for i in range(runs):
+            started = time.perf_counter()
+            launched = SingleInstance(path).acquire(["--minutes", str(i)])
+            handoffs.append(time.perf_counter() - started)
+            assert not launched
+        owner.release()
+
+        # Simulate a crash: a lock whose owner is gone
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"pid": 2 ** 22 + 1, "port": 9, "token": "dead"}, f)
+        started = time.perf_counter()
+        successor = SingleInstance(path)
+        took_over = successor.acquire([])
+        takeover = time.perf_counter() - started
+        successor.release()
+
+    handoffs.sort()
+    print(f"Hand-offs:        {len(received)}/{runs} delivered")
+    print(f"Hand-off time:    median {handoffs[len(handoffs) // 2] * 1000:.2f} ms, "
+          f"max {handoffs[-1] * 1000:.2f} ms")
+    print(f"Stale takeover:   {'ok' if took_over else 'FAILED'} in {takeover * 1000:.2f} ms")
+    return took_over and len(received) == runs
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Inspect the single-instance lock")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Time hand-offs and stale-lock recovery")
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sys.exit(0 if measure_handoff() else 1)
+
+    lock = SingleInstance()._read_lock()
+    if lock is None:
+        print("No instance is running")
+    elif not lock or not _pid_alive(lock["pid"]):
+        print(f"Stale lock at {default_lock_path()} (will be recovered on next launch)")
+    else:
+        print(f"Running instance: pid {lock['pid']}, port {lock['port']}")
@@ -0,0 +1,417 @@
+"""
+Terminal front end for the Binary Pomodoro timer, for hosts without a display.
+The real BinaryChristmasTree draws onto CellCanvas, a canvas stand-in that
+rasterises its items to a character grid; TerminalScreen keeps a shadow
+copy of what the terminal shows and writes only the cells that changed,
+so a steady tick costs about ten bytes of ANSI output.
+
+Usage:
+    python terminal_widget.py 25             # 25-minute session in this terminal
+    python terminal_widget.py --compact      # half-height tree for small panes
+    python terminal_widget.py --benchmark    # bytes per tick over a virtual session
+
+Keys: space start/pause, + / - minutes, r reset, q quit
+"""
+
+import os
+import sys
+
+from pomodoro_widget import (
+    TREE_CANVAS_HEIGHT, TREE_CANVAS_WIDTH, PomodoroTimer, make_tree, tree_min_growth, update_tree
+)
+from recording_canvas import RecordingCanvas
+
+
+# Canvas pixels per terminal cell (columns, rows)
+SCALE = (4, 11)
+COMPACT_SCALE = (6, 22)
+
+TIME_COLOR = "#ffffff"
+STATUS_COLOR = "#2d5a2d"
+
+BLANK = (" ", None)
+
+
+class CellCanvas(RecordingCanvas):
+    """
+    RecordingCanvas that rasterises its items onto a character grid.
+
+    Text items become their characters at the cell under their centre
+    and rectangles fill the cells they cover; lines (the trunk detail)
+    are finer than a cell and are skipped. `dirty` is set by every
+    change, so an unchanged canvas is not re-rasterised.
+    """
+
+    def __init__(self, x_scale, y_scale, width=TREE_CANVAS_WIDTH, height=TREE_CANVAS_HEIGHT):
+        super().__init__(width=width, height=height)
+        self.x_scale = x_scale
+        self.y_scale = y_scale
+        self.cols = -(-width // x_scale)
+        self.rows = -(-height // y_scale)
+        self.dirty = True
+
+    def _record(self, operation, item, details=None):
+        # Count only: a long-running terminal session must not grow a log
+        self.counts[operation] += 1
+        self.dirty = True
+
+    def _cell(self, x, y):
+        return int(y / self.y_scale + 0.5), int(x / self.x_scale + 0.5)
+
+    def rasterize(self):
+        """Return the canvas as rows of (char, style) cells."""
+        grid = [[BLANK] * self.cols for _ in range(self.rows)]
+
+        def put(row, col, char, style):
+            if 0 <= row < self.rows and 0 <= col < self.cols:
+                grid[row][col] = (char, style)
+
+        for item in self.items.values():
+            options = item["options"]
+            if options.get("state") == "hidden":
+                continue
+            coords = item["coords"]
+            kind = item["type"]
+            if kind == "text":
+                text = options.get("text", "")
+                row, col = self._cell(coords[0], coords[1])
+                col -= len(text) // 2
+                for offset, char in enumerate(text):
+                    put(row, col + offset, char, (options.get("fill"), True))
+            elif kind == "rectangle":
+                top, left = self._cell(coords[0], coords[1])
+                bottom, right = self._cell(coords[2], coords[3])
+                for row in range(top, max(bottom, top + 1)):
+                    for col in range(left, max(right, left + 1)):
+                        put(row, col, "█", (options.get("fill"), False))
+
+        self.dirty = False
+        return grid
+
+
+class TerminalScreen:
+    """
+    Shadow-buffered ANSI output.
+
+    present() compares a frame with what was last written and emits
+    cursor moves, colour changes and characters only for cells that
+    differ; unchanged rows are skipped with one tuple comparison. The
+    cursor position and active colour are remembered between frames,
+    so a tick that changes one digit costs one cursor move and the digit.
+    """
+
+    def __init__(self, out, truecolor=True):
+        self.out = out
+        self.truecolor = truecolor
+        self._shadow = None
+        self._sgr = {}
+        self._cursor = None
+        self._current = None
+
+        self.frames = 0
+        self.full_redraws = 0
+        self.bytes_total = 0
+        self.bytes_last = 0
+        self.bytes_max_tick = 0
+        self.cells_last = 0
+
+    def invalidate(self):
+        """Force the next frame to repaint everything (e.g. after a resize)."""
+        self._shadow = None
+        self._cursor = None
+        self._current = None
+
+    def _style(self, style):
+        sgr = self._sgr.get(style)
+        if sgr is None:
+            color, bold = style if style is not None else (None, False)
+            codes = ["0"]
+            if bold:
+                codes.append("1")
+            if color:
+                r, g, b = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+                if self.truecolor:
+                    codes.append(f"38;2;{r};{g};{b}")
+                else:
+                    cube = 16 + 36 * round(r / 51) + 6 * round(g / 51) + round(b / 51)
+                    codes.append(f"38;5;{cube}")
+            sgr = f"\x1b[{';'.join(codes)}m"
+            self._sgr[style] = sgr
+        return sgr
+
+    def present(self, frame, bell=False):
+        """Write the difference between frame and the screen (and a bell); return bytes written."""
+        parts = ["\a"] if bell else []
+        full = self._shadow is None or len(self._shadow) != len(frame)
+        if full:
+            parts.append("\x1b[0m\x1b[H\x1b[2J")
+            shadow = [(BLANK,) * len(row) for row in frame]
+            self._cursor = (0, 0)
+            self._current = None
+        else:
+            shadow = self._shadow
+
+        cursor = self._cursor
+        current = self._current
+        cells = 0
+        for r, (new_row, old_row) in enumerate(zip(frame, shadow)):
+            if new_row == old_row:
+                continue
+            for c, cell in enumerate(new_row):
+                if c < len(old_row) and cell == old_row[c]:
+                    continue
+                if cursor != (r, c):
+                    parts.append(f"\x1b[{r + 1};{c + 1}H")
+                sgr = self._style(cell[1])
+                if sgr != current:
+                    parts.append(sgr)
+                    current = sgr
+                parts.append(cell[0])
+                cursor = (r, c + 1)
+                cells += 1
+
+        self._shadow = frame
+        self._cursor = cursor
+        self._current = current
+        data = "".join(parts).encode("utf-8")
+        if data:
+            self.out.write(data)
+            self.out.flush()
+
+        self.frames += 1
+        self.full_redraws += full
+        self.cells_last = cells
+        self.bytes_last = len(data)
+        self.bytes_total += len(data)
+        if not full:
+            self.bytes_max_tick = max(self.bytes_max_tick, len(data))
+        return len(data)
+
+    def stats(self):
+        """Return output counters."""
+        return {
+            "frames": self.frames,
+            "full_redraws": self.full_redraws,
+            "bytes_total": self.bytes_total,
+            "bytes_max_tick": self.bytes_max_tick,
+        }
+
+
+class TerminalPomodoro:
+    """
+    PomodoroTimer plus BinaryChristmasTree rendered as text.
+
+    The tree is the widget's own class drawing onto a CellCanvas; the
+    time and a status line are added below it. render() rebuilds the
+    frame only if the canvas or the text changed, then lets the screen
+    write the difference.
+    """
+
+    def __init__(self, minutes=25, out=None, clock=None, compact=False, truecolor=True,
+                 show_seconds=False):
+        self.timer = PomodoroTimer(minutes, clock=clock)
+        self.show_seconds = show_seconds
+        x_scale, y_scale = COMPACT_SCALE if compact else SCALE
+        self.canvas = CellCanvas(x_scale, y_scale)
+        self.tree = make_tree(self.canvas, bits=12 if show_seconds else None)
+        self.min_growth = tree_min_growth(self.tree)
+        # Brighter '1' digits: terminal greens are hard to tell apart
+        self.tree.leaf_glow = "#ccffcc"
+
+        self.screen = TerminalScreen(out or sys.stdout.buffer, truecolor)
+        self._tree_rows = None
+        self._text = None
+        self.completed = False
+        self.tick_bytes = []
+
+    # Frame
+
+    def _status(self):
+        if self.completed:
+            state = "done"
+        elif self.timer.is_running:
+            state = "running"
+        else:
+            state = "paused"
+        status = f"{state}  [space] start/pause  [+/-] minutes  [r] reset  [q] quit"
+        if len(status) > self.canvas.cols:
+            status = f"{state}  space +/- r q"
+        return status
+
+    def _text_row(self, text, style):
+        cols = self.canvas.cols
+        text = text[:cols]
+        left = (cols - len(text)) // 2
+        row = [BLANK] * cols
+        for offset, char in enumerate(text):
+            row[left + offset] = (char, style)
+        return tuple(row)
+
+    def render(self, bell=False):
+        """Draw the current state, ringing the bell if asked; return bytes written."""
+        update_tree(self.tree, self.timer, self.min_growth, self.show_seconds)
+
+        text = (self.timer.get_display_time(), self._status())
+        if (not bell and not self.canvas.dirty and text == self._text
+                and self.screen._shadow is not None):
+            return 0
+        if self.canvas.dirty or self._tree_rows is None:
+            self._tree_rows = [tuple(row) for row in self.canvas.rasterize()]
+        self._text = text
+
+        frame = self._tree_rows + [
+            self._text_row(text[0], (TIME_COLOR, True)),
+            self._text_row(text[1], (STATUS_COLOR, False)),
+        ]
+        return self.screen.present(frame, bell)
+
+    # Input
+
+    def handle_key(self, key):
+        """Apply one key press. Returns False to quit."""
+        timer = self.timer
+        if key in ("q", "\x1b"):
+            return False
+        if key == " ":
+            if timer.is_complete():
+                timer.reset()
+            if timer.is_running:
+                timer.pause()
+            else:
+                timer.start()
+            # Pausing after the deadline passed unseen completes the session
+            self.completed = timer.is_complete()
+        elif key in ("+", "=") and not timer.is_running:
+            timer.set_minutes(timer.minutes + 1)
+            self.completed = False
+        elif key in ("-", "_") and not timer.is_running:
+            timer.set_minutes(timer.minutes - 1)
+            self.completed = False
+        elif key == "r":
+            timer.reset()
+            self.completed = False
+        return True
+
+    def tick(self):
+        """Advance the timer and redraw; returns bytes written."""
+        bell = False
+        if self.timer.is_running and not self.timer.tick():
+            self.completed = True
+            bell = True
+        written = self.render(bell)
+        self.tick_bytes.append(written)
+        return written
+
+    # Interactive loop
+
+    def run(self):
+        """Run in the controlling terminal until q is pressed."""
+        import select
+        import signal
+        import termios
+        import tty
+
+        fd = sys.stdin.fileno()
+        saved = termios.tcgetattr(fd)
+        wake_r, wake_w = os.pipe()
+        os.set_blocking(wake_w, False)
+
+        def on_resize(signum, frame):
+            self.screen.invalidate()
+            try:
+                os.write(wake_w, b"\0")
+            except BlockingIOError:
+                pass
+
+        previous_handler = signal.signal(signal.SIGWINCH, on_resize)
+        out = self.screen.out
+        out.write(b"\x1b[?1049h\x1b[?25l")
+        try:
+            tty.setcbreak(fd)
+            self.render()
+            running = True
+            while running:
+                timeout = self.timer.next_tick_delay() / 1000 if self.timer.is_running else None
+                ready, _, _ = select.select([fd, wake_r], [], [], timeout)
+                if wake_r in ready:
+                    os.read(wake_r, 64)
+                if fd in ready:
+                    for key in os.read(fd, 32).decode(errors="ignore"):
+                        running = running and self.handle_key(key)
+                self.tick()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+            signal.signal(signal.SIGWINCH, previous_handler)
+            out.write(b"\x1b[0m\x1b[?25h\x1b[?1049l")
+            out.flush()
+            os.close(wake_r)
+            os.close(wake_w)
+        print_stats(self)
+
+
+def print_stats(app):
+    """Print bytes written per tick to stderr."""
+    ticks = [b for b in app.tick_bytes if b] or [0]
+    stats = app.screen.stats()
+    print(f"Frames written:   {stats['frames']} ({stats['full_redraws']} full redraws)", file=sys.stderr)
+    print(f"Bytes:            {stats['bytes_total']} total, {sum(ticks) / len(ticks):.1f} mean "
+          f"and {stats['bytes_max_tick']} max per changed tick", file=sys.stderr)
+
+
+def run_benchmark(minutes=25, compact=False):
+    """Run a session on a virtual clock and report bytes per tick."""
+    import io
+
+    from simulation import VirtualClock
+
+    clock = VirtualClock()
+    out = io.BytesIO()
+    app = TerminalPomodoro(minutes, out=out, clock=clock, compact=compact)
+    full_frame = app.render()
+
+    app.handle_key(" ")
+    app.tick()
+    while app.timer.is_running:
+        clock.advance(app.timer.next_tick_delay() / 1000)
+        app.tick()
+
+    ticks = sorted(app.tick_bytes[1:])
+    mean = sum(ticks) / len(ticks)
+    print(f"Session:          {minutes} min, {len(ticks)} ticks, "
+          f"{app.canvas.cols}x{app.canvas.rows + 2} cells")
+    print(f"Full frame:       {full_frame} bytes")
+    print(f"Per tick:         mean {mean:.1f} bytes, p50 {ticks[len(ticks) // 2]}, "
+          f"max {ticks[-1]}")
+    print(f"Session total:    {out.tell()} bytes "
+          f"(full redraw every tick would be {full_frame * (len(ticks) + 1)})")
+    return mean < full_frame / 10
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Binary Pomodoro in the terminal")
+    parser.add_argument("minutes", type=int, nargs="?", default=25, help="Session length in minutes")
+    parser.add_argument("--compact", action="store_true", help="Half-height tree for small panes")
+    parser.add_argument("--seconds", action="store_true",
+                        help="Show the remaining seconds in binary instead of the minutes")
+    parser.add_argument("--256", dest="color256", action="store_true",
+                        help="Use 256 colours instead of 24-bit colour")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Report bytes per tick over a virtual session")
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sys.exit(0 if run_benchmark(args.minutes, args.compact) else 1)
+
+    if not sys.stdin.isatty():
+        print("Error: the terminal widget needs an interactive terminal")
+        sys.exit(1)
+
+    truecolor = not args.color256 and os.environ.get("COLORTERM") in ("truecolor", "24bit")
+    app = TerminalPomodoro(args.minutes, compact=args.compact, truecolor=truecolor,
+                           show_seconds=args.seconds)
+    app.run()
@@ -0,0 +1,441 @@
+"""
+Offline timelapse export of a session's tree growth.
+Each frame is the tree as draw_tree(minutes, growth) leaves it on a
+RecordingCanvas, rasterised to an indexed bitmap without Tk and encoded
+as PNG or as a frame of an animated GIF (stdlib only: zlib and a small
+LZW encoder). Session seconds are split into chunks rendered by a
+ProcessPoolExecutor; frames identical to the one before are not
+rendered again, and results are streamed to the output in order.
+
+Usage:
+    python timelapse.py 60 -o session.gif           # animated GIF at 30 fps
+    python timelapse.py 25 -o frames/ --workers 4   # PNG sequence (duplicates hard-linked)
+"""
+
+import os
+import struct
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from pomodoro_widget import MIN_GROWTH, TREE_CANVAS_HEIGHT, TREE_CANVAS_WIDTH, make_tree
+from recording_canvas import RecordingCanvas
+
+
+BACKGROUND = "#0a1a0a"
+
+# 5x7 bitmaps for the characters a leaf can show
+FONT_5X7 = {
+    "0": (".###.", "#...#", "#..##", "#.#.#", "##..#", "#...#", ".###."),
+    "1": ("..#..", ".##..", "..#..", "..#..", "..#..", "..#..", ".###."),
+}
+
+
+def tree_palette():
+    """Return the colours a frame can contain, background first."""
+    tree = make_tree(RecordingCanvas())
+    return [BACKGROUND, tree.leaf_color, tree.leaf_glow, tree.trunk_color, tree.trunk_dark]
+
+
+def session_growth(second, total_seconds):
+    """Growth percent the widget shows `second` seconds into a session."""
+    progress = second / total_seconds * 100
+    return max(MIN_GROWTH, progress)
+
+
+class FrameRasterizer:
+    """
+    Draws RecordingCanvas items into an 8-bit indexed bitmap.
+
+    Supports what the tree uses: filled and outlined rectangles,
+    horizontal lines and centred text in FONT_5X7 scaled to the font
+    size. Rows are filled with slice assignment, so a frame costs a few
+    hundred slice operations rather than one call per pixel.
+    """
+
+    def __init__(self, width, height, palette):
+        self.width = width
+        self.height = height
+        self.palette = palette
+        self._index = {color.lower(): i for i, color in enumerate(palette)}
+        self._blank = bytes(width * height)
+        self._glyphs = {}
+
+    def _color(self, color):
+        return self._index.get((color or "").lower(), 0)
+
+    def _fill(self, buf, x0, y0, x1, y1, index):
+        x0, x1 = max(0, int(x0)), min(self.width, int(x1))
+        y0, y1 = max(0, int(y0)), min(self.height, int(y1))
+        if x1 <= x0:
+            return
+        run = bytes((index,)) * (x1 - x0)
+        for y in range(y0, y1):
+            start = y * self.width
+            buf[start + x0:start + x1] = run
+
+    def _glyph(self, char, size):
+        """Return (width, height, runs) for a character scaled to a font size."""
+        key = (char, size)
+        glyph = self._glyphs.get(key)
+        if glyph is None:
+            bitmap = FONT_5X7.get(char)
+            height = max(7, size)
+            width = max(5, height * 5 // 7)
+            runs = []
+            if bitmap is not None:
+                for ty in range(height):
+                    row = bitmap[ty * 7 // height]
+                    tx = 0
+                    while tx < width:
+                        if row[tx * 5 // width] == "#":
+                            start = tx
+                            while tx < width and row[tx * 5 // width] == "#":
+                                tx += 1
+                            runs.append((ty, start, tx))
+                        else:
+                            tx += 1
+            glyph = (width, height, runs)
+            self._glyphs[key] = glyph
+        return glyph
+
+    def render(self, canvas):
+        """Return the canvas's visible items as a bytearray of palette indexes."""
+        buf = bytearray(self._blank)
+        for item in canvas.items.values():
+            options = item["options"]
+            if options.get("state") == "hidden":
+                continue
+            coords = item["coords"]
+            kind = item["type"]
+            if kind == "rectangle":
+                x0, y0, x1, y1 = coords
+                self._fill(buf, x0, y0, x1, y1, self._color(options.get("fill")))
+                outline = options.get("outline")
+                width = options.get("width", 1)
+                if outline:
+                    index = self._color(outline)
+                    self._fill(buf, x0, y0, x1, y0 + width, index)
+                    self._fill(buf, x0, y1 - width, x1, y1, index)
+                    self._fill(buf, x0, y0, x0 + width, y1, index)
+                    self._fill(buf, x1 - width, y0, x1, y1, index)
+            elif kind == "line":
+                x0, y0, x1, y1 = coords
+                width = options.get("width", 1)
+                top = min(y0, y1) - width // 2
+                self._fill(buf, min(x0, x1), top, max(x0, x1), top + width,
+                           self._color(options.get("fill")))
+            elif kind == "text":
+                text = options.get("text", "")
+                font = options.get("font")
+                size = font[1] if isinstance(font, tuple) else 12
+                index = self._color(options.get("fill"))
+                x, y = coords[0], coords[1]
+                glyphs = [self._glyph(char, size) for char in text]
+                left = int(x - sum(g[0] + 1 for g in glyphs) / 2)
+                for width, height, runs in glyphs:
+                    top = int(y - height / 2)
+                    for ty, start, end in runs:
+                        self._fill(buf, left + start, top + ty, left + end, top + ty + 1, index)
+                    left += width + 1
+        return buf
+
+
+# Encoders
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encode_png(pixels, width, height, palette):
+    """Encode indexed pixels as a palette PNG."""
+    rows = bytearray()
+    for y in range(height):
+        rows.append(0)  # Filter type: none
+        rows += pixels[y * width:(y + 1) * width]
+    plte = b"".join(bytes.fromhex(color[1:]) for color in palette)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0))
+        + _png_chunk(b"PLTE", plte)
+        + _png_chunk(b"IDAT", zlib.compress(bytes(rows), 6))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+def lzw_encode(pixels, min_code_size):
+    """Return GIF LZW-compressed image data (without sub-block framing)."""
+    clear = 1 << min_code_size
+    end = clear + 1
+    out = bytearray()
+    bits = 0
+    bit_count = 0
+    code_size = min_code_size + 1
+    next_code = end + 1
+    table = {}
+
+    def emit(code):
+        nonlocal bits, bit_count
+        bits |= code << bit_count
+        bit_count += code_size
+        while bit_count >= 8:
+            out.append(bits & 0xFF)
+            bits >>= 8
+            bit_count -= 8
+
+    emit(clear)
+    prefix = pixels[0]
+    for i in range(1, len(pixels)):
+        pixel = pixels[i]
+        key = (prefix << 8) | pixel
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        emit(prefix)
+        table[key] = next_code
+        if next_code == 1 << code_size and code_size < 12:
+            code_size += 1
+        next_code += 1
+        if next_code == 4096:
+            emit(clear)
+            table.clear()
+            code_size = min_code_size + 1
+            next_code = end + 1
+        prefix = pixel
+    emit(prefix)
+    emit(end)
+    if bit_count:
+        out.append(bits & 0xFF)
+    return bytes(out)
+
+
+def encode_gif_frame(pixels, width, height, min_code_size):
+    """Encode one image descriptor and its data; delays are added by GifWriter."""
+    data = lzw_encode(pixels, min_code_size)
+    blocks = bytearray(struct.pack("<BHHHHB", 0x2C, 0, 0, width, height, 0))
+    blocks.append(min_code_size)
+    for i in range(0, len(data), 255):
+        chunk = data[i:i + 255]
+        blocks.append(len(chunk))
+        blocks += chunk
+    blocks.append(0)
+    return bytes(blocks)
+
+
+class GifWriter:
+    """
+    Streams an animated GIF. Each frame is held only until the next
+    distinct one arrives, because its delay (how many session seconds it
+    covers) is known only then.
+    """
+
+    def __init__(self, path, width, height, palette, fps):
+        self.fps = fps
+        self.min_code_size = max(2, (len(palette) - 1).bit_length())
+        table_size = 1 << self.min_code_size
+        colors = b"".join(bytes.fromhex(c[1:]) for c in palette)
+        colors += b"\0" * (3 * table_size - len(colors))
+
+        self._file = open(path, "wb")
+        self._file.write(b"GIF89a")
+        self._file.write(struct.pack("<HHBBB", width, height,
+                                     0x80 | 0x70 | (self.min_code_size - 1), 0, 0))
+        self._file.write(colors)
+        # Loop forever (NETSCAPE2.0 application extension)
+        self._file.write(b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+        self._pending = None
+        self._pending_frames = 0
+        self._shown_cs = 0.0
+        self.frames_written = 0
+
+    def add(self, image, count):
+        """Queue an encoded image shown for `count` session frames."""
+        if self._pending is not None:
+            self._flush()
+        self._pending = image
+        self._pending_frames = count
+
+    def extend(self, count):
+        """Show the pending image for `count` more frames."""
+        self._pending_frames += count
+
+    def _flush(self):
+        # Accumulate in centiseconds so rounding does not drift over a session
+        target = self._shown_cs + self._pending_frames * 100 / self.fps
+        delay = max(2, round(target) - round(self._shown_cs))
+        self._shown_cs = target
+        while delay > 0:
+            part = min(delay, 0xFFFF)
+            self._file.write(struct.pack("<BBBBHBB", 0x21, 0xF9, 4, 0, part, 0, 0))
+            self._file.write(self._pending)
+            delay -= part
+        self.frames_written += 1
+        self._pending = None
+
+    def close(self):
+        if self._pending is not None:
+            self._flush()
+        self._file.write(b"\x3B")
+        self._file.close()
+
+
+# Parallel rendering
+
+def render_chunk(minutes, start, stop, scale, fmt, palette, dedup=True):
+    """
+    Worker: render session seconds [start, stop).
+
+    Returns [second, count, image] runs: the retained-mode tree reports
+    how many canvas calls a draw_tree() made, and a frame that made none
+    is identical to the one before, so it only extends the current run.
+    """
+    canvas = RecordingCanvas()
+    tree = make_tree(canvas, scale)
+    width, height = TREE_CANVAS_WIDTH * scale, TREE_CANVAS_HEIGHT * scale
+    rasterizer = FrameRasterizer(width, height, palette)
+    min_code_size = max(2, (len(palette) - 1).bit_length())
+    total = minutes * 60
+
+    runs = []
+    for second in range(start, stop):
+        tree.draw_tree(minutes, session_growth(second, total))
+        if runs and dedup and tree.frame_ops == 0:
+            runs[-1][1] += 1
+            continue
+        pixels = rasterizer.render(canvas)
+        if fmt == "gif":
+            image = encode_gif_frame(pixels, width, height, min_code_size)
+        else:
+            image = encode_png(pixels, width, height, palette)
+        runs.append([second, 1, image])
+        canvas.reset_log()
+    return runs
+
+
+def _peak_rss_kib():
+    """Return (this process, largest child) peak RSS in KiB, or None."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    scale = 1024 if sys.platform == "darwin" else 1  # macOS reports bytes
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale)
+
+
+def export(minutes, output, fps=30, workers=None, scale=1, chunk_seconds=120, dedup=True):
+    """
+    Render a session and write it to `output` (a .gif file or a PNG directory).
+
+    Chunks are submitted with a bounded window, so at most a few chunks
+    of results exist at once however long the session is.
+    """
+    fmt = "gif" if output.lower().endswith(".gif") else "png"
+    palette = tree_palette()
+    width, height = TREE_CANVAS_WIDTH * scale, TREE_CANVAS_HEIGHT * scale
+    frames = minutes * 60 + 1
+    chunks = [(s, min(frames, s + chunk_seconds)) for s in range(0, frames, chunk_seconds)]
+    workers = workers or os.cpu_count() or 1
+
+    if fmt == "gif":
+        writer = GifWriter(output, width, height, palette, fps)
+    else:
+        os.makedirs(output, exist_ok=True)
+    previous_path = None
+    previous_image = None
+    unique = 0
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = deque()
+        pending = iter(chunks)
+        for start, stop in pending:
+            window.append(pool.submit(render_chunk, minutes, start, stop, scale, fmt, palette, dedup))
+            if len(window) >= 2 * workers:
+                break
+
+        while window:
+            runs = window.popleft().result()
+            for start, stop in pending:
+                window.append(pool.submit(render_chunk, minutes, start, stop, scale, fmt, palette, dedup))
+                break
+
+            for second, count, image in runs:
+                # A chunk always starts with a rendered frame; merge it if it
+                # repeats the end of the previous chunk
+                repeat = dedup and image == previous_image
+                if not repeat:
+                    unique += 1
+                    previous_image = image
+                if fmt == "gif":
+                    if repeat:
+                        writer.extend(count)
+                    else:
+                        writer.add(image, count)
+                    continue
+                for offset in range(count):
+                    path = os.path.join(output, f"frame_{second + offset:05d}.png")
+                    if previous_path is not None and (offset or repeat):
+                        _link_or_copy(previous_path, path)
+                    else:
+                        with open(path, "wb") as f:
+                            f.write(image)
+                    previous_path = path
+
+    if fmt == "gif":
+        writer.close()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "frames": frames,
+        "unique_frames": unique,
+        "seconds": elapsed,
+        "fps": frames / elapsed,
+        "workers": workers,
+        "peak_rss_kib": _peak_rss_kib(),
+        "output": output,
+        "bytes": os.path.getsize(output) if fmt == "gif" else None,
+    }
+
+
+def _link_or_copy(source, target):
+    if os.path.exists(target):
+        os.unlink(target)
+    try:
+        os.link(source, target)
+    except OSError:
+        import shutil
+        shutil.copyfile(source, target)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export a session's tree growth as a timelapse")
+    parser.add_argument("minutes", type=int, help="Session length in minutes")
+    parser.add_argument("-o", "--output", default="timelapse.gif",
+                        help="Output .gif file, or a directory for a PNG sequence")
+    parser.add_argument("--fps", type=float, default=30, help="GIF playback rate in session seconds per second")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--scale", type=int, default=1, help="Integer upscale factor")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="Render and write every frame, even unchanged ones")
+
+    args = parser.parse_args()
+
+    report = export(args.minutes, args.output, fps=args.fps, workers=args.workers,
+                    scale=args.scale, dedup=not args.no_dedup)
+    print(f"Frames:           {report['frames']} ({report['unique_frames']} unique) "
+          f"with {report['workers']} workers")
+    print(f"Time:             {report['seconds']:.2f} s, {report['fps']:.0f} frames/s")
+    if report["bytes"] is not None:
+        print(f"Output:           {report['output']} ({report['bytes'] / 1024:.1f} KiB)")
+    else:
+        print(f"Output:           {report['output']}/")
+    if report["peak_rss_kib"] is not None:
+        own, child = report["peak_rss_kib"]
+        print(f"Peak RSS:         {own / 1024:.1f} MiB main, {child / 1024:.1f} MiB largest worker")
@@ -0,0 +1,267 @@
+"""
+Heap-scheduled engine for many concurrent Pomodoro timers.
+Timer state lives in parallel arrays instead of one PomodoroTimer object per
+timer, and running deadlines sit in a min-heap: the manager wakes only for
+the nearest deadline and fires completions in batches.
+
+Usage:
+    python timer_manager.py --timers 10000
+"""
+
+import heapq
+import math
+import time
+from array import array
+
+from pomodoro_widget import SystemClock
+
+
+class TimerManager:
+    """
+    Many independent countdown timers driven by one scheduler.
+
+    Each timer is an integer id indexing parallel arrays. Start, pause,
+    reset and set_minutes have the same meaning as on PomodoroTimer;
+    remaining time is derived from a monotonic deadline when asked for,
+    so there is no per-timer tick.
+
+    Heap entries are (deadline, id, generation); any state change bumps
+    the timer's generation, which turns older entries stale so they are
+    skipped when popped instead of being searched for and removed.
+
+    Args:
+        clock: Clock to read and schedule on (e.g. simulation.VirtualClock)
+        on_complete: Called with a list of timer ids completed together
+        root: Tk root to schedule on with a SystemClock, if no clock is given
+    """
+
+    def __init__(self, clock=None, on_complete=None, root=None):
+        if clock is None:
+            if root is None:
+                raise ValueError("TimerManager needs a clock or a Tk root to schedule on")
+            clock = SystemClock(root)
+        self.clock = clock
+
+        # Called with a list of timer ids that completed on the same wake-up
+        self.on_complete = on_complete
+
+        self._total = array("l")          # Session length in seconds
+        self._remaining = array("d")      # Remaining seconds while paused
+        self._deadline = array("d")       # Monotonic deadline while running
+        self._running = array("b")
+        self._generation = array("L")
+        self._heap = []
+
+        self._after_id = None
+        self._armed_for = None
+
+        self.wakeups = 0
+        self.completed = 0
+        self.wake_seconds_total = 0.0
+        self.wake_seconds_max = 0.0
+
+    def __len__(self):
+        return len(self._total)
+
+    # Timer operations
+
+    def add(self, minutes=25):
+        """Create a stopped timer and return its id."""
+        timer_id = len(self._total)
+        seconds = max(1, min(60, minutes)) * 60
+        self._total.append(seconds)
+        self._remaining.append(float(seconds))
+        self._deadline.append(0.0)
+        self._running.append(0)
+        self._generation.append(0)
+        return timer_id
+
+    def set_minutes(self, timer_id, minutes):
+        """Set a timer's duration in minutes (clamped to 1-60) and rewind it."""
+        self._total[timer_id] = max(1, min(60, minutes)) * 60
+        self.reset(timer_id)
+
+    def start(self, timer_id):
+        """Start or resume a timer."""
+        if self._running[timer_id] or self._remaining[timer_id] <= 0:
+            return
+        deadline = self.clock.monotonic() + self._remaining[timer_id]
+        self._deadline[timer_id] = deadline
+        self._running[timer_id] = 1
+        self._generation[timer_id] += 1
+        heapq.heappush(self._heap, (deadline, timer_id, self._generation[timer_id]))
+        if self._armed_for is None or deadline < self._armed_for:
+            self._arm()
+
+    def pause(self, timer_id):
+        """Pause a timer, keeping its remaining time."""
+        if not self._running[timer_id]:
+            return
+        now = self.clock.monotonic()
+        if self._deadline[timer_id] <= now:
+            # Expired before its wake-up ran: complete it the way the
+            # wake-up would, so on_complete and the counters see it
+            self._complete_due()
+            return
+        self._remaining[timer_id] = self._deadline[timer_id] - now
+        self._running[timer_id] = 0
+        self._generation[timer_id] += 1
+
+    def reset(self, timer_id):
+        """Stop a timer and rewind it to its full duration."""
+        self._remaining[timer_id] = float(self._total[timer_id])
+        self._running[timer_id] = 0
+        self._generation[timer_id] += 1
+
+    # Queries
+
+    def is_running(self, timer_id):
+        return bool(self._running[timer_id])
+
+    def remaining_seconds(self, timer_id):
+        """Return whole seconds left, as PomodoroTimer.remaining_seconds."""
+        if self._running[timer_id]:
+            left = self._deadline[timer_id] - self.clock.monotonic()
+        else:
+            left = self._remaining[timer_id]
+        return max(0, math.ceil(left))
+
+    def get_display_time(self, timer_id):
+        """Return formatted time string MM:SS."""
+        remaining = self.remaining_seconds(timer_id)
+        return f"{remaining // 60:02d}:{remaining % 60:02d}"
+
+    def get_progress_percent(self, timer_id):
+        """Return progress as percentage (0-100)."""
+        total = self._total[timer_id]
+        return (total - self.remaining_seconds(timer_id)) / total * 100
+
+    def is_complete(self, timer_id):
+        return self.remaining_seconds(timer_id) <= 0
+
+    def running_count(self):
+        return sum(self._running)
+
+    # Scheduling
+
+    def _next_deadline(self):
+        """Return the nearest live deadline, dropping stale heap entries."""
+        heap = self._heap
+        generation = self._generation
+        while heap:
+            deadline, timer_id, gen = heap[0]
+            if gen == generation[timer_id]:
+                return deadline
+            heapq.heappop(heap)
+        return None
+
+    def _arm(self):
+        """Schedule one wake-up for the nearest deadline (or none if idle)."""
+        if self._after_id is not None:
+            self.clock.after_cancel(self._after_id)
+            self._after_id = None
+        deadline = self._next_deadline()
+        self._armed_for = deadline
+        if deadline is not None:
+            delay = max(0.0, deadline - self.clock.monotonic())
+            self._after_id = self.clock.after(max(1, math.ceil(delay * 1000)), self._wake)
+
+    def _wake(self):
+        """Complete every timer whose deadline has passed, then re-arm."""
+        self._after_id = None
+        started = time.perf_counter()
+        self.wakeups += 1
+
+        self._complete_due()
+
+        elapsed = time.perf_counter() - started
+        self.wake_seconds_total += elapsed
+        self.wake_seconds_max = max(self.wake_seconds_max, elapsed)
+
+    def _complete_due(self):
+        """Complete every timer past its deadline, report them and re-arm."""
+        fired = self.poll()
+        if fired and self.on_complete is not None:
+            self.on_complete(fired)
+        self._arm()
+
+    def poll(self):
+        """Mark all timers past their deadline complete; return their ids."""
+        now = self.clock.monotonic()
+        heap = self._heap
+        generation = self._generation
+        fired = []
+        while heap and heap[0][0] <= now:
+            deadline, timer_id, gen = heapq.heappop(heap)
+            if gen != generation[timer_id]:
+                continue
+            self._remaining[timer_id] = 0.0
+            self._running[timer_id] = 0
+            generation[timer_id] += 1
+            fired.append(timer_id)
+        self.completed += len(fired)
+        return fired
+
+    def stats(self):
+        """Return wake-up counters and per-wake overhead."""
+        return {
+            "timers": len(self),
+            "running": self.running_count(),
+            "heap_size": len(self._heap),
+            "wakeups": self.wakeups,
+            "completed": self.completed,
+            "mean_wake_us": self.wake_seconds_total / self.wakeups * 1e6 if self.wakeups else 0.0,
+            "max_wake_us": self.wake_seconds_max * 1e6,
+        }
+
+
+def run_benchmark(timers, seed=0):
+    """Run many timers to completion in virtual time and report overhead."""
+    import random
+
+    from simulation import VirtualClock
+
+    rng = random.Random(seed)
+    clock = VirtualClock()
+    batches = []
+    manager = TimerManager(clock, on_complete=batches.append)
+
+    started = time.perf_counter()
+    for _ in range(timers):
+        timer_id = manager.add(rng.randint(1, 60))
+        manager.start(timer_id)
+    setup_seconds = time.perf_counter() - started
+
+    # Pause and resume a tenth of them part-way to exercise stale heap entries
+    clock.advance(30)
+    for timer_id in rng.sample(range(timers), timers // 10):
+        manager.pause(timer_id)
+    clock.advance(120)
+    for timer_id in range(timers):
+        manager.start(timer_id)
+
+    clock.advance(2 * 3600)
+
+    stats = manager.stats()
+    print(f"Timers:           {timers}")
+    print(f"Setup:            {setup_seconds / timers * 1e6:.2f} us per timer")
+    print(f"Wake-ups:         {stats['wakeups']} for {stats['completed']} completions "
+          f"({len(batches)} batches)")
+    print(f"Per wake-up:      mean {stats['mean_wake_us']:.1f} us, max {stats['max_wake_us']:.1f} us")
+    if stats["completed"]:
+        per_completion = stats["mean_wake_us"] * stats["wakeups"] / stats["completed"]
+        print(f"Per completion:   {per_completion:.2f} us")
+    print(f"Still running:    {stats['running']}")
+    return stats["completed"] == timers
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Benchmark the multi-timer engine")
+    parser.add_argument("--timers", type=int, default=10000, help="Number of concurrent timers")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    args = parser.parse_args()
+    sys.exit(0 if run_benchmark(args.timers, args.seed) else 1)
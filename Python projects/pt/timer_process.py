@@ -0,0 +1,351 @@
+"""
+Pomodoro timer running in a child process.
+The child owns a PomodoroTimer, publishes its state into a small
+multiprocessing.shared_memory block and sends start/pause/complete/reset
+events back through a pipe. RemoteTimer is a drop-in for PomodoroTimer
+in the widget: it only reads the shared block, so a stalled Tk main loop
+cannot delay the timer itself.
+
+Usage:
+    python timer_process.py --reads 100000    # measure state read latency
+"""
+
+import math
+import struct
+import time
+from multiprocessing import Pipe, Process, shared_memory
+
+from pomodoro_widget import PomodoroTimer, SystemClock
+
+
+# Shared state block, guarded by a sequence counter (odd while writing):
+# seq, minutes, total seconds, remaining seconds (when paused), running,
+# complete, deadline (monotonic), jitter count, jitter mean/max in ms
+STATE = struct.Struct("<IiiiBB2xdI4xdd")
+
+
+class StateBlock:
+    """Seqlock-protected view of the timer state in a shared buffer."""
+
+    def __init__(self, buf):
+        self.buf = buf
+        self._seq = 0
+
+    def write(self, timer):
+        """Publish a PomodoroTimer's state (child side)."""
+        jitter = timer.jitter_stats()
+        deadline = timer.get_deadline()
+        self._seq += 1
+        struct.pack_into("<I", self.buf, 0, self._seq)
+        STATE.pack_into(
+            self.buf, 0, self._seq,
+            timer.minutes, timer.total_seconds, timer.remaining_seconds,
+            timer.is_running, timer.is_complete(),
+            deadline if deadline is not None else 0.0,
+            jitter["count"], jitter["mean_ms"], jitter["max_ms"]
+        )
+        self._seq += 1
+        struct.pack_into("<I", self.buf, 0, self._seq)
+
+    def read(self):
+        """Return a consistent snapshot tuple (reader side)."""
+        while True:
+            fields = STATE.unpack_from(self.buf, 0)
+            seq = fields[0]
+            if seq % 2 == 0 and struct.unpack_from("<I", self.buf, 0)[0] == seq:
+                return fields
+
+
+def _run_timer_process(commands, events, shm_name, minutes):
+    """Child process: run the timer, publish state, answer commands."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    block = StateBlock(shm.buf)
+    timer = PomodoroTimer(minutes)
+    # Events are sent after the state block is written, so a parent that
+    # has received "complete" also reads the timer as stopped
+    outbox = []
+    timer.listeners.append(
+        lambda event, t: outbox.append((event, t.remaining_seconds, t.clock.wall()))
+    )
+
+    def publish():
+        block.write(timer)
+        for message in outbox:
+            events.send(message)
+        outbox.clear()
+
+    publish()
+    commands.send("ready")
+
+    try:
+        while True:
+            timeout = timer.next_tick_delay() / 1000 if timer.is_running else None
+            if commands.poll(timeout):
+                operation, argument = commands.recv()
+                if operation == "quit":
+                    break
+                if operation == "set_minutes":
+                    timer.set_minutes(argument)
+                elif operation == "restore":
+                    timer.restore(*argument)
+                else:
+                    getattr(timer, operation)()
+                publish()
+                commands.send("ok")
+            else:
+                timer.tick()
+                publish()
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        block.buf = None
+        shm.close()
+        commands.close()
+        events.close()
+
+
+class _EventClock(SystemClock):
+    """SystemClock whose wall() gives the child's time of the event being delivered."""
+
+    def __init__(self):
+        super().__init__()
+        self.event_wall = None
+
+    def wall(self):
+        return self.event_wall if self.event_wall is not None else time.time()
+
+
+class RemoteTimer:
+    """
+    PomodoroTimer interface backed by a timer in a child process.
+
+    Commands are sent over a pipe and acknowledged once the child has
+    published the new state, so reads right after a command see it.
+    Remaining time while running is derived from the shared deadline,
+    so the display stays exact even if the child is slow to wake.
+    """
+
+    WAKE_MARGIN = PomodoroTimer.WAKE_MARGIN
+
+    # Seconds to wait for the child to come up before giving up
+    START_TIMEOUT = 10.0
+
+    # Seconds tick() waits for the child's "complete" once the deadline
+    # has passed (the child wakes WAKE_MARGIN after it, like the widget)
+    COMPLETE_WAIT = 0.5
+
+    def __init__(self, initial_minutes=5):
+        self.clock = _EventClock()
+        self.listeners = []
+        self._event_remaining = None
+
+        self._shm = shared_memory.SharedMemory(create=True, size=STATE.size)
+        self._block = StateBlock(self._shm.buf)
+        self._commands, child_commands = Pipe()
+        self._events, child_events = Pipe(duplex=False)
+        self._process = Process(
+            target=_run_timer_process,
+            args=(child_commands, child_events, self._shm.name, initial_minutes),
+            name="pomodoro-timer",
+            daemon=True
+        )
+        self._process.start()
+        child_commands.close()
+        child_events.close()
+        try:
+            if not self._commands.poll(self.START_TIMEOUT):
+                raise EOFError
+            self._commands.recv()
+        except EOFError:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+            self._block.buf = None
+            self._shm.close()
+            self._shm.unlink()
+            raise RuntimeError(
+                f"timer process exited or did not start within {self.START_TIMEOUT:.0f} s"
+            ) from None
+
+        # Shared-memory read latency
+        self.reads = 0
+        self._read_ns_total = 0
+        self.read_ns_max = 0
+
+    # Shared state
+
+    def _snapshot(self):
+        started = time.perf_counter_ns()
+        fields = self._block.read()
+        elapsed = time.perf_counter_ns() - started
+        self.reads += 1
+        self._read_ns_total += elapsed
+        if elapsed > self.read_ns_max:
+            self.read_ns_max = elapsed
+        return fields
+
+    def _remaining_exact(self, fields):
+        if fields[4]:
+            return max(0.0, fields[6] - self.clock.monotonic())
+        return float(fields[3])
+
+    @property
+    def minutes(self):
+        return self._snapshot()[1]
+
+    @property
+    def total_seconds(self):
+        return self._snapshot()[2]
+
+    @property
+    def remaining_seconds(self):
+        if self._event_remaining is not None:
+            return self._event_remaining
+        return math.ceil(self._remaining_exact(self._snapshot()))
+
+    @property
+    def is_running(self):
+        # Running until the child has completed the session, so the
+        # wake-up at the deadline still ticks and delivers "complete"
+        return bool(self._snapshot()[4])
+
+    # Commands
+
+    def _command(self, operation, argument=None):
+        self._commands.send((operation, argument))
+        self._commands.recv()
+        self._dispatch_events()
+
+    def set_minutes(self, minutes):
+        """Set timer duration in minutes."""
+        self._command("set_minutes", minutes)
+
+    def start(self):
+        """Start or resume the timer."""
+        self._command("start")
+
+    def pause(self):
+        """Pause the timer."""
+        self._command("pause")
+
+    def reset(self):
+        """Reset timer to initial value."""
+        self._command("reset")
+
+    def restore(self, minutes, remaining, running):
+        """Put back a saved state without notifying listeners."""
+        self._command("restore", (minutes, remaining, running))
+
+    def close(self):
+        """Stop the child process and free the shared block."""
+        if self._process is None:
+            return
+        try:
+            self._commands.send(("quit", None))
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.join(timeout=2)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = None
+        self._block.buf = None
+        self._shm.close()
+        self._shm.unlink()
+
+    # PomodoroTimer queries
+
+    def _dispatch_events(self):
+        """Deliver events the child has sent, without blocking."""
+        while self._events.poll():
+            event, remaining, wall = self._events.recv()
+            # Listeners see the remaining time and wall-clock time as they
+            # were at the event, not when it was delivered
+            self._event_remaining = remaining
+            self.clock.event_wall = wall
+            try:
+                for listener in self.listeners:
+                    listener(event, self)
+            finally:
+                self._event_remaining = None
+                self.clock.event_wall = None
+
+    def tick(self):
+        """Deliver pending events. Returns True if timer is still running."""
+        fields = self._snapshot()
+        if fields[4] and self._remaining_exact(fields) <= 0:
+            # The deadline has passed: the child is about to complete
+            self._events.poll(self.COMPLETE_WAIT)
+        self._dispatch_events()
+        return self.is_running
+
+    def next_tick_delay(self):
+        """Return milliseconds until the displayed time next changes."""
+        fields = self._snapshot()
+        if not fields[4]:
+            return 1000
+        left = self._remaining_exact(fields)
+        fraction = left - (math.ceil(left) - 1) if left > 0 else 0.0
+        return max(1, int(math.ceil((fraction + self.WAKE_MARGIN) * 1000)))
+
+    def get_display_time(self):
+        """Return formatted time string MM:SS."""
+        remaining = self.remaining_seconds
+        return f"{remaining // 60:02d}:{remaining % 60:02d}"
+
+    def get_progress_percent(self):
+        """Return progress as percentage (0-100)."""
+        fields = self._snapshot()
+        total = fields[2]
+        if total == 0:
+            return 100
+        remaining = math.ceil(self._remaining_exact(fields))
+        return (total - remaining) / total * 100
+
+    def is_complete(self):
+        """Check if timer has completed."""
+        return self.remaining_seconds <= 0
+
+    def get_deadline(self):
+        """Return the monotonic-clock deadline while running, else None."""
+        fields = self._snapshot()
+        return fields[6] if fields[4] else None
+
+    def jitter_stats(self):
+        """Return the child's wake-up lateness statistics in milliseconds."""
+        fields = self._snapshot()
+        return {"count": fields[7], "mean_ms": fields[8], "max_ms": fields[9], "last_ms": 0.0}
+
+    def read_stats(self):
+        """Return shared-memory snapshot read latency."""
+        return {
+            "reads": self.reads,
+            "mean_ns": self._read_ns_total / self.reads if self.reads else 0.0,
+            "max_ns": self.read_ns_max,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure the out-of-process timer")
+    parser.add_argument("--reads", type=int, default=100000, help="Snapshot reads to time")
+    parser.add_argument("--seconds", type=float, default=3.0, help="How long to let the timer run")
+
+    args = parser.parse_args()
+
+    timer = RemoteTimer(1)
+    try:
+        timer.start()
+        for _ in range(args.reads):
+            timer.get_display_time()
+        time.sleep(args.seconds)
+        timer.tick()
+        reads = timer.read_stats()
+        jitter = timer.jitter_stats()
+        print(f"Display after {args.seconds:.1f}s: {timer.get_display_time()}")
+        print(f"Snapshot reads:   {reads['reads']}, mean {reads['mean_ns']:.0f} ns, "
+              f"max {reads['max_ns']} ns")
+        print(f"Child wake-ups:   {jitter['count']}, lateness mean {jitter['mean_ms']:.2f} ms, "
+              f"max {jitter['max_ms']:.2f} ms")
+    finally:
+        timer.close()
@@ -0,0 +1,275 @@
+"""
+Several Binary Pomodoro widgets under one Tk root.
+Each widget is a Toplevel; they share one interpreter, one clock, one glyph
+cache, the module-wide tree layout cache and a single tick loop that
+redraws every widget whose time changed in one pass.
+
+Usage:
+    python tree_group.py 25 5 15      # work, break and meeting timers
+    python tree_group.py --benchmark 8   # memory and CPU of 1 vs 8 trees (no display)
+"""
+
+import tkinter as tk
+
+from pomodoro_widget import (
+    TREE_CANVAS_HEIGHT, TREE_CANVAS_WIDTH, GlyphCache, PomodoroTimer, PomodoroWidget,
+    SystemClock, TimerController, make_tree, tree_min_growth, update_tree
+)
+from recording_canvas import RecordingCanvas
+
+
+class GroupTicker:
+    """
+    One tick loop for many TimerControllers.
+
+    Controllers arm/disarm the ticker instead of scheduling their own
+    after() loops. It wakes for the earliest next-second boundary among
+    running timers, ticks them all, and hands only those whose displayed
+    second changed to their controller's show_tick() (redraw, checkpoint,
+    completion), as each controller's own update() would.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self._active = []
+        self._shown = {}
+        self._after_id = None
+
+        self.wakeups = 0
+        self.redraws = 0
+
+    # Shared tick loop
+
+    def arm(self, controller):
+        """Include a widget's running timer in the tick loop."""
+        if controller not in self._active:
+            self._active.append(controller)
+            self._shown[controller] = controller.timer.remaining_seconds
+        self._rearm()
+
+    def disarm(self, controller):
+        """Drop a widget's timer from the tick loop."""
+        if controller in self._active:
+            self._active.remove(controller)
+            self._shown.pop(controller, None)
+        if not self._active and self._after_id is not None:
+            self.clock.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _rearm(self):
+        if self._after_id is not None:
+            self.clock.after_cancel(self._after_id)
+            self._after_id = None
+        if self._active:
+            delay = min(controller.timer.next_tick_delay() for controller in self._active)
+            self._after_id = self.clock.after(delay, self._tick)
+
+    def _tick(self):
+        """Advance every running timer, then redraw the changed ones together."""
+        self._after_id = None
+        self.wakeups += 1
+
+        for controller in self._active:
+            controller.timer.tick()
+
+        changed = [c for c in self._active if c.timer.remaining_seconds != self._shown[c]]
+        for controller in changed:
+            controller.wakeup_count += 1
+            if controller.timer.is_complete():
+                self._active.remove(controller)
+                self._shown.pop(controller, None)
+            else:
+                self._shown[controller] = controller.timer.remaining_seconds
+            # Redraw, checkpoint and completion as the widget's own loop does
+            controller.show_tick()
+        self.redraws += len(changed)
+
+        self._rearm()
+
+
+class TreeGroup(GroupTicker):
+    """
+    Host for N PomodoroWidgets sharing one root, one GroupTicker loop,
+    one glyph cache and one statistics view.
+
+    The session history is read on first use (a widget's deferred
+    startup or its first start/pause), not while the windows open.
+    """
+
+    def __init__(self, clock=None, session_log=None):
+        self.root = tk.Tk()
+        self.root.withdraw()
+        super().__init__(clock or SystemClock(self.root))
+        self.glyphs = GlyphCache(self.root)
+        self.session_log = session_log
+
+        # One statistics view shared by every widget, loaded by load_stats()
+        self.stats = None
+        self._stats_loaded = False
+
+        self.widgets = []
+
+    def add_widget(self, minutes=5, animate=False, checkpoint=None, profile_frames=None):
+        """
+        Create a widget in this group, placed left of the previous one.
+        checkpoint and profile_frames are as for PomodoroWidget; a session
+        restored from the checkpoint keeps its own duration.
+        """
+        widget = PomodoroWidget(animate=animate, session_log=self.session_log, group=self,
+                                checkpoint=checkpoint, profile_frames=profile_frames)
+        if self.stats is not None:
+            self._attach_stats(widget)
+        if not widget.controller.restored:
+            widget.controller.set_minutes(minutes)
+
+        slot = len(self.widgets)
+        x = widget.root.winfo_screenwidth() - (widget.width + 20) * (slot + 1) - 30
+        y = widget.root.winfo_screenheight() - widget.height - 80
+        widget.root.geometry(f"+{max(0, x)}+{y}")
+
+        self.widgets.append(widget)
+        return widget
+
+    def remove(self, widget):
+        """Forget a closing widget; close the root with the last one."""
+        self.disarm(widget.controller)
+        if widget in self.widgets:
+            self.widgets.remove(widget)
+        if not self.widgets:
+            self.root.after_idle(self.root.destroy)
+
+    def load_stats(self):
+        """Read the session history once and attach the shared statistics to every widget."""
+        if self._stats_loaded:
+            return
+        self._stats_loaded = True
+        if self.session_log is None:
+            return
+        from session_stats import SessionStats
+        self.stats = SessionStats.from_log(self.session_log.path)
+        for widget in self.widgets:
+            self._attach_stats(widget)
+
+    def _attach_stats(self, widget):
+        widget.stats = self.stats
+        widget.timer.listeners.append(self.stats.record_timer_event)
+
+    def run(self):
+        """Run the shared main loop."""
+        try:
+            self.root.mainloop()
+        finally:
+            if self.session_log is not None:
+                self.session_log.close()
+
+
+def _build_trees(count, minutes, clock, ticker):
+    """Headless trees on RecordingCanvases, drawn as the widget draws them."""
+    glyphs = GlyphCache()
+    controllers = []
+    for i in range(count):
+        canvas = RecordingCanvas(width=TREE_CANVAS_WIDTH, height=TREE_CANVAS_HEIGHT)
+        tree = make_tree(canvas, glyph_cache=glyphs)
+        timer = PomodoroTimer(minutes + i, clock=clock)
+        min_growth = tree_min_growth(tree)
+        controller = TimerController(
+            timer, clock,
+            render=lambda tree=tree, timer=timer, min_growth=min_growth: (
+                update_tree(tree, timer, min_growth)
+            ),
+            scheduler=ticker
+        )
+        controller.canvas = canvas
+        controller.render()
+        controllers.append(controller)
+    return controllers
+
+
+def measure_trees(count, minutes, grouped):
+    """
+    Run `count` trees (durations minutes, minutes + 1, ...) started
+    together on a virtual clock, either under one GroupTicker or each on
+    its own loop. Returns retained memory after the first frame, CPU time
+    for the whole run and wake-ups.
+    """
+    import time
+    import tracemalloc
+
+    from simulation import VirtualClock
+
+    # Retained memory: the trees, their canvas items and controllers
+    tracemalloc.start()
+    clock = VirtualClock()
+    ticker = GroupTicker(clock) if grouped else None
+    controllers = _build_trees(count, minutes, clock, ticker)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # CPU for the whole run, untraced, with fresh trees
+    clock = VirtualClock()
+    ticker = GroupTicker(clock) if grouped else None
+    controllers = _build_trees(count, minutes, clock, ticker)
+    for controller in controllers:
+        controller.canvas.reset_log()
+        controller.toggle()
+    started = time.process_time()
+    clock.advance((minutes + count) * 60)
+    cpu = time.process_time() - started
+
+    return {
+        "trees": count,
+        "memory_kib": memory / 1024,
+        "cpu_ms": cpu * 1000,
+        "wakeups": ticker.wakeups if grouped else sum(c.wakeup_count for c in controllers),
+        "redraws": sum(c.wakeup_count for c in controllers),
+        "completed": sum(c.completions for c in controllers),
+    }
+
+
+def run_benchmark(trees=8, minutes=25):
+    """Compare one tree with `trees` trees, on separate loops and grouped."""
+    runs = [
+        ("1 tree", measure_trees(1, minutes, grouped=False)),
+        (f"{trees} own loops", measure_trees(trees, minutes, grouped=False)),
+        (f"{trees} grouped", measure_trees(trees, minutes, grouped=True)),
+    ]
+    print(f"Sessions:         {minutes}-{minutes + trees - 1} min, started together (virtual time)")
+    for name, run in runs:
+        count = run["trees"]
+        print(f"{name:<17} memory {run['memory_kib']:7.1f} KiB ({run['memory_kib'] / count:5.1f}/tree), "
+              f"CPU {run['cpu_ms']:7.1f} ms ({run['cpu_ms'] / count:5.1f}/tree), "
+              f"{run['wakeups']:6d} wake-ups, {run['redraws']} redraws")
+    single, separate, grouped = (run for _, run in runs)
+    # The group wakes no more often than its longest timer alone would
+    return (grouped["completed"] == separate["completed"] == trees
+            and grouped["wakeups"] <= (minutes + trees - 1) * 60 + 1
+            and grouped["redraws"] == separate["redraws"])
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Run several Binary Pomodoro trees together")
+    parser.add_argument("minutes", type=int, nargs="*", help="Duration of each timer in minutes")
+    parser.add_argument("--animate", action="store_true", help="Tween leaf growth and flashes")
+    parser.add_argument("--no-log", action="store_true", help="Do not record sessions")
+    parser.add_argument("--benchmark", type=int, metavar="TREES",
+                        help="Measure memory and CPU of 1 vs TREES trees (no display needed)")
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sys.exit(0 if run_benchmark(args.benchmark) else 1)
+    if not args.minutes:
+        parser.error("give at least one duration in minutes")
+
+    session_log = None
+    if not args.no_log:
+        from session_log import SessionLog
+        session_log = SessionLog()
+
+    group = TreeGroup(session_log=session_log)
+    for minutes in args.minutes:
+        group.add_widget(minutes, animate=args.animate)
+    group.run()